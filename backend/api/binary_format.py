@@ -0,0 +1,202 @@
+"""
+Binary wire formats for pose data.
+
+Pose arrays are sent as raw little-endian float32 or float16 buffers next to a
+small JSON header, so clients can view them directly as typed arrays.
+
+application/octet-stream layout:
+
+    bytes 0-3     magic b"SSPB"
+    bytes 4-7     header length H (uint32, little-endian)
+    bytes 8-8+H   header JSON (UTF-8)
+    padding       zero bytes up to the next multiple of 8
+    data          array buffers, each starting at a multiple of 8
+
+The header's "arrays" list gives name, dtype, shape, offset and nbytes for
+each buffer; offsets are relative to the start of the data section.
+
+application/msgpack (optional, needs the msgpack package) carries the same
+header as a map, with each array's bytes under "data".
+"""
+import json
+import struct
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from fastapi import HTTPException, status
+from fastapi.responses import Response, StreamingResponse
+
+try:
+    import msgpack
+except ImportError:  # Optional dependency
+    msgpack = None
+
+
+OCTET_STREAM_MEDIA_TYPE = "application/octet-stream"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+BINARY_MAGIC = b"SSPB"
+BINARY_VERSION = 1
+BINARY_ALIGNMENT = 8
+
+# Buffer dtypes clients may request (always little-endian on the wire)
+BINARY_DTYPES = {"float32": "<f4", "float16": "<f2"}
+
+Chunk = Union[bytes, memoryview]
+
+
+def as_wire_array(array: np.ndarray, dtype: str) -> np.ndarray:
+    """
+    Convert an array to a contiguous little-endian wire dtype.
+
+    No copy is made when the array already matches (e.g. a memory-mapped
+    float32 pose array requested as float32).
+    """
+    return np.ascontiguousarray(array, dtype=BINARY_DTYPES[dtype])
+
+
+def pack_binary(header: dict, arrays: Dict[str, np.ndarray], dtype: str = "float32") -> Tuple[List[Chunk], int]:
+    """
+    Frame a header and arrays in the octet-stream layout.
+
+    Args:
+        header: JSON-able metadata (shape, fps, impact_frame, ...)
+        arrays: Named arrays to send as raw buffers
+        dtype: "float32" or "float16"
+
+    Returns:
+        (chunks, total_length); array chunks are memoryviews of the arrays
+    """
+    data_chunks: List[Chunk] = []
+    specs = []
+    offset = 0
+    for name, array in arrays.items():
+        wire = as_wire_array(array, dtype)
+        specs.append({
+            "name": name,
+            "dtype": wire.dtype.str,
+            "shape": list(wire.shape),
+            "offset": offset,
+            "nbytes": wire.nbytes,
+        })
+        data_chunks.append(memoryview(wire).cast("B"))
+        offset += wire.nbytes
+        padding = -offset % BINARY_ALIGNMENT
+        if padding:
+            data_chunks.append(bytes(padding))
+            offset += padding
+
+    header_bytes = json.dumps(
+        {**header, "version": BINARY_VERSION, "arrays": specs},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+    prefix = BINARY_MAGIC + struct.pack("<I", len(header_bytes))
+    header_padding = bytes(-(len(prefix) + len(header_bytes)) % BINARY_ALIGNMENT)
+
+    chunks: List[Chunk] = [prefix, header_bytes, header_padding] + data_chunks
+    total_length = len(prefix) + len(header_bytes) + len(header_padding) + offset
+    return chunks, total_length
+
+
+def pack_msgpack(header: dict, arrays: Dict[str, np.ndarray], dtype: str = "float32") -> bytes:
+    """
+    Encode a header and arrays as a msgpack map.
+
+    Raises:
+        HTTPException: 406 if the msgpack package is not installed
+    """
+    if msgpack is None:
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail="msgpack is not available on this server; use application/octet-stream"
+        )
+
+    specs = []
+    for name, array in arrays.items():
+        wire = as_wire_array(array, dtype)
+        specs.append({
+            "name": name,
+            "dtype": wire.dtype.str,
+            "shape": list(wire.shape),
+            "data": memoryview(wire).cast("B"),
+        })
+    return msgpack.packb({**header, "version": BINARY_VERSION, "arrays": specs})
+
+
+def resolve_binary_format(accept: str) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Check the Accept header for a binary wire format.
+
+    Media ranges with q=0 are not acceptable and are skipped. A binary
+    format is chosen if its q-value is at least that of every other media
+    range (so on a tie binary wins); the first of several equally
+    preferred binary formats is used.
+
+    Args:
+        accept: Raw Accept header value
+
+    Returns:
+        (media_type, dtype parameter or None), or None for JSON
+    """
+    best_binary = None
+    best_binary_q = 0.0
+    best_other_q = 0.0
+    for media_range in accept.split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        if not media_type:
+            continue
+        q = 1.0
+        dtype = None
+        for param in params:
+            key, _, value = param.partition("=")
+            key, value = key.strip().lower(), value.strip()
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    pass
+            elif key == "dtype":
+                dtype = value
+        if q <= 0:
+            continue
+        if media_type == OCTET_STREAM_MEDIA_TYPE or media_type in MSGPACK_MEDIA_TYPES:
+            if q > best_binary_q:
+                best_binary, best_binary_q = (media_type, dtype), q
+        else:
+            best_other_q = max(best_other_q, q)
+    if best_binary is not None and best_binary_q >= best_other_q:
+        return best_binary
+    return None
+
+
+def binary_response(
+    header: dict,
+    arrays: Dict[str, np.ndarray],
+    media_type: str,
+    dtype: str = "float32"
+) -> Response:
+    """
+    Build a binary response in the requested wire format.
+
+    Octet-stream bodies are streamed straight from the arrays' memory.
+
+    Args:
+        header: JSON-able metadata
+        arrays: Named arrays to send as raw buffers
+        media_type: OCTET_STREAM_MEDIA_TYPE or one of MSGPACK_MEDIA_TYPES
+        dtype: "float32" or "float16"
+    """
+    if dtype not in BINARY_DTYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid dtype. Allowed: {', '.join(BINARY_DTYPES)}"
+        )
+
+    headers = {"Vary": "Accept"}
+    if media_type in MSGPACK_MEDIA_TYPES:
+        return Response(content=pack_msgpack(header, arrays, dtype), media_type=media_type, headers=headers)
+
+    chunks, total_length = pack_binary(header, arrays, dtype)
+    headers["Content-Length"] = str(total_length)
+    return StreamingResponse(iter(chunks), media_type=OCTET_STREAM_MEDIA_TYPE, headers=headers)
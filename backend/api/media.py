@@ -0,0 +1,223 @@
+"""
+Uploaded video serving.
+
+Videos are served from one endpoint (GET/HEAD /api/v1/videos/{swing_id}) with
+what browser players need for scrubbing:
+- byte ranges: `Range: bytes=start-end` gets 206 with just those bytes
+  (416 if unsatisfiable; `If-Range` falls back to the whole file when stale)
+- validators: ETag and Last-Modified, with 304 for `If-None-Match` /
+  `If-Modified-Since`
+- the content type of the actual container (mp4, mov, avi, webm)
+
+VideoIndex maps swing IDs to files, so requests do not probe the upload
+directory for each possible extension.
+"""
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from fastapi import Request, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+
+# Content type per uploaded video extension
+VIDEO_MEDIA_TYPES = {
+    ".mp4": "video/mp4",
+    ".mov": "video/quicktime",
+    ".avi": "video/x-msvideo",
+    ".webm": "video/webm",
+}
+
+# Uploads never change once written, so clients may cache them for a day
+VIDEO_CACHE_CONTROL = "private, max-age=86400"
+
+# Read size when streaming a byte range
+RANGE_CHUNK_BYTES = 256 * 1024
+
+# Starlette 0.48 renamed the 416 constant (the old name is deprecated); the
+# pinned FastAPI still ships an older Starlette without the new name
+HTTP_416_RANGE_NOT_SATISFIABLE = getattr(status, "HTTP_416_RANGE_NOT_SATISFIABLE", 416)
+
+
+class VideoIndex:
+    """In-memory swing_id -> uploaded video path index."""
+
+    def __init__(self, directory: Path):
+        """
+        Index the videos already in a directory.
+
+        Args:
+            directory: Upload directory (files named <swing_id><ext>)
+        """
+        self.directory = directory
+        self._paths: Dict[str, Path] = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                swing_id, ext = os.path.splitext(entry.name)
+                if ext.lower() in VIDEO_MEDIA_TYPES and entry.is_file():
+                    self._paths[swing_id] = Path(entry.path)
+
+    def add(self, swing_id: str, path: Path):
+        """Register a newly saved upload."""
+        self._paths[swing_id] = path
+
+    def discard(self, swing_id: str):
+        """Forget a video (e.g. once its file is gone)."""
+        self._paths.pop(swing_id, None)
+
+    def get(self, swing_id: str) -> Optional[Path]:
+        """
+        Look up a video.
+
+        Videos saved by another API process since startup (shared job
+        queue) are found by probing the directory once, then indexed.
+
+        Args:
+            swing_id: Swing identifier
+
+        Returns:
+            Path of the video, or None if there is none
+        """
+        path = self._paths.get(swing_id)
+        if path is None:
+            for ext in VIDEO_MEDIA_TYPES:
+                candidate = self.directory / f"{swing_id}{ext}"
+                if candidate.is_file():
+                    path = self._paths[swing_id] = candidate
+                    break
+        return path
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+
+def video_response(request: Request, path: Path) -> Optional[Response]:
+    """
+    Serve a video file, honouring conditional and range requests.
+
+    Args:
+        request: Incoming request (Range, If-Range, If-None-Match and
+            If-Modified-Since headers are checked)
+        path: Video file
+
+    Returns:
+        200, 206, 304 or 416 response, or None if the file does not exist
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    last_modified = formatdate(stat.st_mtime, usegmt=True)
+    headers = {
+        "accept-ranges": "bytes",
+        "etag": etag,
+        "last-modified": last_modified,
+        "cache-control": VIDEO_CACHE_CONTROL,
+    }
+    media_type = VIDEO_MEDIA_TYPES.get(path.suffix.lower(), "application/octet-stream")
+
+    if _not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if range_header and _if_range_matches(request.headers.get("if-range"), etag, last_modified):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return Response(
+                status_code=HTTP_416_RANGE_NOT_SATISFIABLE,
+                headers={**headers, "content-range": f"bytes */{size}"}
+            )
+
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    length = end - start + 1
+    headers["content-range"] = f"bytes {start}-{end}/{size}"
+    headers["content-length"] = str(length)
+    if request.method == "HEAD":
+        return Response(status_code=status.HTTP_206_PARTIAL_CONTENT, headers=headers, media_type=media_type)
+    return StreamingResponse(
+        _read_range(path, start, length),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        headers=headers,
+        media_type=media_type
+    )
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range.
+
+    Args:
+        header: Range header value, e.g. "bytes=0-1023", "bytes=1024-" or
+            "bytes=-500" (last 500 bytes)
+        size: File size
+
+    Returns:
+        Inclusive (start, end), or None if the header is not a single byte
+        range (the whole file is served instead)
+
+    Raises:
+        ValueError: If the range lies outside the file
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+
+    if not first:
+        # Suffix range: the last N bytes
+        if not last.isdigit():
+            return None
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise ValueError("empty suffix range")
+        return max(size - suffix, 0), size - 1
+
+    if not first.isdigit() or (last and not last.isdigit()):
+        return None
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range starts past the end of the file")
+    return start, end
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    """True if the client's cached copy (If-None-Match / If-Modified-Since) is current."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _if_range_matches(if_range: Optional[str], etag: str, last_modified: str) -> bool:
+    """True if a range may be served (no If-Range, or it names the current version)."""
+    return if_range is None or if_range.strip() in (etag, last_modified)
+
+
+def _read_range(path: Path, start: int, length: int) -> Iterator[bytes]:
+    """Read length bytes from start, in chunks (iterated in a worker thread)."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(RANGE_CHUNK_BYTES, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
@@ -9,6 +9,11 @@ class VideoUploadRequest(BaseModel):
     pass  # The actual file is uploaded via multipart/form-data
 
 
+class QueueConcurrencyRequest(BaseModel):
+    """Request model for changing the job concurrency limit."""
+    max_concurrent_jobs: int = Field(..., ge=1, description="Jobs processed at once (at most the analysis pool size)")
+
+
 class ProDataRequest(BaseModel):
     """Request model for pro/reference data."""
     video_id: str = Field(..., description="Pro video ID (e.g., T01, T06)")
@@ -2,7 +2,7 @@
 Response schemas for the SwingSymphony API.
 Matches the frontend TypeScript types in swingsymphony/types.ts.
 """
-from typing import List, Optional, Literal
+from typing import Dict, List, Optional, Literal, Union
 from pydantic import BaseModel, Field
 
 
@@ -66,6 +66,15 @@ class JobSubmitResponse(BaseModel):
         ..., description="Current job status"
     )
     message: str = Field(..., description="Status message")
+    deduplicated: bool = Field(
+        False, description="True if an identical video was already submitted and its job is returned"
+    )
+
+
+class StageTimingResponse(BaseModel):
+    """Time a job spent in one processing stage."""
+    wall_seconds: float = Field(..., description="Wall-clock seconds")
+    cpu_seconds: float = Field(..., description="CPU seconds")
 
 
 class JobStatusResponse(BaseModel):
@@ -76,8 +85,37 @@ class JobStatusResponse(BaseModel):
     )
     progress: int = Field(..., ge=0, le=100, description="Progress percentage")
     message: str = Field(..., description="Status message")
-    result: Optional["SwingDataResponse"] = Field(None, description="Analysis result when completed")
+    result: Optional[Union["SwingDataResponse", "CompactSwingDataResponse"]] = Field(
+        None, description="Analysis result when completed"
+    )
     error: Optional[str] = Field(None, description="Error message if failed")
+    stages: Optional[Dict[str, StageTimingResponse]] = Field(
+        None,
+        description="Time per stage so far (upload, decode, inference, kinematics, scoring, serialize)"
+    )
+
+
+class BatchSubmitResponse(BaseModel):
+    """Response when submitting several videos as a batch."""
+    batch_id: str = Field(..., description="Unique batch identifier")
+    jobs: List[JobSubmitResponse] = Field(..., description="One job per uploaded video, in upload order")
+
+
+class BatchStatusResponse(BaseModel):
+    """Aggregated status of a batch of jobs."""
+    batch_id: str = Field(..., description="Unique batch identifier")
+    status: Literal["pending", "processing", "completed"] = Field(
+        ..., description="completed once every job has completed or failed"
+    )
+    progress: int = Field(..., ge=0, le=100, description="Overall progress percentage")
+    total: int = Field(..., ge=0, description="Number of jobs")
+    pending: int = Field(..., ge=0, description="Jobs waiting in the queue")
+    processing: int = Field(..., ge=0, description="Jobs being processed")
+    completed: int = Field(..., ge=0, description="Jobs completed")
+    failed: int = Field(..., ge=0, description="Jobs failed")
+    jobs: List[JobStatusResponse] = Field(
+        ..., description="Per-job status without results (fetch results per job)"
+    )
 
 
 class SwingDataResponse(BaseModel):
@@ -111,6 +149,54 @@ class SwingDataResponse(BaseModel):
     velocityData: List[KineticDataPoint] = Field(..., description="Motion smoothness data")
 
 
+# ============== Compact (Array-Backed) Layout ==============
+
+class CompactPoseTrack(BaseModel):
+    """Pose sequence with joint names sent once and one flat array per frame.
+
+    Frame i has timestamp i / fps. Scores are sent at the coarsest level at
+    which they are constant: `score` for all joints and frames, `jointScores`
+    per joint, or `scores` per frame and joint.
+    """
+    joints: List[str] = Field(..., description="Joint names, in array order")
+    score: Optional[float] = Field(None, description="Confidence shared by every keypoint")
+    jointScores: Optional[List[float]] = Field(None, description="Per-joint confidence, constant over time")
+    scores: Optional[List[List[float]]] = Field(None, description="Per-frame, per-joint confidence")
+
+
+class CompactPoseTrack2D(CompactPoseTrack):
+    """Compact 2D pose sequence (17 COCO joints)."""
+    pose2d: List[List[List[float]]] = Field(..., description="(N, 17, 2) normalized x, y")
+
+
+class CompactPoseTrack3D(CompactPoseTrack):
+    """Compact 3D pose sequence (44 YOC44 joints)."""
+    pose3d: List[List[List[float]]] = Field(..., description="(N, 44, 3) normalized x, y, z")
+
+
+class CompactSwingDataResponse(BaseModel):
+    """Swing analysis result with array-backed pose data (`layout=compact`)."""
+    layout: Literal["compact"] = Field("compact", description="Payload layout")
+    id: str = Field(..., description="Swing ID")
+    userType: Literal["USER", "PRO"] = Field(..., description="User or Pro data")
+    videoUrl: Optional[str] = Field(None, description="URL to uploaded video")
+    duration: float = Field(..., gt=0, description="Duration in seconds")
+    model_code: Optional[str] = Field(None, description="Model code (T01, T02, etc.)")
+    hashtag: Optional[str] = Field(None, description="Model hashtag")
+
+    poseData: CompactPoseTrack2D = Field(..., description="2D COCO pose sequence")
+    poseData3D: CompactPoseTrack3D = Field(..., description="3D YOC44 pose sequence")
+
+    frames: int = Field(..., gt=0, description="Total number of frames")
+    fps: float = Field(..., gt=0, description="Frames per second")
+    impact_frame: int = Field(..., ge=0, description="Frame index of ball impact")
+
+    score: int = Field(..., ge=0, le=100, description="Overall harmony score 0-100")
+    feedback: str = Field(..., description="AI coach feedback")
+    rhythmTrack: List[RhythmNode] = Field(..., description="Kinetic chain sequence")
+    velocityData: List[KineticDataPoint] = Field(..., description="Motion smoothness data")
+
+
 class ProDataResponse(BaseModel):
     """Response for pro/reference data."""
     video_id: str = Field(..., description="Pro video ID")
@@ -122,6 +208,9 @@ class ProDataResponse(BaseModel):
     pose_3d: List[List[List[float]]] = Field(
         ..., description="3D pose data as (N, 44, 3) array"
     )
+    joints: Optional[List[str]] = Field(
+        None, description="YOC44 joint names in pose_3d order, when a joint subset was requested"
+    )
 
 
 # Forward reference resolution
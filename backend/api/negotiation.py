@@ -0,0 +1,76 @@
+"""
+Payload layout negotiation for pose endpoints.
+
+Clients choose the payload layout with the `layout` query parameter or the
+Accept header:
+- full (default): one object per keypoint, matching swingsymphony/types.ts
+- compact: flat per-frame arrays, joint names sent once, constant scores
+  collapsed (Accept: application/vnd.swingsymphony.compact+json)
+
+Binary wire formats (Accept: application/octet-stream or application/msgpack)
+are described in api/binary_format.py.
+"""
+from typing import Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from api.binary_format import resolve_binary_format
+from services.swing_result import LAYOUT_COMPACT, LAYOUT_FULL
+
+
+COMPACT_MEDIA_TYPE = "application/vnd.swingsymphony.compact+json"
+
+LAYOUTS = (LAYOUT_FULL, LAYOUT_COMPACT)
+
+
+def resolve_layout(request: Request, layout: Optional[str] = None) -> str:
+    """
+    Pick the payload layout for a request.
+
+    Args:
+        request: Incoming request (Accept header is checked)
+        layout: Explicit `layout` query parameter, which takes precedence
+
+    Returns:
+        LAYOUT_FULL or LAYOUT_COMPACT
+    """
+    if layout in LAYOUTS:
+        return layout
+    if COMPACT_MEDIA_TYPE in request.headers.get("accept", ""):
+        return LAYOUT_COMPACT
+    return LAYOUT_FULL
+
+
+def resolve_wire_format(request: Request, dtype: Optional[str] = None) -> Optional[Tuple[str, str]]:
+    """
+    Check whether the client asked for a binary wire format.
+
+    Args:
+        request: Incoming request (Accept header is checked)
+        dtype: Explicit `dtype` query parameter, which takes precedence over
+            a `dtype=` parameter in the Accept header
+
+    Returns:
+        (media_type, dtype) for binary responses, or None for JSON
+    """
+    binary = resolve_binary_format(request.headers.get("accept", ""))
+    if binary is None:
+        return None
+    media_type, accept_dtype = binary
+    return media_type, dtype or accept_dtype or "float32"
+
+
+def encode_payload(payload: BaseModel, layout: str) -> bytes:
+    """
+    Encode a response model to JSON bytes.
+
+    The compact layout omits null fields, so unused score fields are not sent.
+    """
+    return payload.model_dump_json(exclude_none=(layout == LAYOUT_COMPACT)).encode()
+
+
+def json_response(body: bytes) -> Response:
+    """Wrap encoded JSON in a response that varies on the Accept header."""
+    return Response(content=body, media_type="application/json", headers={"Vary": "Accept"})
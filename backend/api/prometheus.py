@@ -0,0 +1,388 @@
+"""
+Prometheus Metrics.
+
+GET /metrics serves the Prometheus text exposition format (version 0.0.4):
+- per-route request counts, latency and response size histograms, recorded
+  by RequestMetricsMiddleware
+- job queue depth, status counts, queue wait, processing and per-stage times
+- pro data and response cache hits, misses and hit ratios
+- analysis executor load
+- event-loop lag, sampled by EventLoopMonitor
+
+Everything is recorded on the event loop into preallocated counters
+(LatencyHistogram), so recording takes no locks and allocates nothing
+beyond a few numbers per request. Routes are labelled by their path
+template (/api/v1/jobs/{job_id}), which keeps the number of series bounded.
+"""
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from services.job_queue import get_job_queue
+from services.metrics import LatencyHistogram
+
+
+# Content type of the text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Prefix of every metric name
+METRIC_PREFIX = "swingsymphony_"
+
+# Route label of requests that matched no route
+UNMATCHED_ROUTE = "unmatched"
+
+# Request latency bucket bounds in seconds
+REQUEST_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Response size bucket bounds in bytes: 256 B to 64 MB, x4 each
+RESPONSE_SIZE_BUCKETS = tuple(256 * 4 ** i for i in range(10))
+
+# Event-loop lag bucket bounds in seconds
+LOOP_LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# How often the event-loop lag is sampled
+LOOP_LAG_INTERVAL_SECONDS = 0.5
+
+# Job histograms (services.metrics.DEFAULT_BUCKETS, 25% apart) are exported
+# with every 4th bound, i.e. buckets ~2.4x apart
+JOB_BUCKET_STEP = 4
+
+
+class RouteMetrics:
+    """Request counters of one route and method."""
+
+    def __init__(self):
+        self.latency = LatencyHistogram(REQUEST_LATENCY_BUCKETS)
+        self.sizes = LatencyHistogram(RESPONSE_SIZE_BUCKETS)
+        # Status code -> number of responses
+        self.responses: Dict[int, int] = {}
+
+
+class RequestMetrics:
+    """Per-route request statistics, filled by RequestMetricsMiddleware."""
+
+    def __init__(self):
+        # Route path template -> method -> RouteMetrics
+        self.routes: Dict[str, Dict[str, RouteMetrics]] = {}
+        self.in_flight = 0
+        self._endpoint_paths: Optional[Dict[object, str]] = None
+        self._static_paths: Dict[str, str] = {}
+
+    def observe(self, scope: Scope, status_code: int, size: int, seconds: float):
+        """Record one finished request."""
+        path = self._route_path(scope)
+        methods = self.routes.get(path)
+        if methods is None:
+            methods = self.routes[path] = {}
+        route = methods.get(scope["method"])
+        if route is None:
+            route = methods[scope["method"]] = RouteMetrics()
+        route.latency.observe(seconds)
+        route.sizes.observe(size)
+        route.responses[status_code] = route.responses.get(status_code, 0) + 1
+
+    def _route_path(self, scope: Scope) -> str:
+        """Path template of the route that handled a request."""
+        route = scope.get("route")
+        if route is not None:
+            return route.path
+        if self._endpoint_paths is None:
+            self._index_routes(scope["app"].routes)
+        # Older Starlette versions only record the endpoint; requests
+        # rejected before routing (e.g. oversized uploads) have neither
+        path = self._endpoint_paths.get(scope.get("endpoint"))
+        if path is None:
+            path = self._static_paths.get(scope["path"], UNMATCHED_ROUTE)
+        return path
+
+    def _index_routes(self, routes: Iterable):
+        """Map endpoints and parameterless paths to their route paths (once)."""
+        self._endpoint_paths = {}
+        for route in routes:
+            path = getattr(route, "path", None)
+            if path is None:
+                continue
+            endpoint = getattr(route, "endpoint", None)
+            if endpoint is not None:
+                self._endpoint_paths[endpoint] = path
+            if "{" not in path:
+                self._static_paths[path] = path
+
+
+class RequestMetricsMiddleware:
+    """
+    Record latency, response size and status of every HTTP request.
+
+    Latency runs until the last body chunk is sent, so streamed responses
+    (results, videos, SSE) count their whole transfer.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics):
+        """
+        Args:
+            app: Wrapped ASGI app
+            metrics: Where requests are recorded
+        """
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        size = 0
+
+        async def measuring_send(message: Message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        self.metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, measuring_send)
+        finally:
+            self.metrics.in_flight -= 1
+            self.metrics.observe(scope, status_code, size, time.perf_counter() - started)
+
+
+class EventLoopMonitor:
+    """
+    Samples event-loop lag: how late a timer set for every interval fires.
+
+    A lag of more than a few milliseconds means something blocked the loop
+    (synchronous work in a request handler or callback).
+    """
+
+    def __init__(self, interval_seconds: float = LOOP_LAG_INTERVAL_SECONDS):
+        """
+        Args:
+            interval_seconds: Time between samples
+        """
+        self.interval_seconds = interval_seconds
+        self.lag = LatencyHistogram(LOOP_LAG_BUCKETS)
+        self.last_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start sampling (call on the event loop)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        """Sleep for the interval and record how much later than that the loop woke up."""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            self.last_lag = max(loop.time() - expected, 0.0)
+            self.lag.observe(self.last_lag)
+
+
+class PrometheusWriter:
+    """Builds a text exposition, one metric family at a time."""
+
+    def __init__(self):
+        self._lines: List[str] = []
+
+    def family(self, name: str, kind: str, help_text: str):
+        """Start a metric family (kind: counter, gauge or histogram)."""
+        self._lines.append(f"# HELP {METRIC_PREFIX}{name} {help_text}")
+        self._lines.append(f"# TYPE {METRIC_PREFIX}{name} {kind}")
+
+    def sample(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+        """Write one sample of the current family."""
+        self._lines.append(f"{METRIC_PREFIX}{name}{_format_labels(labels)} {_format_value(value)}")
+
+    def histogram(
+        self,
+        name: str,
+        histogram: LatencyHistogram,
+        labels: Optional[Dict[str, str]] = None,
+        step: int = 1
+    ):
+        """
+        Write a histogram's cumulative buckets, sum and count.
+
+        Args:
+            name: Family name (without _bucket/_sum/_count)
+            histogram: Recorded values
+            labels: Series labels
+            step: Export every step-th bucket bound only (cumulative
+                counts stay exact at the exported bounds)
+        """
+        labels = labels or {}
+        cumulative = 0
+        last = len(histogram.bounds) - 1
+        for idx, bound in enumerate(histogram.bounds):
+            cumulative += histogram.counts[idx]
+            if (idx + 1) % step == 0 or idx == last:
+                self.sample(f"{name}_bucket", cumulative, {**labels, "le": f"{bound:g}"})
+        self.sample(f"{name}_bucket", histogram.count, {**labels, "le": "+Inf"})
+        self.sample(f"{name}_sum", histogram.sum, labels)
+        self.sample(f"{name}_count", histogram.count, labels)
+
+    def render(self) -> str:
+        """The exposition text."""
+        return "\n".join(self._lines) + "\n"
+
+
+def render_metrics(app: FastAPI) -> str:
+    """
+    Collect all metrics of this process in Prometheus text format.
+
+    Args:
+        app: The application (its state holds the request metrics, loop
+            monitor, executor and caches)
+
+    Returns:
+        Exposition text
+    """
+    writer = PrometheusWriter()
+    _write_request_metrics(writer, app.state.request_metrics)
+    _write_job_metrics(writer)
+    _write_executor_metrics(writer, app.state.executor.get_stats())
+    _write_cache_metrics(writer, {
+        "pro_data": app.state.yoc44_service.get_cache_stats(),
+        "response": app.state.response_cache.get_stats(),
+    })
+
+    monitor: EventLoopMonitor = app.state.loop_monitor
+    writer.family("event_loop_lag_seconds", "histogram", "Delay of event-loop timers past their due time.")
+    writer.histogram("event_loop_lag_seconds", monitor.lag)
+    writer.family("event_loop_lag_last_seconds", "gauge", "Most recently sampled event-loop lag.")
+    writer.sample("event_loop_lag_last_seconds", monitor.last_lag)
+    return writer.render()
+
+
+def _write_request_metrics(writer: PrometheusWriter, metrics: RequestMetrics):
+    """HTTP request counts, latency and response sizes per route."""
+    routes = [
+        ({"route": path, "method": method}, route)
+        for path, methods in sorted(metrics.routes.items())
+        for method, route in sorted(methods.items())
+    ]
+
+    writer.family("http_requests_total", "counter", "HTTP responses by route, method and status code.")
+    for labels, route in routes:
+        for status_code, count in sorted(route.responses.items()):
+            writer.sample("http_requests_total", count, {**labels, "status": str(status_code)})
+
+    writer.family("http_request_duration_seconds", "histogram", "Time from request start to the last response byte.")
+    for labels, route in routes:
+        writer.histogram("http_request_duration_seconds", route.latency, labels)
+
+    writer.family("http_response_size_bytes", "histogram", "Response body size.")
+    for labels, route in routes:
+        writer.histogram("http_response_size_bytes", route.sizes, labels)
+
+    writer.family("http_requests_in_flight", "gauge", "Requests being handled.")
+    writer.sample("http_requests_in_flight", metrics.in_flight)
+
+
+def _write_job_metrics(writer: PrometheusWriter):
+    """Job queue depth, status counts and timing histograms."""
+    queue = get_job_queue()
+    stats = queue.get_stats()
+    histograms = queue.get_histograms()
+
+    writer.family("jobs", "gauge", "Jobs by status (all processes with a shared queue).")
+    for status in ("pending", "processing", "completed", "failed"):
+        writer.sample("jobs", stats[status], {"status": status})
+
+    writer.family("job_queue_depth", "gauge", "Pending jobs by priority.")
+    for priority, priority_stats in stats["priorities"].items():
+        writer.sample("job_queue_depth", priority_stats["queued"], {"priority": priority})
+
+    writer.family("job_oldest_pending_age_seconds", "gauge", "Age of the oldest pending job.")
+    writer.sample("job_oldest_pending_age_seconds", stats["oldest_pending_age"])
+
+    writer.family("jobs_running", "gauge", "Jobs running in this process.")
+    writer.sample("jobs_running", stats["running"])
+
+    writer.family("job_max_concurrent", "gauge", "Jobs this process runs at once.")
+    writer.sample("job_max_concurrent", stats["max_concurrent_jobs"])
+
+    writer.family("jobs_finished_total", "counter", "Jobs finished by this process, by outcome.")
+    for status, total in histograms["finished"].items():
+        writer.sample("jobs_finished_total", total, {"status": status})
+
+    writer.family("job_queue_wait_seconds", "histogram", "Time from submission to start, by priority.")
+    for priority, histogram in histograms["wait"].items():
+        writer.histogram("job_queue_wait_seconds", histogram, {"priority": priority}, JOB_BUCKET_STEP)
+
+    writer.family("job_processing_seconds", "histogram", "Time from start to completion or failure.")
+    writer.histogram("job_processing_seconds", histograms["processing"], step=JOB_BUCKET_STEP)
+
+    writer.family("job_stage_seconds", "histogram", "Wall-clock time per stage of completed jobs.")
+    for stage, histogram in histograms["stages"].items():
+        writer.histogram("job_stage_seconds", histogram, {"stage": stage}, JOB_BUCKET_STEP)
+
+    writer.family("job_stage_cpu_seconds_total", "counter", "CPU time per stage of completed jobs.")
+    for stage, seconds in histograms["stage_cpu_seconds"].items():
+        writer.sample("job_stage_cpu_seconds_total", seconds, {"stage": stage})
+
+
+def _write_executor_metrics(writer: PrometheusWriter, stats: dict):
+    """Analysis pool load."""
+    writer.family("executor_workers", "gauge", "Analysis pool size.")
+    writer.sample("executor_workers", stats["max_workers"], {"mode": stats["mode"]})
+
+    writer.family("executor_active", "gauge", "Analyses running in the pool.")
+    writer.sample("executor_active", stats["active"])
+
+    writer.family("executor_tasks_total", "counter", "Analyses finished by the pool, by outcome.")
+    writer.sample("executor_tasks_total", stats["completed"], {"status": "completed"})
+    writer.sample("executor_tasks_total", stats["failed"], {"status": "failed"})
+
+
+def _write_cache_metrics(writer: PrometheusWriter, caches: Dict[str, dict]):
+    """Hits, misses, hit ratio and size of each cache."""
+    for name, kind, key, help_text in (
+        ("cache_hits_total", "counter", "hits", "Cache lookups that found an entry."),
+        ("cache_misses_total", "counter", "misses", "Cache lookups that found nothing."),
+        ("cache_evictions_total", "counter", "evictions", "Entries evicted to stay within budget."),
+        ("cache_hit_ratio", "gauge", "hit_ratio", "Hits over lookups since startup."),
+        ("cache_bytes", "gauge", "bytes", "Size of cached entries."),
+        ("cache_max_bytes", "gauge", "max_bytes", "Cache budget."),
+    ):
+        writer.family(name, kind, help_text)
+        for cache, stats in caches.items():
+            writer.sample(name, stats[key], {"cache": cache})
+
+
+def _format_labels(labels: Optional[Dict[str, str]]) -> str:
+    """{name="value",...} with escaped values ("" without labels)."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    """Integers as is, floats in full precision."""
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
@@ -3,80 +3,124 @@ Video analysis API routes.
 
 Handles video upload and swing analysis.
 """
-import os
-import shutil
+import uuid
 from pathlib import Path
-from typing import Optional
+from typing import List, Tuple
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request, status
+from fastapi.responses import Response
 
 from api.models.requests import VideoUploadRequest
-from api.models.responses import JobSubmitResponse
-from services.job_queue import get_job_queue
+from api.media import video_response
+from api.models.responses import BatchSubmitResponse, JobSubmitResponse
+from api.uploads import EXTENSION_CONTAINERS, UploadInfo, save_upload
+from services.job_queue import JobPriority, get_job_queue
 
 
 router = APIRouter(prefix="/api/v1", tags=["analyze"])
 
-# Storage paths
+# Storage path (results are written by the ResultStore, see RESULTS_DIR in main.py)
 UPLOAD_DIR = Path(__file__).parent.parent.parent / "storage" / "uploaded"
-RESULTS_DIR = Path(__file__).parent.parent.parent / "storage" / "results"
 
-# Ensure directories exist
+# Ensure directory exists
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-RESULTS_DIR.mkdir(parents=True, exist_ok=True)
 
+# Most videos accepted by one batch submission
+MAX_BATCH_VIDEOS = 50
 
-@router.post("/analyze", response_model=JobSubmitResponse, status_code=status.HTTP_202_ACCEPTED)
-async def submit_analysis(
-    video: UploadFile = File(..., description="Video file to analyze")
-) -> JobSubmitResponse:
+
+async def save_video(request: Request, video: UploadFile) -> Tuple[str, UploadInfo]:
     """
-    Submit a video for swing analysis.
+    Validate an uploaded video and save it under a new swing ID.
 
-    Uploads a tennis swing video and queues it for processing.
-    Returns a job ID that can be used to poll for results.
+    Args:
+        request: Incoming request (for the upload size limit)
+        video: Uploaded file
+
+    Returns:
+        (swing_id, upload info)
 
-    Accepted formats: mp4, mov, avi, webm
-    Max file size: 100MB
+    Raises:
+        HTTPException: 400 on an unsupported extension, 413/415 from
+            save_upload(), 500 if the file cannot be written
     """
-    # Validate file type
-    allowed_extensions = {".mp4", ".mov", ".avi", ".webm"}
+    # Validate file type (the content is checked while saving)
     file_ext = Path(video.filename).suffix.lower() if video.filename else ""
 
-    if file_ext not in allowed_extensions:
+    if file_ext not in EXTENSION_CONTAINERS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid file type. Allowed: {', '.join(allowed_extensions)}"
+            detail=f"Invalid file type. Allowed: {', '.join(EXTENSION_CONTAINERS)}"
         )
 
-    # Validate file size (approximate check before reading)
-    # Note: FastAPI handles this via content-length header
-
     # Generate unique swing ID
-    import uuid
     swing_id = f"swing-{uuid.uuid4().hex[:8]}"
 
     # Save uploaded file
     video_path = UPLOAD_DIR / f"{swing_id}{file_ext}"
 
+    # Stream to disk off the event loop, enforcing size and container type
     try:
-        with open(video_path, "wb") as buffer:
-            shutil.copyfileobj(video.file, buffer)
+        upload = await save_upload(video, video_path, request.app.state.max_upload_bytes)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to save video: {str(e)}"
         )
+    print(f"Upload saved: {video_path.name} ({upload.container}, {upload.size} bytes)")
+    return swing_id, upload
 
-    # Submit job to queue
-    queue = get_job_queue()
-    job = await queue.submit_job(
-        video_path=str(video_path),
+
+@router.post("/analyze", response_model=JobSubmitResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_analysis(
+    request: Request,
+    video: UploadFile = File(..., description="Video file to analyze"),
+    priority: JobPriority = Form(
+        JobPriority.INTERACTIVE,
+        description="Scheduling class: interactive (default), bulk or background"
+    )
+) -> JobSubmitResponse:
+    """
+    Submit a video for swing analysis.
+
+    Uploads a tennis swing video and queues it for processing.
+    Returns a job ID that can be used to poll for results.
+
+    Accepted formats: mp4, mov, avi, webm (checked against the file content)
+    Max file size: MAX_UPLOAD_SIZE_MB (default 100MB)
+
+    Interactive jobs run ahead of bulk and background jobs.
+
+    Re-uploading a video with identical content returns the existing job
+    (queued, running or completed) with `deduplicated: true` instead of
+    analyzing it again.
+    """
+    swing_id, upload = await save_video(request, video)
+
+    # Submit job to queue (or get the existing job for identical content)
+    job = await get_job_queue().submit_job(
+        video_path=str(upload.path),
         swing_id=swing_id,
-        user_type="USER"
+        user_type="USER",
+        priority=priority,
+        content_hash=upload.content_hash,
+        timings=upload.timings()
     )
 
+    # Identical content: reuse the existing job and drop the new copy
+    if job.swing_id != swing_id:
+        upload.path.unlink(missing_ok=True)
+        return JobSubmitResponse(
+            job_id=job.job_id,
+            status=job.status.value,
+            message=f"Identical video already submitted (Job ID: {job.job_id})",
+            deduplicated=True
+        )
+
+    request.app.state.video_index.add(swing_id, upload.path)
+
     return JobSubmitResponse(
         job_id=job.job_id,
         status=job.status.value,
@@ -84,24 +128,85 @@ async def submit_analysis(
     )
 
 
-@router.get("/videos/{swing_id}")
-async def get_video(swing_id: str) -> FileResponse:
+@router.post(
+    "/analyze/batch",
+    response_model=BatchSubmitResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def submit_batch_analysis(
+    request: Request,
+    videos: List[UploadFile] = File(..., description="Video files to analyze"),
+    priority: JobPriority = Form(
+        JobPriority.BULK,
+        description="Scheduling class: bulk (default), interactive or background"
+    )
+) -> BatchSubmitResponse:
     """
-    Get an uploaded video file by swing ID.
+    Submit several videos (e.g. a coaching session) in one request.
+
+    Every file is validated like in `POST /analyze`; if any is rejected, the
+    whole batch is. The jobs are queued in one operation and can be followed
+    together with `GET /batches/{batch_id}`. Videos identical to an existing
+    job (or to another video of the batch) reuse that job.
 
-    Returns the video file for playback in the frontend.
+    At most MAX_BATCH_VIDEOS (50) files per batch.
     """
-    # Find the video file (try common extensions)
-    for ext in [".mp4", ".mov", ".avi", ".webm"]:
-        video_path = UPLOAD_DIR / f"{swing_id}{ext}"
-        if video_path.exists():
-            return FileResponse(
-                path=video_path,
-                media_type="video/mp4",
-                filename=f"{swing_id}{ext}"
-            )
-
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail=f"Video not found: {swing_id}"
+    if len(videos) > MAX_BATCH_VIDEOS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many videos: {len(videos)} (max {MAX_BATCH_VIDEOS} per batch)"
+        )
+
+    saved: List[Tuple[str, UploadInfo]] = []
+    try:
+        for video in videos:
+            saved.append(await save_video(request, video))
+    except BaseException:
+        for _, upload in saved:
+            upload.path.unlink(missing_ok=True)
+        raise
+
+    queue = get_job_queue()
+    batch_id, jobs = await queue.submit_batch(
+        [(str(upload.path), swing_id, upload.content_hash, upload.timings()) for swing_id, upload in saved],
+        user_type="USER",
+        priority=priority
     )
+
+    responses = []
+    for (swing_id, upload), job in zip(saved, jobs):
+        deduplicated = job.swing_id != swing_id
+        if deduplicated:
+            upload.path.unlink(missing_ok=True)
+        else:
+            request.app.state.video_index.add(swing_id, upload.path)
+        message = "Identical video already submitted" if deduplicated else "Video uploaded for analysis"
+        responses.append(JobSubmitResponse(
+            job_id=job.job_id,
+            status=job.status.value,
+            message=f"{message} (Job ID: {job.job_id})",
+            deduplicated=deduplicated
+        ))
+
+    return BatchSubmitResponse(batch_id=batch_id, jobs=responses)
+
+
+@router.api_route("/videos/{swing_id}", methods=["GET", "HEAD"])
+async def get_video(swing_id: str, request: Request) -> Response:
+    """
+    Get an uploaded video file by swing ID.
+
+    Returns the video for playback in the frontend with its actual content
+    type. Supports byte ranges (206) for seeking, and ETag/Last-Modified
+    revalidation (304).
+    """
+    index = request.app.state.video_index
+    video_path = index.get(swing_id)
+    response = video_response(request, video_path) if video_path is not None else None
+    if response is None:
+        index.discard(swing_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Video not found: {swing_id}"
+        )
+    return response
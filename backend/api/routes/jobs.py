@@ -3,24 +3,189 @@ Job status API routes.
 
 Handles job status queries and pro data retrieval.
 """
-from typing import Optional
+import asyncio
+import json
+from pathlib import Path
+from typing import AsyncIterator, Iterator, Optional
 
-from fastapi import APIRouter, HTTPException, status, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import Response, StreamingResponse
 
-from api.models.requests import ProDataRequest
-from api.models.responses import JobStatusResponse, ProDataResponse
-from services.job_queue import get_job_queue
+from api.binary_format import binary_response
+from api.models.requests import QueueConcurrencyRequest
+from api.models.responses import BatchStatusResponse, JobStatusResponse, ProDataResponse
+from api.negotiation import encode_payload, json_response, resolve_layout, resolve_wire_format
+from services.job_queue import JobStatus, get_job_queue
+from services.pose_selection import PoseSelection
+from services.swing_result import LAYOUT_COMPACT, LAYOUT_FULL
 
 
 router = APIRouter(prefix="/api/v1", tags=["jobs"])
 
 
+LAYOUT_QUERY = Query(
+    None,
+    pattern="^(full|compact)$",
+    description="Payload layout: full (default) or compact (array-backed)"
+)
+
+
+# Seconds between SSE keep-alive comments while a job is idle
+EVENTS_KEEPALIVE_SECONDS = 15.0
+
+# Read size when streaming stored results from disk
+STREAM_CHUNK_BYTES = 256 * 1024
+
+
+DTYPE_QUERY = Query(
+    None,
+    pattern="^(float32|float16)$",
+    description="Buffer dtype for binary responses (Accept: application/octet-stream)"
+)
+
+
+def pose_selection(
+    stride: Optional[int] = Query(None, ge=1, description="Keep every n-th frame"),
+    max_frames: Optional[int] = Query(
+        None, ge=1, description="Maximum number of frames (stride is raised to fit)"
+    ),
+    window: Optional[str] = Query(
+        None,
+        pattern=r"^-?\d+:-?\d+$",
+        description="Frame range start:stop relative to impact_frame, e.g. -45:15"
+    ),
+    joints: Optional[str] = Query(
+        None, description="Comma-separated joint names or YOC44 indices to keep"
+    )
+) -> PoseSelection:
+    """Parse the frame/joint selection query parameters."""
+    try:
+        return PoseSelection.parse(stride, max_frames, window, joints)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def select_result(selection: PoseSelection, result):
+    """Apply a selection to a SwingResult, mapping empty selections to 400."""
+    try:
+        return selection.apply(result)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def check_selection_layout(selection: PoseSelection, layout: str):
+    """Reject joint subsets for the full layout, which always has 17/44 keypoints."""
+    if selection.joints is not None and layout == LAYOUT_FULL:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="joints requires layout=compact or a binary format"
+        )
+
+
+async def job_status_response(
+    job,
+    request: Request,
+    layout: Optional[str],
+    dtype: Optional[str] = None,
+    selection: Optional[PoseSelection] = None
+) -> Response:
+    """Encode a job's status in the negotiated layout or wire format.
+
+    Binary formats are only used once the job has a result; until then the
+    JSON status is returned. Results spilled to the result store are
+    streamed from their encoded file when the whole result is requested.
+    """
+    selection = selection or PoseSelection()
+
+    wire_format = resolve_wire_format(request, dtype)
+    if wire_format is not None and job.has_result:
+        media_type, wire_dtype = wire_format
+        result = select_result(selection, await asyncio.to_thread(lambda: job.result))
+        result_header, arrays = result.to_wire()
+        header = {
+            "job_id": job.job_id,
+            "status": job.status.value,
+            "progress": job.progress,
+            "message": job.message,
+            "result": result_header,
+            "stages": job.timings.to_dict() or None,
+        }
+        return binary_response(header, arrays, media_type, wire_dtype)
+
+    layout = resolve_layout(request, layout)
+    check_selection_layout(selection, layout)
+
+    results = get_job_queue().results
+    if job.result_path is not None and results is not None and selection.is_identity:
+        payload_path = await asyncio.to_thread(results.payload_path, job.result_path, layout)
+        return stored_result_response(job, payload_path, layout)
+
+    # Loading the result from disk and encoding it are blocking: run them in a thread
+    try:
+        body = await asyncio.to_thread(
+            lambda: encode_payload(job.to_response(layout, selection), layout)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return json_response(body)
+
+
+def stored_result_response(job, payload_path: Path, layout: str) -> StreamingResponse:
+    """Stream a job status whose result payload is read straight from disk.
+
+    The JobStatusResponse envelope is written around the stored bytes, with
+    the same field order and null handling as encode_payload.
+    """
+    envelope = json.dumps(
+        {
+            "job_id": job.job_id,
+            "status": job.status.value,
+            "progress": job.progress,
+            "message": job.message,
+        },
+        separators=(",", ":"),
+        ensure_ascii=False
+    )
+    prefix = (envelope[:-1] + ',"result":').encode()
+    fields = {"error": job.error, "stages": job.timings.to_dict() or None}
+    if layout == LAYOUT_COMPACT:
+        fields = {name: value for name, value in fields.items() if value is not None}
+    suffix = "".join(
+        f',"{name}":{json.dumps(value, separators=(",", ":"), ensure_ascii=False)}'
+        for name, value in fields.items()
+    ).encode() + b"}"
+
+    size = payload_path.stat().st_size
+
+    def body() -> Iterator[bytes]:
+        yield prefix
+        with open(payload_path, "rb") as f:
+            while chunk := f.read(STREAM_CHUNK_BYTES):
+                yield chunk
+        yield suffix
+
+    return StreamingResponse(
+        body(),
+        media_type="application/json",
+        headers={"Content-Length": str(len(prefix) + size + len(suffix)), "Vary": "Accept"}
+    )
+
+
 @router.get("/jobs/{job_id}", response_model=JobStatusResponse)
-async def get_job_status(job_id: str) -> JobStatusResponse:
+async def get_job_status(
+    job_id: str,
+    request: Request,
+    layout: Optional[str] = LAYOUT_QUERY,
+    dtype: Optional[str] = DTYPE_QUERY,
+    selection: PoseSelection = Depends(pose_selection)
+) -> Response:
     """
     Get the status of an analysis job.
 
     Poll this endpoint to check job progress and retrieve results when complete.
+    Use `layout=compact` for array-backed pose data, or
+    `Accept: application/octet-stream` for raw pose buffers. `stride`,
+    `max_frames`, `window` and `joints` return part of the result.
     """
     queue = get_job_queue()
     job = await queue.get_job(job_id)
@@ -31,14 +196,18 @@ async def get_job_status(job_id: str) -> JobStatusResponse:
             detail=f"Job not found: {job_id}"
         )
 
-    return job.to_response()
+    return await job_status_response(job, request, layout, dtype, selection)
 
 
 @router.get("/jobs/{job_id}/wait", response_model=JobStatusResponse)
 async def wait_for_job(
     job_id: str,
-    timeout: Optional[float] = Query(30.0, description="Max wait time in seconds")
-) -> JobStatusResponse:
+    request: Request,
+    timeout: Optional[float] = Query(30.0, ge=0, description="Max wait time in seconds"),
+    layout: Optional[str] = LAYOUT_QUERY,
+    dtype: Optional[str] = DTYPE_QUERY,
+    selection: PoseSelection = Depends(pose_selection)
+) -> Response:
     """
     Wait for a job to complete (long polling).
 
@@ -47,8 +216,42 @@ async def wait_for_job(
 
     Returns as soon as the job completes or times out.
     """
-    import asyncio
+    queue = get_job_queue()
+    job = await queue.get_job(job_id)
+
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job not found: {job_id}"
+        )
+
+    # Sleep until the queue signals completion (or the timeout expires)
+    await job.wait(timeout)
+
+    return await job_status_response(job, request, layout, dtype, selection)
+
+
+def sse_event(event: str, data: bytes) -> bytes:
+    """Format one Server-Sent Event (data must be single-line JSON)."""
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    request: Request,
+    layout: Optional[str] = LAYOUT_QUERY,
+    selection: PoseSelection = Depends(pose_selection)
+) -> StreamingResponse:
+    """
+    Stream job progress as Server-Sent Events.
 
+    Sends a `progress` event ({status, progress, message}) with the current
+    state and then on every update, and a single `result` event with the
+    full job status (in the requested layout) when the job completes or
+    fails (or an `error` event if the selection does not fit the result).
+    The stream then closes. Replaces polling /jobs/{job_id}.
+    """
     queue = get_job_queue()
     job = await queue.get_job(job_id)
 
@@ -58,25 +261,91 @@ async def wait_for_job(
             detail=f"Job not found: {job_id}"
         )
 
-    # Wait for completion or timeout
-    start_time = asyncio.get_event_loop().time()
-    check_interval = 0.5  # Check every 500ms
-
-    while job.status.value in ["pending", "processing"]:
-        elapsed = asyncio.get_event_loop().time() - start_time
-        if elapsed >= timeout:
-            break
-
-        await asyncio.sleep(check_interval)
-        # Refresh job from queue
-        job = await queue.get_job(job_id)
-        if job is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Job not found: {job_id}"
-            )
+    layout = resolve_layout(request, layout)
+    check_selection_layout(selection, layout)
+
+    async def events() -> AsyncIterator[bytes]:
+        updates = job.subscribe()
+        try:
+            yield sse_event("progress", json.dumps(job.progress_event()).encode())
+            while not job.is_finished:
+                try:
+                    event = await asyncio.wait_for(updates.get(), EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                yield sse_event("progress", json.dumps(event).encode())
+
+            try:
+                body = await asyncio.to_thread(
+                    lambda: encode_payload(job.to_response(layout, selection), layout)
+                )
+            except ValueError as e:
+                # Selection does not fit the result (e.g. window outside it)
+                yield sse_event("error", json.dumps({"detail": str(e)}).encode())
+            else:
+                yield sse_event("result", body)
+        finally:
+            job.unsubscribe(updates)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/batches/{batch_id}", response_model=BatchStatusResponse)
+async def get_batch_status(batch_id: str) -> BatchStatusResponse:
+    """
+    Get the aggregated status of a batch submitted with `POST /analyze/batch`.
+
+    Progress counts finished (completed or failed) jobs as 100%. Per-job
+    entries carry no results; fetch them with `GET /jobs/{job_id}`.
+    """
+    queue = get_job_queue()
+    jobs = await queue.get_batch(batch_id)
+
+    if jobs is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Batch not found: {batch_id}"
+        )
 
-    return job.to_response()
+    counts = {job_status: 0 for job_status in JobStatus}
+    for job in jobs:
+        counts[job.status] += 1
+    finished = counts[JobStatus.COMPLETED] + counts[JobStatus.FAILED]
+
+    if finished == len(jobs):
+        batch_status = "completed"
+    elif counts[JobStatus.PENDING] == len(jobs):
+        batch_status = "pending"
+    else:
+        batch_status = "processing"
+    progress = sum(100 if job.is_finished else job.progress for job in jobs)
+
+    return BatchStatusResponse(
+        batch_id=batch_id,
+        status=batch_status,
+        progress=round(progress / len(jobs)) if jobs else 100,
+        total=len(jobs),
+        pending=counts[JobStatus.PENDING],
+        processing=counts[JobStatus.PROCESSING],
+        completed=counts[JobStatus.COMPLETED],
+        failed=counts[JobStatus.FAILED],
+        jobs=[
+            JobStatusResponse(
+                job_id=job.job_id,
+                status=job.status.value,
+                progress=job.progress,
+                message=job.message,
+                error=job.error,
+                stages=job.timings.to_dict() or None
+            )
+            for job in jobs
+        ]
+    )
 
 
 @router.get("/models")
@@ -92,15 +361,28 @@ async def list_models(request: Request):
 
 
 @router.get("/models/{model_code}")
-async def get_model_data(model_code: str, request: Request):
+async def get_model_data(
+    model_code: str,
+    request: Request,
+    layout: Optional[str] = LAYOUT_QUERY,
+    dtype: Optional[str] = DTYPE_QUERY,
+    selection: PoseSelection = Depends(pose_selection)
+) -> Response:
     """
     Get full swing data for a specific model.
 
     Returns complete analysis data including 3D pose, rhythm, and metrics.
+    Use `layout=compact` for array-backed pose data, or
+    `Accept: application/octet-stream` for raw pose buffers. `stride`,
+    `max_frames`, `window` (relative to impact_frame) and `joints` return a
+    decimated, windowed or joint-subset sequence. The encoded JSON response is
+    cached per model, data version, layout and selection; only the swing ID
+    differs between requests.
     """
     import uuid
 
     yoc44_service = request.app.state.yoc44_service
+    response_cache = request.app.state.response_cache
 
     # Check if model exists
     metadata = yoc44_service.get_model_metadata(model_code)
@@ -110,42 +392,132 @@ async def get_model_data(model_code: str, request: Request):
             detail=f"Model not found: {model_code}"
         )
 
-    # Generate swing data for this model
     swing_id = f"model-{model_code.lower()}-{uuid.uuid4().hex[:6]}"
-    result = await yoc44_service.analyze_video(
-        video_path="",
-        swing_id=swing_id,
-        user_type="PRO",
-        model_code=model_code
+
+    wire_format = resolve_wire_format(request, dtype)
+    if wire_format is not None:
+        media_type, wire_dtype = wire_format
+        # Loading and analyzing the model on a miss is CPU-bound: keep it off the event loop
+        result = await asyncio.to_thread(
+            lambda: select_result(selection, yoc44_service.get_model_result(model_code, swing_id))
+        )
+        header, arrays = result.to_wire()
+        return binary_response(header, arrays, media_type, wire_dtype)
+
+    layout = resolve_layout(request, layout)
+    check_selection_layout(selection, layout)
+
+    def encode_model(placeholder_id: str) -> bytes:
+        # Precomputed swing data for this model
+        result = select_result(selection, yoc44_service.get_model_result(model_code, placeholder_id))
+        return encode_payload(result.to_payload(layout), layout)
+
+    async def build_response(placeholder_id: str) -> bytes:
+        # Cache miss: load, analyze and encode in a worker thread
+        return await asyncio.to_thread(encode_model, placeholder_id)
+
+    body = await response_cache.get_or_build(
+        (model_code, yoc44_service.data_version, layout, selection.cache_key()),
+        swing_id,
+        build_response
     )
 
-    return result
+    return json_response(body)
 
 
 @router.get("/pro-data/{video_id}", response_model=ProDataResponse)
-async def get_pro_data(video_id: str) -> ProDataResponse:
+async def get_pro_data(
+    video_id: str,
+    request: Request,
+    dtype: Optional[str] = DTYPE_QUERY,
+    selection: PoseSelection = Depends(pose_selection)
+) -> Response:
     """
     Get pro/reference 3D skeleton data.
 
     Returns pre-computed 3D skeleton data for professional players
     and reference swings. Used for comparison and battle mode.
+    Use `Accept: application/octet-stream` for the raw (N, 44, 3) buffer, and
+    `stride`, `max_frames`, `window` and `joints` for part of the sequence.
     """
-    from services.yoc44_service import YOC44Service
+    yoc44_service = request.app.state.yoc44_service
 
-    # For now, return mock data or error
-    # In production, this would load from skeleton_data.json
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Pro data endpoint not yet implemented. Use mock data for now."
-    )
+    pro_data = await yoc44_service.get_pro_data(video_id)
+    if pro_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Pro data not found: {video_id}"
+        )
+
+    try:
+        pose_3d, fps, impact_frame = selection.select_pose(
+            pro_data["pose_3d"], pro_data["fps"], pro_data["impact_frame"]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    header = {
+        "video_id": video_id,
+        **yoc44_service.get_pro_info(video_id),
+        "frames": len(pose_3d),
+        "fps": fps,
+        "impact_frame": impact_frame,
+    }
+    if selection.joints is not None:
+        header["joints"] = selection.joints
+
+    wire_format = resolve_wire_format(request, dtype)
+    if wire_format is not None:
+        media_type, wire_dtype = wire_format
+        return binary_response(header, {"pose3d": pose_3d}, media_type, wire_dtype)
+
+    def encode() -> bytes:
+        payload = ProDataResponse.model_construct(**header, pose_3d=pose_3d.tolist())
+        return payload.model_dump_json(exclude_none=True).encode()
+
+    return json_response(await asyncio.to_thread(encode))
 
 
 @router.get("/stats")
-async def get_queue_stats():
+async def get_queue_stats(request: Request):
     """
     Get job queue statistics.
 
-    Returns information about the current state of the job queue.
+    Returns information about the current state of the job queue,
+    the analysis executor, the inference backend and the pro data and
+    response caches.
     """
     queue = get_job_queue()
-    return queue.get_stats()
+    stats = queue.get_stats()
+    stats["executor"] = request.app.state.executor.get_stats()
+    stats["inference"] = request.app.state.yoc44_service.get_inference_stats()
+    stats["pro_data_cache"] = request.app.state.yoc44_service.get_cache_stats()
+    stats["response_cache"] = request.app.state.response_cache.get_stats()
+    return stats
+
+
+@router.put("/queue/concurrency")
+async def set_queue_concurrency(body: QueueConcurrencyRequest, request: Request):
+    """
+    Change how many jobs are processed at once.
+
+    Takes effect immediately: queued jobs start if the limit was raised,
+    running jobs finish if it was lowered. The limit can be at most the
+    analysis pool size. Disabled (403) unless QUEUE_CONCURRENCY_API is set,
+    since the endpoint is unauthenticated.
+    """
+    if not request.app.state.queue_concurrency_api:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Changing the job concurrency is disabled (set QUEUE_CONCURRENCY_API=true)"
+        )
+    max_workers = request.app.state.executor.max_workers
+    if body.max_concurrent_jobs > max_workers:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"max_concurrent_jobs must be at most the analysis pool size ({max_workers})"
+        )
+
+    queue = get_job_queue()
+    await queue.set_max_concurrent_jobs(body.max_concurrent_jobs)
+    return {"max_concurrent_jobs": queue.max_concurrent_jobs}
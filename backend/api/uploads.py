@@ -0,0 +1,251 @@
+"""
+Video upload handling.
+
+Uploads are copied to disk in chunks off the event loop, so large or
+concurrent uploads do not stall other requests. While the data streams the
+copy:
+- stops with 413 once the upload exceeds the size limit
+- checks the container magic bytes against the file extension (415)
+- computes the SHA-256 content hash (for deduplication) and byte count
+
+UploadLimitMiddleware rejects oversized request bodies before the multipart
+form is parsed (by Content-Length, or by counting bytes of chunked bodies).
+"""
+import asyncio
+import hashlib
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+from fastapi import HTTPException, UploadFile, status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from services.metrics import StageTimings
+
+
+# Chunk size for copying uploads to disk
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+# Leading bytes inspected to identify the container
+SNIFF_BYTES = 16
+
+# Allowance for multipart boundaries and form fields on top of the file size
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Containers accepted per file extension (MP4 and QuickTime share one format)
+EXTENSION_CONTAINERS = {
+    ".mp4": {"mp4", "mov"},
+    ".mov": {"mp4", "mov"},
+    ".avi": {"avi"},
+    ".webm": {"webm"},
+}
+
+# Top-level QuickTime atoms that may precede 'ftyp'-less .mov files
+QUICKTIME_ATOMS = (b"moov", b"mdat", b"wide", b"free", b"skip", b"pnot")
+
+
+class UploadInfo:
+    """What was learned about an upload while saving it, and how long saving took."""
+
+    def __init__(
+        self,
+        path: Path,
+        size: int,
+        content_hash: str,
+        container: str,
+        seconds: float = 0.0,
+        cpu_seconds: float = 0.0
+    ):
+        self.path = path
+        self.size = size
+        self.content_hash = content_hash
+        self.container = container
+        # Wall-clock time from the first chunk read to the file being closed
+        self.seconds = seconds
+        # CPU time spent hashing and writing
+        self.cpu_seconds = cpu_seconds
+
+    def timings(self) -> StageTimings:
+        """The upload as the first stage of an analysis job's timings."""
+        timings = StageTimings()
+        timings.add("upload", self.seconds, self.cpu_seconds)
+        return timings
+
+
+def sniff_container(head: bytes) -> Optional[str]:
+    """
+    Identify a video container from its first bytes.
+
+    Args:
+        head: At least the first SNIFF_BYTES bytes of the file
+
+    Returns:
+        "mp4", "mov", "avi", "webm" or None if unrecognized
+    """
+    if head[4:8] == b"ftyp":
+        return "mov" if head[8:12] == b"qt  " else "mp4"
+    if head[4:8] in QUICKTIME_ATOMS:
+        return "mov"
+    if head[:4] == b"RIFF" and head[8:12] == b"AVI ":
+        return "avi"
+    if head[:4] == b"\x1a\x45\xdf\xa3":  # EBML (WebM/Matroska)
+        return "webm"
+    return None
+
+
+async def save_upload(video: UploadFile, path: Path, max_bytes: int) -> UploadInfo:
+    """
+    Stream an uploaded video to disk without blocking the event loop.
+
+    Args:
+        video: Uploaded file
+        path: Destination path (its suffix selects the expected container)
+        max_bytes: Size limit
+
+    Returns:
+        UploadInfo with size, SHA-256, detected container and timing
+
+    Raises:
+        HTTPException: 413 if the upload exceeds max_bytes, 415 if its
+            content is not a video of the extension's type. Nothing is left
+            on disk in either case.
+    """
+    expected = EXTENSION_CONTAINERS[path.suffix.lower()]
+    digest = hashlib.sha256()
+    size = 0
+    container = None
+    cpu_seconds = 0.0
+    started = time.perf_counter()
+
+    out = await asyncio.to_thread(open, path, "wb")
+    try:
+        while chunk := await video.read(UPLOAD_CHUNK_BYTES):
+            if container is None:
+                # Sniff the first chunk before writing anything
+                container = sniff_container(chunk[:SNIFF_BYTES])
+                if container not in expected:
+                    raise HTTPException(
+                        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                        detail=f"File content does not match the {path.suffix.lower()} extension"
+                    )
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Video exceeds the upload limit of {max_bytes} bytes"
+                )
+            cpu_seconds += await asyncio.to_thread(_write_chunk, out, digest, chunk)
+        if container is None:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Uploaded file is empty"
+            )
+    except BaseException:
+        await asyncio.to_thread(out.close)
+        path.unlink(missing_ok=True)
+        raise
+    await asyncio.to_thread(out.close)
+
+    return UploadInfo(
+        path=path,
+        size=size,
+        content_hash=digest.hexdigest(),
+        container=container,
+        seconds=time.perf_counter() - started,
+        cpu_seconds=cpu_seconds
+    )
+
+
+def _write_chunk(out: BinaryIO, digest, chunk: bytes) -> float:
+    """Hash and write one chunk (runs in a worker thread; both release the GIL).
+
+    Returns:
+        CPU seconds spent
+    """
+    cpu = time.thread_time()
+    digest.update(chunk)
+    out.write(chunk)
+    return time.thread_time() - cpu
+
+
+class UploadLimitMiddleware:
+    """
+    Reject request bodies over a size limit before they are parsed.
+
+    Requests declaring a larger Content-Length get 413 without their body
+    being read; chunked bodies are cut off with 413 once they pass the limit.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        """
+        Args:
+            app: Wrapped ASGI app
+            limits: Body size limit per request path (other paths are unlimited)
+        """
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        max_bytes = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+            await self._reject(send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    raise _BodyTooLarge()
+            return message
+
+        async def tracking_send(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except _BodyTooLarge:
+            if not response_started:
+                await self._reject(send)
+
+    async def _reject(self, send: Send):
+        """Send a 413 response."""
+        body = b'{"detail":"Request body exceeds the upload limit"}'
+        await send({
+            "type": "http.response.start",
+            "status": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+class _BodyTooLarge(HTTPException):
+    """
+    Raised from receive() when a request body passes the limit.
+
+    An HTTPException, so a 413 is returned even when it is raised while
+    FastAPI parses the form (other errors there become 400).
+    """
+
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Request body exceeds the upload limit"
+        )
@@ -0,0 +1,4 @@
+"""
+pytest configuration: run tests from backend/ with the app's packages
+(api, services) importable.
+"""
@@ -7,12 +7,27 @@ import os
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-
+from fastapi.responses import RedirectResponse, Response
+
+from api.media import VideoIndex
+from api.prometheus import (
+    PROMETHEUS_CONTENT_TYPE,
+    EventLoopMonitor,
+    RequestMetrics,
+    RequestMetricsMiddleware,
+    render_metrics,
+)
 from api.routes import analyze, jobs
-from services.job_queue import start_job_queue, stop_job_queue, get_job_queue
+from api.uploads import MULTIPART_OVERHEAD_BYTES, UploadLimitMiddleware
+from services.executor import AnalysisExecutor
+from services.job_queue import JobQueue, start_job_queue, stop_job_queue, get_job_queue, set_job_queue
+from services.job_store import JobStore, MemoryJobStore, SQLiteJobStore
+from services.result_store import ResultStore
+from services.response_cache import ResponseCache
+from services.shared_queue import SharedJobQueue
+from services.video_processor import VideoPipeline
 from services.yoc44_service import YOC44Service
 
 
@@ -41,38 +56,170 @@ Returns 3D pose data with 44 joints per frame in normalized coordinates [-1, 1].
 # Path to skeleton data (optional, for pro/reference data)
 SKELETON_DATA_PATH = Path(__file__).parent.parent / "skeleton_viewer_standalone" / "skeleton_data.json"
 
+# Binary skeleton store built by build_data.py (preferred over the JSON file)
+SKELETON_STORE_PATH = Path(__file__).parent.parent / "skeleton_viewer_standalone" / "skeleton_store"
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Application lifespan manager."""
-    # Startup
-    print("Starting SwingSymphony API...")
+# Memory budget for pro model data loaded on demand (LRU-evicted beyond this)
+PRO_DATA_CACHE_MB = int(os.getenv("PRO_DATA_CACHE_MB", "256"))
 
-    # Initialize YOC44 service
+# Memory budget for pre-serialized model responses
+RESPONSE_CACHE_MB = int(os.getenv("RESPONSE_CACHE_MB", "64"))
+
+# Largest accepted video upload
+MAX_UPLOAD_SIZE_MB = int(os.getenv("MAX_UPLOAD_SIZE_MB", "100"))
+
+# Jobs processed at once. QUEUE_CONCURRENCY_API=true allows changing it at runtime
+# (up to ANALYSIS_WORKERS) via PUT /api/v1/queue/concurrency, which is unauthenticated
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "3"))
+QUEUE_CONCURRENCY_API = os.getenv("QUEUE_CONCURRENCY_API", "false").lower() in ("1", "true", "yes")
+
+# Job persistence: "sqlite" (survives restarts) or "memory"
+JOB_STORE = os.getenv("JOB_STORE", "sqlite")
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", str(Path(__file__).parent / "storage" / "jobs.db"))
+
+# Completed job results are written here (one directory per job)
+RESULTS_DIR = os.getenv("RESULTS_DIR", str(Path(__file__).parent / "storage" / "results"))
+
+# Finished jobs (and their results) are deleted after this long
+JOB_TTL_HOURS = float(os.getenv("JOB_TTL_HOURS", "24"))
+
+# Job queue: "local" (this process only) or "shared" (all processes using JOB_STORE_PATH;
+# requires JOB_STORE=sqlite). PROCESS_JOBS=false makes a shared-queue API process only
+# submit and serve jobs, leaving the analyses to worker.py processes.
+JOB_QUEUE = os.getenv("JOB_QUEUE", "local")
+PROCESS_JOBS = os.getenv("PROCESS_JOBS", "true").lower() in ("1", "true", "yes")
+
+# Uploaded video decoding: keep every VIDEO_FRAME_STEP-th frame and/or resample to at
+# most VIDEO_TARGET_FPS (unset keeps the source rate) before pose inference
+VIDEO_FRAME_STEP = int(os.getenv("VIDEO_FRAME_STEP", "1"))
+VIDEO_TARGET_FPS = float(os.getenv("VIDEO_TARGET_FPS", "0")) or None
+
+# Pose inference backend ("mock" or "cpu", a deterministic stand-in model for
+# benchmarking) and the most frames per inference call, shared by concurrent jobs
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "mock")
+INFERENCE_BATCH_SIZE = int(os.getenv("INFERENCE_BATCH_SIZE", "32"))
+
+# Where job analyses run: "thread" (shares caches) or "process" (own interpreter per worker)
+ANALYSIS_EXECUTOR = os.getenv("ANALYSIS_EXECUTOR", "thread")
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "3"))
+
+
+def create_yoc44_service() -> YOC44Service:
+    """Create the YOC44 service over the configured skeleton data."""
     data_path = str(SKELETON_DATA_PATH) if SKELETON_DATA_PATH.exists() else None
-    yoc44_service = YOC44Service(data_path=data_path)
-    app.state.yoc44_service = yoc44_service
+    store_path = str(SKELETON_STORE_PATH) if SKELETON_STORE_PATH.exists() else None
+    return YOC44Service(
+        data_path=data_path,
+        store_path=store_path,
+        cache_max_bytes=PRO_DATA_CACHE_MB * 1024 * 1024,
+        pipeline=VideoPipeline(frame_step=VIDEO_FRAME_STEP, target_fps=VIDEO_TARGET_FPS),
+        inference_backend=INFERENCE_BACKEND,
+        inference_batch_size=INFERENCE_BATCH_SIZE
+    )
+
 
-    # Configure job queue processor
+def create_executor(yoc44_service: YOC44Service) -> AnalysisExecutor:
+    """Create the pool that runs analyses off the event loop."""
+    executor = AnalysisExecutor(
+        service=yoc44_service,
+        mode=ANALYSIS_EXECUTOR,
+        max_workers=ANALYSIS_WORKERS
+    )
+    print(f"Analysis executor: {executor.mode} pool, {executor.max_workers} workers")
+    return executor
+
+
+def create_job_store() -> JobStore:
+    """Open the configured job store."""
+    ttl_seconds = JOB_TTL_HOURS * 3600
+    if JOB_STORE == "sqlite":
+        Path(JOB_STORE_PATH).parent.mkdir(parents=True, exist_ok=True)
+        job_store = SQLiteJobStore(JOB_STORE_PATH, ttl_seconds=ttl_seconds)
+    else:
+        job_store = MemoryJobStore(ttl_seconds=ttl_seconds)
+    print(f"Job store: {JOB_STORE}")
+    return job_store
+
+
+def configure_job_queue(
+    executor: AnalysisExecutor,
+    job_store: JobStore,
+    process_jobs: bool = PROCESS_JOBS
+) -> JobQueue:
+    """
+    Set up the global job queue to run jobs on the executor.
+
+    Args:
+        executor: Pool that runs the analyses
+        job_store: Where jobs are persisted
+        process_jobs: Whether a shared queue runs jobs in this process
+
+    Returns:
+        The configured (not yet started) queue
+    """
+    if JOB_QUEUE == "shared":
+        set_job_queue(SharedJobQueue(process_jobs=process_jobs))
     queue = get_job_queue()
 
     async def process_job(job):
-        return await yoc44_service.analyze_video(
+        return await executor.run_analysis(
             video_path=job.video_path,
             swing_id=job.swing_id,
-            user_type=job.user_type
+            user_type=job.user_type,
+            timings=job.timings,
+            progress=lambda percent, message: queue.report_progress(job, percent, message)
         )
 
     queue.set_processor(process_job)
+    queue.set_store(job_store)
+    queue.set_result_store(ResultStore(RESULTS_DIR))
+    print(f"Job queue: {JOB_QUEUE}")
+    return queue
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan manager."""
+    # Startup
+    print("Starting SwingSymphony API...")
+
+    # Initialize YOC44 service
+    yoc44_service = create_yoc44_service()
+    app.state.yoc44_service = yoc44_service
+
+    # Encoded model responses, dropped whenever the pro data reloads
+    response_cache = ResponseCache(max_bytes=RESPONSE_CACHE_MB * 1024 * 1024)
+    yoc44_service.add_reload_listener(response_cache.invalidate)
+    app.state.response_cache = response_cache
+
+    # Pool that runs analyses off the event loop, with the inference model loaded
+    executor = create_executor(yoc44_service)
+    await executor.warm_up()
+    app.state.executor = executor
+
+    # Job queue and persistence
+    job_store = create_job_store()
+    queue = configure_job_queue(executor, job_store)
+
+    await queue.set_max_concurrent_jobs(MAX_CONCURRENT_JOBS)
     await start_job_queue()
 
+    # Event-loop lag sampling for /metrics
+    loop_monitor = EventLoopMonitor()
+    loop_monitor.start()
+    app.state.loop_monitor = loop_monitor
+
     print("SwingSymphony API ready!")
 
     yield
 
     # Shutdown
     print("Shutting down SwingSymphony API...")
+    await loop_monitor.stop()
     await stop_job_queue()
+    executor.shutdown()
+    yoc44_service.stop_inference()
+    job_store.close()
     print("Shutdown complete.")
 
 
@@ -114,14 +261,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.state.queue_concurrency_api = QUEUE_CONCURRENCY_API
+
+# Reject oversized uploads before the multipart body is parsed
+app.state.max_upload_bytes = MAX_UPLOAD_SIZE_MB * 1024 * 1024
+app.add_middleware(
+    UploadLimitMiddleware,
+    limits={
+        "/api/v1/analyze": app.state.max_upload_bytes + MULTIPART_OVERHEAD_BYTES,
+        "/api/v1/analyze/batch": (app.state.max_upload_bytes + MULTIPART_OVERHEAD_BYTES) * analyze.MAX_BATCH_VIDEOS,
+    }
+)
+
+# Request latency, size and status per route, for /metrics (outermost, so
+# rejected uploads are counted too)
+app.state.request_metrics = RequestMetrics()
+app.add_middleware(RequestMetricsMiddleware, metrics=app.state.request_metrics)
+
 # Register routes
 app.include_router(analyze.router)
 app.include_router(jobs.router)
 
-# Mount static files for uploaded videos
-storage_dir = Path(__file__).parent / "storage"
-(storage_dir / "uploaded").mkdir(parents=True, exist_ok=True)
-app.mount("/videos", StaticFiles(directory=str(storage_dir / "uploaded")), name="videos")
+# Uploaded videos are served by GET /api/v1/videos/{swing_id}
+app.state.video_index = VideoIndex(analyze.UPLOAD_DIR)
+
+
+@app.api_route("/videos/{filename}", methods=["GET", "HEAD"], include_in_schema=False)
+async def legacy_video(filename: str) -> RedirectResponse:
+    """Redirect the old static video URLs (/videos/<swing_id>.<ext>)."""
+    swing_id = Path(filename).stem
+    return RedirectResponse(
+        url=f"/api/{API_VERSION}/videos/{swing_id}",
+        status_code=status.HTTP_308_PERMANENT_REDIRECT
+    )
 
 
 @app.get("/")
@@ -134,9 +306,13 @@ async def root():
         "docs": "/docs",
         "endpoints": {
             "submit": "POST /api/v1/analyze",
+            "submit_batch": "POST /api/v1/analyze/batch",
+            "batch_status": "GET /api/v1/batches/{batch_id}",
             "status": "GET /api/v1/jobs/{job_id}",
             "wait": "GET /api/v1/jobs/{job_id}/wait",
             "stats": "GET /api/v1/stats",
+            "video": "GET /api/v1/videos/{swing_id}",
+            "metrics": "GET /metrics",
         }
     }
 
@@ -152,6 +328,12 @@ async def health():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request) -> Response:
+    """Prometheus metrics of this process (text exposition format)."""
+    return Response(content=render_metrics(request.app), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
 
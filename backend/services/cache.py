@@ -0,0 +1,155 @@
+"""
+Byte-bounded LRU cache.
+
+Used for pro/reference model data and other derived data that is expensive to
+rebuild but cheap to keep in memory up to a fixed budget.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class LRUCache:
+    """
+    Least-recently-used cache bounded by total size in bytes.
+
+    Each entry is stored with the byte size reported by the caller. When the
+    total exceeds max_bytes, least recently used entries are evicted. An entry
+    larger than the whole budget is still returned to the caller but not kept.
+
+    get_or_load() is single-flight: while one thread loads a key, other
+    threads asking for it wait for that load instead of running their own.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Maximum total size of cached entries in bytes
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Key -> set when the load in progress for it finishes
+        self._loading: Dict[Hashable, threading.Event] = {}
+        # Bumped by clear(), so loads started before it are not cached
+        self._generation = 0
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached value and mark it as most recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if not present
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, nbytes: int):
+        """
+        Insert or replace a value, evicting older entries to stay in budget.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            nbytes: Size of the value in bytes
+        """
+        with self._lock:
+            self._put(key, value, nbytes)
+
+    def _put(self, key: Hashable, value: Any, nbytes: int):
+        """put() with the lock held."""
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.current_bytes -= old[1]
+
+        if nbytes > self.max_bytes:
+            return
+
+        self._entries[key] = (value, nbytes)
+        self.current_bytes += nbytes
+        while self.current_bytes > self.max_bytes:
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_bytes
+            self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Tuple[Any, int]]) -> Any:
+        """
+        Get a cached value, loading and caching it on a miss.
+
+        Only one load per key runs at a time; concurrent callers for the
+        same key wait for it and count as hits. If the load fails, the next
+        waiter loads the key itself.
+
+        Args:
+            key: Cache key
+            loader: Function returning (value, nbytes) for the key
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                loading = self._loading.get(key)
+                if loading is None:
+                    loading = self._loading[key] = threading.Event()
+                    generation = self._generation
+                    self.misses += 1
+                    break
+            loading.wait()
+
+        try:
+            value, nbytes = loader()
+            with self._lock:
+                if generation == self._generation:
+                    self._put(key, value, nbytes)
+        finally:
+            with self._lock:
+                del self._loading[key]
+            loading.set()
+        return value
+
+    def clear(self):
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self._generation += 1
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> dict:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
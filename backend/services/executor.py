@@ -0,0 +1,299 @@
+"""
+Analysis Executor.
+
+Runs the CPU-bound part of a swing analysis (YOC44Service.run_analysis) off
+the event loop, so a heavy job does not stall health checks, status polling
+or uploads.
+
+Two modes:
+- thread: a thread pool sharing the app's YOC44Service, its caches and its
+  inference backend, so frames of concurrent jobs are batched together.
+  Suited to numpy-heavy work, which releases the GIL.
+- process: a process pool; each worker process holds its own YOC44Service
+  and inference backend over the same (memory-mapped) pro data store.
+  Results come back as numpy buffers (SwingResult.to_buffers), not pickled
+  pydantic models.
+
+warm_up() loads the inference backend(s) at startup.
+
+Progress callbacks and stage timings work in both modes: worker processes
+send progress to the parent over a queue and return their timings with the
+result, and callbacks always run on the event loop.
+"""
+import asyncio
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from services.metrics import StageTimings
+from services.swing_result import SwingResult
+from services.video_processor import VideoPipeline
+from services.yoc44_service import YOC44Service
+
+
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+EXECUTOR_MODES = (EXECUTOR_THREAD, EXECUTOR_PROCESS)
+
+# warm_up() holds each worker this long so every process gets a task
+WARM_UP_HOLD_SECONDS = 0.2
+
+# Per-process service used by process pool workers
+_worker_service: Optional[YOC44Service] = None
+_worker_data_version = 0
+
+# Queue carrying (task_id, percent, message) from worker processes to the parent
+_worker_progress = None
+
+
+def _init_worker(
+    data_path: Optional[str],
+    store_path: Optional[str],
+    cache_max_bytes: int,
+    pipeline: VideoPipeline,
+    inference_backend: str,
+    inference_batch_size: int,
+    progress_queue
+):
+    """Create the worker process's YOC44Service and load its inference backend."""
+    global _worker_service, _worker_data_version, _worker_progress
+    _worker_service = YOC44Service(
+        data_path=data_path,
+        store_path=store_path,
+        cache_max_bytes=cache_max_bytes,
+        pipeline=pipeline,
+        inference_backend=inference_backend,
+        inference_batch_size=inference_batch_size
+    )
+    _worker_service.start_inference()
+    _worker_data_version = 0
+    _worker_progress = progress_queue
+
+
+def _warm_worker() -> int:
+    """No-op run by warm_up() so that a worker process is started."""
+    time.sleep(WARM_UP_HOLD_SECONDS)
+    return os.getpid()
+
+
+def _run_in_worker(
+    data_version: int,
+    task_id: int,
+    video_path: str,
+    swing_id: str,
+    user_type: str
+) -> Tuple[dict, dict]:
+    """Run an analysis in a worker process and pack the result and stage timings for transfer.
+
+    The pro data index is reloaded first if the parent reloaded it since
+    this worker last ran. Progress goes to the parent tagged with task_id.
+    """
+    global _worker_data_version
+    if data_version != _worker_data_version:
+        if _worker_data_version:
+            _worker_service.reload_pro_data()
+        _worker_data_version = data_version
+
+    def progress(percent: int, message: str):
+        _worker_progress.put((task_id, percent, message))
+
+    timings = StageTimings()
+    result = _worker_service.run_analysis(
+        video_path, swing_id, user_type, timings=timings, progress=progress
+    )
+    return result.to_buffers(), timings.to_dict()
+
+
+class AnalysisExecutor:
+    """
+    Thread or process pool for swing analyses, with utilization statistics.
+
+    Counters are only updated from the event loop, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        service: YOC44Service,
+        mode: str = EXECUTOR_THREAD,
+        max_workers: int = 3
+    ):
+        """
+        Create the pool.
+
+        Args:
+            service: The app's YOC44Service (used directly in thread mode,
+                and for its configuration in process mode)
+            mode: EXECUTOR_THREAD or EXECUTOR_PROCESS
+            max_workers: Number of worker threads or processes
+
+        Raises:
+            ValueError: If mode is unknown or max_workers is not positive
+        """
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode: {mode} (expected one of {EXECUTOR_MODES})")
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self._service = service
+        self._pool: Executor
+        self._progress_queue = None
+        self._progress_thread: Optional[threading.Thread] = None
+        self._progress_callbacks: Dict[int, Callable[[int, str], None]] = {}
+        self._task_ids = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        if mode == EXECUTOR_PROCESS:
+            # spawn: forking a process that runs an event loop is unsafe
+            context = multiprocessing.get_context("spawn")
+            self._progress_queue = context.Queue()
+            self._pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(
+                    service.data_path, service.store_path, service.cache_max_bytes, service.pipeline,
+                    service.inference_backend, service.inference_batch_size, self._progress_queue
+                )
+            )
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix="analysis"
+            )
+
+        self._started_at = time.monotonic()
+        self._active = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._busy_seconds = 0.0
+
+    async def run_analysis(
+        self,
+        video_path: str,
+        swing_id: str,
+        user_type: str = "USER",
+        timings: Optional[StageTimings] = None,
+        progress: Optional[Callable[[int, str], None]] = None
+    ) -> SwingResult:
+        """
+        Run YOC44Service.run_analysis in the pool.
+
+        Args:
+            video_path: Path to the uploaded video file
+            swing_id: Unique identifier for this swing
+            user_type: "USER" or "PRO"
+            timings: Receives the analysis stage timings
+            progress: Called on the event loop with (percent, message) as
+                the analysis advances
+
+        Returns:
+            SwingResult with complete analysis results
+        """
+        loop = asyncio.get_running_loop()
+        self._submitted += 1
+        self._active += 1
+        started = time.perf_counter()
+        try:
+            if self.mode == EXECUTOR_PROCESS:
+                task_id = next(self._task_ids)
+                if progress is not None:
+                    self._start_progress_reader(loop)
+                    self._progress_callbacks[task_id] = progress
+                try:
+                    buffers, stages = await loop.run_in_executor(
+                        self._pool, _run_in_worker, self._service.data_version,
+                        task_id, video_path, swing_id, user_type
+                    )
+                finally:
+                    self._progress_callbacks.pop(task_id, None)
+                result = SwingResult.from_buffers(buffers)
+                if timings is not None:
+                    timings.update(StageTimings.from_dict(stages))
+            else:
+                def report(percent: int, message: str):
+                    loop.call_soon_threadsafe(progress, percent, message)
+
+                result = await loop.run_in_executor(
+                    self._pool, self._service.run_analysis,
+                    video_path, swing_id, user_type,
+                    timings, report if progress is not None else None
+                )
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._active -= 1
+            self._busy_seconds += time.perf_counter() - started
+
+        self._completed += 1
+        return result
+
+    async def warm_up(self):
+        """
+        Load the inference backend before the first job arrives.
+
+        Thread mode loads the app service's backend, shared by all worker
+        threads. Process mode starts every worker process, and each one
+        loads its own backend in its initializer.
+        """
+        if self.mode == EXECUTOR_PROCESS:
+            loop = asyncio.get_running_loop()
+            pids = await asyncio.gather(*(
+                loop.run_in_executor(self._pool, _warm_worker) for _ in range(self.max_workers)
+            ))
+            print(f"Analysis workers warm: {len(set(pids))} processes")
+        else:
+            await asyncio.to_thread(self._service.start_inference)
+
+    def shutdown(self, wait: bool = True):
+        """Shut down the pool, dropping analyses that have not started."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+        if self._progress_thread is not None:
+            self._progress_queue.put(None)
+            self._progress_thread.join()
+            self._progress_thread = None
+
+    def _start_progress_reader(self, loop: asyncio.AbstractEventLoop):
+        """Start the thread forwarding worker progress to the event loop (once)."""
+        if self._progress_thread is None:
+            self._loop = loop
+            self._progress_thread = threading.Thread(
+                target=self._read_progress, name="analysis-progress", daemon=True
+            )
+            self._progress_thread.start()
+
+    def _read_progress(self):
+        """Progress reader thread: hand each worker report to the event loop."""
+        while True:
+            report = self._progress_queue.get()
+            if report is None:
+                return
+            self._loop.call_soon_threadsafe(self._dispatch_progress, *report)
+
+    def _dispatch_progress(self, task_id: int, percent: int, message: str):
+        """Call the progress callback of a running task (on the event loop)."""
+        callback = self._progress_callbacks.get(task_id)
+        if callback is not None:
+            callback(percent, message)
+
+    def get_stats(self) -> dict:
+        """Get pool size and utilization statistics."""
+        uptime = time.monotonic() - self._started_at
+        finished = self._completed + self._failed
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "active": self._active,
+            "utilization": round(self._active / self.max_workers, 3),
+            "busy_ratio": round(self._busy_seconds / (uptime * self.max_workers), 3) if uptime > 0 else 0.0,
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "failed": self._failed,
+            "avg_run_seconds": round(self._busy_seconds / finished, 4) if finished else 0.0,
+        }
@@ -0,0 +1,355 @@
+"""
+Pose Inference Backends.
+
+An InferenceBackend maps a batch of preprocessed frames to (B, 44, 3)
+YOC44 poses. These poses are the analysis: the job result (2D projection,
+impact, rhythm track, velocity curve) is computed from them. Backends are
+selected by name (INFERENCE_BACKEND):
+
+- mock (default): traces a synthetic swing from frame timestamps, ignoring
+  pixels. Cheap, and gives the frontend a plausible-looking swing.
+- cpu: deterministic stand-in for the real model: a fixed, seeded two-layer
+  network over pooled pixels. Same frames give the same poses (up to float32
+  rounding, which can depend on how frames were batched), and it gains from
+  batching the way a real model does, so the whole decode -> batch ->
+  inference path can be benchmarked without a GPU.
+
+A real YOC44 model plugs in as another InferenceBackend subclass
+registered in BACKENDS.
+
+InferenceBatcher owns one loaded ("warm") backend per process and runs it on
+one thread. Frames submitted by concurrently running analyses are coalesced
+into shared batches of up to batch_size frames.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple, Type
+
+import cv2
+import numpy as np
+
+from services.skeleton import NUM_YOC44_JOINTS
+from services.video_processor import FrameBatch
+
+
+# Largest number of frames per backend call
+DEFAULT_BATCH_SIZE = 32
+
+# How long a partial batch waits for frames from other analyses
+DEFAULT_MAX_WAIT_SECONDS = 0.005
+
+
+class InferenceBackend:
+    """
+    Base class for pose inference backends.
+
+    load() is called once, before the first infer(); infer() is only ever
+    called from one thread at a time.
+    """
+
+    name = ""
+
+    def load(self):
+        """Load weights and warm up (e.g. allocate device memory)."""
+
+    def infer(self, batch: FrameBatch) -> np.ndarray:
+        """
+        Estimate poses for a batch of frames.
+
+        Args:
+            batch: Preprocessed frames with their timestamps
+
+        Returns:
+            (B, 44, 3) float32 joint positions
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release the model."""
+
+
+class MockBackend(InferenceBackend):
+    """Synthetic swing poses by frame timestamp (no model)."""
+
+    name = "mock"
+
+    # Length of the traced swing
+    SWING_SECONDS = 2.5
+
+    def infer(self, batch: FrameBatch) -> np.ndarray:
+        """Generate mock 3D poses (44 joints) in [-1, 1] following the swing phase."""
+        progress = batch.timestamps / self.SWING_SECONDS
+        # Motion based on swing phase, using sine waves for smooth motion
+        phase_offset = (progress * np.pi * 2)[:, None]
+        joint_idx = np.arange(NUM_YOC44_JOINTS)[None, :]
+
+        # Spread joints vertically around a base pose
+        base_y = (joint_idx % 3 - 1) * 0.3
+
+        x = np.sin(phase_offset + joint_idx * 0.1) * 0.3
+        y = base_y + np.cos(phase_offset * 0.5) * 0.1
+        z = np.broadcast_to(np.sin(phase_offset * 0.3) * 0.2, x.shape)
+
+        return np.clip(np.stack([x, y, z], axis=-1), -1, 1).astype(np.float32)
+
+
+class CPUBackend(InferenceBackend):
+    """Deterministic CPU stand-in model: seeded two-layer network over pooled frames."""
+
+    name = "cpu"
+
+    # Frames are pooled to POOL_SIZE x POOL_SIZE before the first layer
+    POOL_SIZE = 32
+    HIDDEN_UNITS = 1024
+    SEED = 44
+
+    def __init__(self):
+        self._w1: Optional[np.ndarray] = None
+        self._w2: Optional[np.ndarray] = None
+
+    def load(self):
+        """Generate the fixed weights."""
+        rng = np.random.default_rng(self.SEED)
+        inputs = self.POOL_SIZE * self.POOL_SIZE * 3
+        self._w1 = (rng.standard_normal((inputs, self.HIDDEN_UNITS)) / np.sqrt(inputs)).astype(np.float32)
+        self._w2 = (
+            rng.standard_normal((self.HIDDEN_UNITS, NUM_YOC44_JOINTS * 3)) / np.sqrt(self.HIDDEN_UNITS)
+        ).astype(np.float32)
+
+    def infer(self, batch: FrameBatch) -> np.ndarray:
+        """Pool each frame, then run both layers on the whole batch at once."""
+        size = (self.POOL_SIZE, self.POOL_SIZE)
+        pooled = np.empty((len(batch), self.POOL_SIZE, self.POOL_SIZE, 3), dtype=np.float32)
+        for i, frame in enumerate(batch.frames):
+            cv2.resize(frame, size, dst=pooled[i], interpolation=cv2.INTER_AREA)
+        features = pooled.reshape(len(batch), -1)
+        features -= 0.5
+        hidden = np.maximum(features @ self._w1, 0.0)
+        return np.tanh(hidden @ self._w2).reshape(len(batch), NUM_YOC44_JOINTS, 3)
+
+    def close(self):
+        self._w1 = self._w2 = None
+
+
+BACKENDS: Dict[str, Type[InferenceBackend]] = {
+    MockBackend.name: MockBackend,
+    CPUBackend.name: CPUBackend,
+}
+
+
+def create_backend(name: str) -> InferenceBackend:
+    """
+    Create an (unloaded) inference backend by name.
+
+    Raises:
+        ValueError: If no backend has that name
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {name} (expected one of {tuple(BACKENDS)})")
+    return BACKENDS[name]()
+
+
+class InferenceBatcher:
+    """
+    Runs one warm backend on batches coalesced from concurrent analyses.
+
+    Analyses call infer() from their own threads (inside session()); a
+    single inference thread takes queued requests, merges them into batches
+    of up to batch_size frames, runs the backend once per batch and hands
+    each caller its slice of the result. A partial batch waits up to
+    max_wait_seconds for more frames, but only while other analyses are
+    running that could supply them.
+    """
+
+    def __init__(
+        self,
+        backend: InferenceBackend,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_wait_seconds: float = DEFAULT_MAX_WAIT_SECONDS
+    ):
+        """
+        Args:
+            backend: Backend to run (loaded by start())
+            batch_size: Largest number of frames per backend call
+            max_wait_seconds: How long a partial batch waits for more frames
+
+        Raises:
+            ValueError: If batch_size is not positive
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.backend = backend
+        self.batch_size = batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._requests: "queue.Queue[Optional[Tuple[FrameBatch, Future]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._sessions = 0
+        self._load_seconds = 0.0
+        self._calls = 0
+        self._frames = 0
+        self._coalesced_calls = 0
+        self._busy_seconds = 0.0
+
+    @property
+    def started(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        """Load the backend and start the inference thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            started = time.perf_counter()
+            self.backend.load()
+            self._load_seconds = time.perf_counter() - started
+            self._thread = threading.Thread(target=self._run, name="inference", daemon=True)
+            self._thread.start()
+        print(f"Inference backend: {self.backend.name} "
+              f"(batch {self.batch_size}, loaded in {self._load_seconds:.3f}s)")
+
+    def close(self):
+        """Stop the inference thread once queued requests are done, and release the backend."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._requests.put(None)
+            thread.join()
+            self.backend.close()
+
+    @contextmanager
+    def session(self) -> Iterator["InferenceSession"]:
+        """Mark an analysis as streaming frames, so partial batches wait for it."""
+        with self._lock:
+            self._sessions += 1
+        try:
+            yield InferenceSession(self)
+        finally:
+            with self._lock:
+                self._sessions -= 1
+
+    def infer(self, batch: FrameBatch) -> np.ndarray:
+        """
+        Run inference on a batch, possibly together with other analyses' frames.
+
+        Blocks until the result is ready; call from an analysis thread.
+
+        Args:
+            batch: Preprocessed frames
+
+        Returns:
+            (B, 44, 3) poses
+        """
+        return self.submit(batch)[0]
+
+    def submit(self, batch: FrameBatch) -> Tuple[np.ndarray, float]:
+        """
+        Like infer(), also returning the batch's share of backend CPU time.
+
+        Returns:
+            ((B, 44, 3) poses, CPU seconds)
+        """
+        if not self.started:
+            self.start()
+        future: Future = Future()
+        self._requests.put((batch, future))
+        return future.result()
+
+    def get_stats(self) -> dict:
+        """Backend name, batching and utilization statistics."""
+        return {
+            "backend": self.backend.name,
+            "loaded": self.started,
+            "load_seconds": round(self._load_seconds, 4),
+            "batch_size": self.batch_size,
+            "calls": self._calls,
+            "frames": self._frames,
+            "avg_batch_frames": round(self._frames / self._calls, 2) if self._calls else 0.0,
+            "coalesced_calls": self._coalesced_calls,
+            "frames_per_second": round(self._frames / self._busy_seconds, 1) if self._busy_seconds else 0.0,
+        }
+
+    def _run(self):
+        """Inference thread: collect requests into batches and run them."""
+        carry = None
+        while True:
+            request = carry or self._requests.get()
+            carry = None
+            if request is None:
+                return
+
+            pending: List[Tuple[FrameBatch, Future]] = [request]
+            frames = len(request[0])
+            deadline = time.monotonic() + self.max_wait_seconds
+            stopping = False
+            while frames < self.batch_size:
+                try:
+                    if len(pending) >= self._sessions:
+                        # Every streaming analysis is already in this batch
+                        request = self._requests.get_nowait()
+                    else:
+                        request = self._requests.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                if frames + len(request[0]) > self.batch_size:
+                    carry = request
+                    break
+                pending.append(request)
+                frames += len(request[0])
+
+            self._run_batch(pending)
+            if stopping:
+                return
+
+    def _run_batch(self, pending: List[Tuple[FrameBatch, Future]]):
+        """Run the backend on the merged requests and resolve their futures."""
+        if len(pending) == 1:
+            merged = pending[0][0]
+        else:
+            merged = FrameBatch(
+                np.concatenate([batch.indices for batch, _ in pending]),
+                np.concatenate([batch.timestamps for batch, _ in pending]),
+                np.concatenate([batch.frames for batch, _ in pending])
+            )
+
+        started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            poses = self.backend.infer(merged)
+        except BaseException as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+        finally:
+            self._busy_seconds += time.perf_counter() - started
+        cpu_per_frame = (time.thread_time() - cpu_started) / len(merged)
+
+        self._calls += 1
+        self._frames += len(merged)
+        if len(pending) > 1:
+            self._coalesced_calls += 1
+        offset = 0
+        for batch, future in pending:
+            future.set_result((poses[offset:offset + len(batch)], cpu_per_frame * len(batch)))
+            offset += len(batch)
+
+
+class InferenceSession:
+    """One analysis's use of an InferenceBatcher, tracking its share of backend CPU time."""
+
+    def __init__(self, batcher: InferenceBatcher):
+        self._batcher = batcher
+        # Backend CPU time of this analysis's frames (shared batches split by frame count)
+        self.cpu_seconds = 0.0
+
+    def infer(self, batch: FrameBatch) -> np.ndarray:
+        """Run inference on a batch (see InferenceBatcher.infer)."""
+        poses, cpu_seconds = self._batcher.submit(batch)
+        self.cpu_seconds += cpu_seconds
+        return poses
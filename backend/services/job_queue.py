@@ -1,16 +1,32 @@
 """
 Async Job Queue Service.
 
-This module provides an in-memory job queue for processing video analysis tasks.
-It can be upgraded to use Redis for distributed processing.
+This module provides the job queue for video analysis tasks. Jobs are
+scheduled by priority and run a bounded number at a time; only running jobs
+are kept in memory. Every job is persisted in a JobStore
+(services/job_store.py): in memory, or in SQLite so pending jobs are requeued
+after a restart. Results are spilled to the ResultStore.
+
+With JOB_QUEUE=shared, SharedJobQueue (services/shared_queue.py) replaces
+this queue: the SQLite store then is the queue, shared by every process on
+the host.
 """
 import asyncio
+import contextlib
+import itertools
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Optional, Callable, Awaitable
+from typing import Dict, List, Optional, Callable, Awaitable, Tuple
 from enum import Enum
 
-from api.models.responses import JobStatusResponse, SwingDataResponse
+from api.models.responses import JobStatusResponse
+from services.job_store import JobStore, MemoryJobStore
+from services.metrics import LatencyHistogram, RateCounter, StageTimings
+from services.result_store import ResultStore, load_result
+from services.pose_selection import PoseSelection
+from services.swing_result import LAYOUT_FULL, SwingResult
 
 
 class JobStatus(str, Enum):
@@ -21,6 +37,30 @@ class JobStatus(str, Enum):
     FAILED = "failed"
 
 
+class JobPriority(str, Enum):
+    """Job priority classes, highest first."""
+    INTERACTIVE = "interactive"  # Single uploads a user is waiting on
+    BULK = "bulk"                # Batch uploads and backfills
+    BACKGROUND = "background"    # Reference model precomputation
+
+
+# Scheduling rank per priority (lower runs first)
+PRIORITY_RANK = {priority: rank for rank, priority in enumerate(JobPriority)}
+
+# Window for the jobs-per-second throughput stats
+THROUGHPUT_WINDOW_SECONDS = 60
+
+# Seconds between sweeps for expired finished jobs
+EXPIRE_INTERVAL_SECONDS = 60.0
+
+# Stages timed per job, in order (see Job.timings)
+STAGES = ("upload", "decode", "inference", "kinematics", "scoring", "serialize")
+
+# Progress reported when a job starts, and while its result is being saved
+STARTED_PROGRESS = 5
+SAVING_PROGRESS = 95
+
+
 class Job:
     """Represents a single analysis job."""
 
@@ -29,40 +69,195 @@ class Job:
         job_id: str,
         video_path: str,
         swing_id: str,
-        user_type: str = "USER"
+        user_type: str = "USER",
+        priority: JobPriority = JobPriority.INTERACTIVE,
+        content_hash: Optional[str] = None,
+        batch_id: Optional[str] = None,
+        timings: Optional[StageTimings] = None
     ):
         self.job_id = job_id
         self.video_path = video_path
         self.swing_id = swing_id
         self.user_type = user_type
+        self.priority = priority
+        # SHA-256 of the uploaded video, for deduplication
+        self.content_hash = content_hash
+        # Batch the job was created for, if any
+        self.batch_id = batch_id
+        # Wall-clock and CPU time per stage (STAGES)
+        self.timings = timings or StageTimings()
         self.status = JobStatus.PENDING
         self.progress = 0
         self.message = "Job queued"
-        self.result: Optional[SwingDataResponse] = None
+        self._result: Optional[SwingResult] = None
+        # Set once the result has been written to the ResultStore
+        self.result_path: Optional[str] = None
         self.error: Optional[str] = None
         self.created_at = datetime.now()
         self.updated_at = datetime.now()
+        # Monotonic submit and start times, for queue statistics
+        self.queued_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        # Set once the job completes or fails
+        self._finished = asyncio.Event()
+        # Progress event queues of clients streaming this job
+        self._subscribers: List[asyncio.Queue] = []
+
+    @property
+    def result(self) -> Optional[SwingResult]:
+        """The analysis result, read from disk if it was spilled there.
+
+        Spilled results are loaded on every access and not kept in memory.
+        """
+        if self._result is None and self.result_path is not None:
+            return load_result(self.result_path)
+        return self._result
+
+    @result.setter
+    def result(self, result: Optional[SwingResult]):
+        self._result = result
+
+    @property
+    def has_result(self) -> bool:
+        """True if the job has a result (in memory or on disk)."""
+        return self._result is not None or self.result_path is not None
+
+    @property
+    def is_finished(self) -> bool:
+        """True once the job has completed or failed."""
+        return self._finished.is_set()
+
+    def update(
+        self,
+        status: Optional[JobStatus] = None,
+        progress: Optional[int] = None,
+        message: Optional[str] = None
+    ):
+        """
+        Update the job's progress and notify subscribers.
+
+        Args:
+            status: New status (unchanged if None)
+            progress: New progress percentage (unchanged if None)
+            message: New status message (unchanged if None)
+        """
+        if status is not None:
+            self.status = status
+        if progress is not None:
+            self.progress = progress
+        if message is not None:
+            self.message = message
+        self.updated_at = datetime.now()
+
+        event = self.progress_event()
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+
+    def progress_event(self) -> dict:
+        """Small progress snapshot (status, progress, message) for streaming."""
+        return {
+            "status": self.status.value,
+            "progress": self.progress,
+            "message": self.message,
+        }
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Subscribe to progress events.
+
+        Returns:
+            Queue receiving a progress_event() dict on every update; pass
+            it to unsubscribe() when done
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Stop delivering progress events to a queue from subscribe()."""
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def mark_finished(self):
+        """Wake everyone waiting on this job. Called by the queue."""
+        self._finished.set()
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the job completes or fails.
+
+        Waiting costs no CPU: the coroutine sleeps until mark_finished().
+
+        Args:
+            timeout: Max wait time in seconds (None waits indefinitely)
 
-    def to_response(self) -> JobStatusResponse:
-        """Convert job to API response."""
+        Returns:
+            True if the job finished, False on timeout
+        """
+        try:
+            await asyncio.wait_for(self._finished.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.is_finished
+
+    def to_response(
+        self,
+        layout: str = LAYOUT_FULL,
+        selection: Optional[PoseSelection] = None
+    ) -> JobStatusResponse:
+        """
+        Convert job to API response.
+
+        Args:
+            layout: Payload layout for the result (full or compact)
+            selection: Optional frame/joint subset of the result to return
+        """
+        result = self.result
+        if result is not None and selection is not None:
+            result = selection.apply(result)
         return JobStatusResponse(
             job_id=self.job_id,
             status=self.status.value,
             progress=self.progress,
             message=self.message,
-            result=self.result,
-            error=self.error
+            result=result.to_payload(layout) if result is not None else None,
+            error=self.error,
+            stages=self.timings.to_dict() or None
         )
 
 
 class JobQueue:
     """
-    In-memory async job queue for video analysis.
+    Async job queue for video analysis.
 
-    This is a simple implementation that stores jobs in memory.
-    For production, upgrade to Redis or another distributed queue.
+    Only queued and running jobs are kept in memory (self.jobs). Every job
+    is written to a JobStore when submitted and again when it finishes,
+    after which it is served from the store until its TTL expires.
+    With a durable store, unfinished jobs are re-queued on start.
+
+    Pending jobs are served by priority (INTERACTIVE, then BULK, then
+    BACKGROUND) and FIFO within a priority. The worker waits on a
+    resizable slot count, so at most max_concurrent_jobs jobs run at once
+    and the limit can be changed at runtime.
+
+    Several videos can be submitted as one batch (submit_batch), whose jobs
+    are stored in one transaction and tracked together.
+
+    Jobs carry the content hash of their video, so an identical upload is
+    answered by the existing job instead of new work. Submissions of the
+    same content are serialized by a per-hash lock, so concurrent identical
+    uploads attach to one job.
+
+    Statistics are maintained incrementally on every status change, so
+    get_stats() does not scan jobs and is cheap enough for health probes.
+
+    This queue lives in one process; SharedJobQueue (services/shared_queue.py)
+    shares jobs between processes through the store.
     """
 
+    # Reported in stats
+    BACKEND = "local"
+
     def __init__(self, max_concurrent_jobs: int = 3):
         """
         Initialize the job queue.
@@ -70,34 +265,150 @@ class JobQueue:
         Args:
             max_concurrent_jobs: Maximum number of jobs to process concurrently
         """
+        # Queued and running jobs; finished ones live in the store
         self.jobs: Dict[str, Job] = {}
+        # Content hash -> queued or running job
+        self._by_hash: Dict[str, Job] = {}
+        # Content hash -> [lock held while a submission checks and inserts, users]
+        self._hash_locks: Dict[str, list] = {}
+        self._dedup_hits = 0
+        self._dedup_misses = 0
+        # Batch ID -> number of its jobs not finished yet (batches submitted here)
+        self._batch_unfinished: Dict[str, int] = {}
+        self._batch_jobs_unfinished = 0
+        self._batches_submitted = 0
+        self._store: JobStore = MemoryJobStore()
+        self.results: Optional[ResultStore] = None
+        self._expire_task: Optional[asyncio.Task] = None
         self.max_concurrent_jobs = max_concurrent_jobs
         self._processing_tasks: set = set()
-        self._processor: Optional[Callable[[Job], Awaitable[SwingDataResponse]]] = None
+        self._processor: Optional[Callable[[Job], Awaitable[SwingResult]]] = None
         self._worker_task: Optional[asyncio.Task] = None
-        self._pending_queue: Optional[asyncio.Queue] = None
+        self._pending_queue: Optional[asyncio.PriorityQueue] = None
+        # Running job count, guarded by _slots (notified when a slot frees up)
+        self._running = 0
+        self._slots: Optional[asyncio.Condition] = None
+        # Submission order, to keep FIFO within a priority
+        self._sequence = itertools.count()
+        # Statistics, updated on every status change
+        self._status_counts: Dict[JobStatus, int] = {status: 0 for status in JobStatus}
+        self._queued: Dict[JobPriority, int] = {priority: 0 for priority in JobPriority}
+        # Pending job queue times in submission order, for the oldest pending age
+        self._pending_since: "OrderedDict[str, float]" = OrderedDict()
+        self._wait_times: Dict[JobPriority, LatencyHistogram] = {
+            priority: LatencyHistogram() for priority in JobPriority
+        }
+        self._run_times = LatencyHistogram()
+        # Wall-clock time histogram and total CPU time per stage, of completed jobs
+        self._stage_times: Dict[str, LatencyHistogram] = {stage: LatencyHistogram() for stage in STAGES}
+        self._stage_cpu_seconds: Dict[str, float] = {stage: 0.0 for stage in STAGES}
+        self._throughput: Dict[JobStatus, RateCounter] = {
+            status: RateCounter(THROUGHPUT_WINDOW_SECONDS)
+            for status in (JobStatus.COMPLETED, JobStatus.FAILED)
+        }
 
     def set_processor(
         self,
-        processor: Callable[[Job], Awaitable[SwingDataResponse]]
+        processor: Callable[[Job], Awaitable[SwingResult]]
     ):
         """
         Set the processor function for jobs.
 
         Args:
-            processor: Async function that takes a Job and returns SwingDataResponse
+            processor: Async function that takes a Job and returns SwingResult
         """
         self._processor = processor
 
+    def set_store(self, store: JobStore):
+        """
+        Set where jobs are persisted. Call before start().
+
+        Args:
+            store: JobStore implementation (default: MemoryJobStore)
+        """
+        self._store = store
+
+    def set_result_store(self, results: ResultStore):
+        """
+        Spill completed results to disk. Call before start().
+
+        Without a result store, results stay in memory with their job.
+
+        Args:
+            results: ResultStore to write completed results to
+        """
+        self.results = results
+
+    async def set_max_concurrent_jobs(self, max_concurrent_jobs: int):
+        """
+        Change the concurrency limit at runtime.
+
+        Raising the limit starts queued jobs immediately; lowering it lets
+        running jobs finish and holds new ones until below the new limit.
+
+        Args:
+            max_concurrent_jobs: New limit (at least 1)
+
+        Raises:
+            ValueError: If max_concurrent_jobs is less than 1
+        """
+        if max_concurrent_jobs < 1:
+            raise ValueError("max_concurrent_jobs must be at least 1")
+        if self._slots is None:
+            self.max_concurrent_jobs = max_concurrent_jobs
+            return
+        async with self._slots:
+            self.max_concurrent_jobs = max_concurrent_jobs
+            self._slots.notify_all()
+
     async def start(self):
         """Start the background worker for processing jobs."""
         if self._worker_task is None:
-            self._pending_queue = asyncio.Queue()
+            self._pending_queue = asyncio.PriorityQueue()
+            self._slots = asyncio.Condition()
+            await self._load_counts()
+            await self._requeue_unfinished()
             self._worker_task = asyncio.create_task(self._worker())
+            self._expire_task = asyncio.create_task(self._expire_loop())
             print("Job queue worker started")
 
+    async def _load_counts(self):
+        """Seed the finished job counters from the store."""
+        stored = await asyncio.to_thread(self._store.count_by_status)
+        for status in (JobStatus.COMPLETED, JobStatus.FAILED):
+            self._status_counts[status] = stored.get(status.value, 0)
+
+    async def _requeue_unfinished(self):
+        """Queue jobs left pending or processing by a previous run."""
+        jobs = await asyncio.to_thread(self._store.unfinished)
+        for job in jobs:
+            job.status = JobStatus.PENDING
+            job.progress = 0
+            job.message = "Job re-queued after restart"
+            await self._enqueue(job)
+        if jobs:
+            print(f"Re-queued {len(jobs)} unfinished jobs")
+
+    async def _expire_loop(self):
+        """Periodically delete finished jobs past their TTL."""
+        while True:
+            await asyncio.sleep(EXPIRE_INTERVAL_SECONDS)
+            try:
+                expired = await asyncio.to_thread(self._store.expire)
+                for job_id, status in expired:
+                    self._status_counts[JobStatus(status)] -= 1
+                    if self.results is not None:
+                        await asyncio.to_thread(self.results.delete, job_id)
+                if expired:
+                    print(f"Expired {len(expired)} finished jobs")
+            except Exception as e:
+                print(f"Job expiry error: {e}")
+
     async def stop(self):
         """Stop the background worker."""
+        if self._expire_task:
+            self._expire_task.cancel()
+            self._expire_task = None
         if self._worker_task:
             self._worker_task.cancel()
             try:
@@ -111,29 +422,205 @@ class JobQueue:
         self,
         video_path: str,
         swing_id: str,
-        user_type: str = "USER"
+        user_type: str = "USER",
+        priority: JobPriority = JobPriority.INTERACTIVE,
+        content_hash: Optional[str] = None,
+        timings: Optional[StageTimings] = None
     ) -> Job:
         """
-        Submit a new job to the queue.
+        Submit a new job to the queue, or find the job for identical content.
+
+        The duplicate lookup and the insert run under the content hash's
+        lock, so of several concurrent submissions of the same video only
+        the first creates a job.
 
         Args:
             video_path: Path to the uploaded video
             swing_id: Unique identifier for the swing
             user_type: "USER" or "PRO"
+            priority: Scheduling class (default: INTERACTIVE)
+            content_hash: SHA-256 of the video, matched against existing jobs
+            timings: Stage times recorded before submission (upload)
+
+        Returns:
+            The created Job, or the queued, running or completed job for the
+            same content. A job whose swing_id differs from the one passed
+            in is a reused duplicate.
+        """
+        async with self._hash_lock(content_hash):
+            if content_hash is not None:
+                existing = await self.find_duplicate(content_hash)
+                if existing is not None:
+                    return existing
+
+            job_id = str(uuid.uuid4())
+            job = Job(
+                job_id=job_id,
+                video_path=video_path,
+                swing_id=swing_id,
+                user_type=user_type,
+                priority=priority,
+                content_hash=content_hash,
+                timings=timings
+            )
+            await asyncio.to_thread(self._store.put, job)
+            await self._enqueue(job)
+        print(f"Job submitted: {job_id} ({swing_id}, {priority.value})")
+        return job
+
+    async def submit_batch(
+        self,
+        videos: List[Tuple[str, str, Optional[str], Optional[StageTimings]]],
+        user_type: str = "USER",
+        priority: JobPriority = JobPriority.BULK
+    ) -> Tuple[str, List[Job]]:
+        """
+        Submit several videos as one batch.
+
+        New jobs are written to the store in a single transaction and then
+        queued together. A video whose content matches an existing job (or
+        an earlier video of the same batch) joins the batch with that job
+        instead of creating a new one. The batch holds the lock of every
+        content hash it contains while it checks and inserts, like
+        submit_job.
+
+        Args:
+            videos: (video_path, swing_id, content_hash, upload timings) per video
+            user_type: "USER" or "PRO"
+            priority: Scheduling class (default: BULK)
 
         Returns:
-            The created Job object
-        """
-        job_id = str(uuid.uuid4())
-        job = Job(
-            job_id=job_id,
-            video_path=video_path,
-            swing_id=swing_id,
-            user_type=user_type
+            (batch_id, jobs) with one job per video, in order. A job whose
+            swing_id differs from its video's is a reused duplicate.
+        """
+        async with contextlib.AsyncExitStack() as locks:
+            # Sorted, so batches sharing videos take the locks in one order
+            for content_hash in sorted({video[2] for video in videos if video[2] is not None}):
+                await locks.enter_async_context(self._hash_lock(content_hash))
+            return await self._submit_batch(videos, user_type, priority)
+
+    async def _submit_batch(
+        self,
+        videos: List[Tuple[str, str, Optional[str], Optional[StageTimings]]],
+        user_type: str,
+        priority: JobPriority
+    ) -> Tuple[str, List[Job]]:
+        """Create and store a batch (the caller holds the hash locks)."""
+        batch_id = str(uuid.uuid4())
+        jobs: List[Job] = []
+        new_jobs: List[Job] = []
+        by_hash: Dict[str, Job] = {}
+
+        for video_path, swing_id, content_hash, timings in videos:
+            job = None
+            if content_hash is not None:
+                job = by_hash.get(content_hash)
+                if job is not None:
+                    self._dedup_hits += 1
+                else:
+                    job = await self.find_duplicate(content_hash)
+            if job is None:
+                job = Job(
+                    job_id=str(uuid.uuid4()),
+                    video_path=video_path,
+                    swing_id=swing_id,
+                    user_type=user_type,
+                    priority=priority,
+                    content_hash=content_hash,
+                    batch_id=batch_id,
+                    timings=timings
+                )
+                new_jobs.append(job)
+            if content_hash is not None:
+                by_hash[content_hash] = job
+            jobs.append(job)
+
+        await asyncio.to_thread(
+            self._store.put_batch, batch_id, new_jobs, [job.job_id for job in jobs]
         )
-        self.jobs[job_id] = job
-        await self._pending_queue.put(job)
-        print(f"Job submitted: {job_id} ({swing_id})")
+        self._batches_submitted += 1
+        if new_jobs:
+            self._batch_unfinished[batch_id] = len(new_jobs)
+            self._batch_jobs_unfinished += len(new_jobs)
+        for job in new_jobs:
+            await self._enqueue(job)
+
+        print(f"Batch submitted: {batch_id} ({len(jobs)} videos, {len(new_jobs)} new jobs, {priority.value})")
+        return batch_id, jobs
+
+    @contextlib.asynccontextmanager
+    async def _hash_lock(self, content_hash: Optional[str]):
+        """Hold the submission lock of a content hash (no-op for None)."""
+        if content_hash is None:
+            yield
+            return
+        entry = self._hash_locks.get(content_hash)
+        if entry is None:
+            entry = self._hash_locks[content_hash] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._hash_locks[content_hash]
+
+    async def get_batch(self, batch_id: str) -> Optional[List[Job]]:
+        """
+        Get the jobs of a batch.
+
+        Args:
+            batch_id: Batch identifier
+
+        Returns:
+            Member jobs in submission order (expired ones left out), or None
+            if the batch is unknown
+        """
+        job_ids = await asyncio.to_thread(self._store.get_batch, batch_id)
+        if not job_ids:
+            return None
+        stored = {
+            job.job_id: job
+            for job in await asyncio.to_thread(
+                self._store.get_many, [job_id for job_id in job_ids if job_id not in self.jobs]
+            )
+        }
+        jobs = (self.jobs.get(job_id) or stored.get(job_id) for job_id in job_ids)
+        return [job for job in jobs if job is not None]
+
+    async def _enqueue(self, job: Job):
+        """Add a job to the in-memory set and the priority queue."""
+        self.jobs[job.job_id] = job
+        if job.content_hash is not None:
+            self._by_hash[job.content_hash] = job
+        self._status_counts[JobStatus.PENDING] += 1
+        self._queued[job.priority] += 1
+        self._pending_since[job.job_id] = job.queued_at
+        await self._pending_queue.put((PRIORITY_RANK[job.priority], next(self._sequence), job))
+
+    async def find_duplicate(self, content_hash: str) -> Optional[Job]:
+        """
+        Find the job for a video with the same content.
+
+        Counts towards the dedup hit rate in get_stats().
+
+        Args:
+            content_hash: SHA-256 of the uploaded video
+
+        Returns:
+            A queued, running or completed (not yet expired) job for the
+            same content, or None
+        """
+        job = self._by_hash.get(content_hash)
+        if job is None:
+            job = await asyncio.to_thread(self._store.find_by_content_hash, content_hash)
+        if job is not None and job.status == JobStatus.FAILED:
+            job = None
+        if job is None:
+            self._dedup_misses += 1
+        else:
+            self._dedup_hits += 1
         return job
 
     async def get_job(self, job_id: str) -> Optional[Job]:
@@ -144,23 +631,35 @@ class JobQueue:
             job_id: Job identifier
 
         Returns:
-            Job object or None if not found
+            Job object or None if not found (or expired)
         """
-        return self.jobs.get(job_id)
+        job = self.jobs.get(job_id)
+        if job is None:
+            job = await asyncio.to_thread(self._store.get, job_id)
+        return job
 
     async def _worker(self):
-        """Background worker that processes jobs from the queue."""
+        """Background worker that starts jobs as slots become free."""
         while True:
             try:
-                # Wait for a job
-                job = await self._pending_queue.get()
-
-                # Wait if we're at max concurrency
-                while len(self._processing_tasks) >= self.max_concurrent_jobs:
-                    await asyncio.sleep(0.1)
+                # Wait for a free slot, then take the highest-priority job
+                async with self._slots:
+                    await self._slots.wait_for(
+                        lambda: self._running < self.max_concurrent_jobs
+                    )
+                    self._running += 1
+
+                try:
+                    job = await self._next_job()
+                except BaseException:
+                    self._running -= 1
+                    raise
+
+                job.started_at = time.monotonic()
+                self._wait_times[job.priority].observe(job.started_at - job.queued_at)
 
                 # Process the job
-                task = asyncio.create_task(self._process_job(job))
+                task = asyncio.create_task(self._run_job(job))
                 self._processing_tasks.add(task)
                 task.add_done_callback(self._processing_tasks.discard)
 
@@ -169,50 +668,188 @@ class JobQueue:
             except Exception as e:
                 print(f"Worker error: {e}")
 
+    async def _next_job(self) -> Job:
+        """Take the highest-priority pending job, waiting for one if needed."""
+        _, _, job = await self._pending_queue.get()
+        self._queued[job.priority] -= 1
+        self._pending_since.pop(job.job_id, None)
+        return job
+
+    async def _run_job(self, job: Job):
+        """Process a job, persist it, then free its slot."""
+        try:
+            await self._process_job(job)
+            try:
+                await asyncio.to_thread(self._store_finished, job)
+            except Exception as e:
+                print(f"Failed to store job {job.job_id}: {e}")
+            self.jobs.pop(job.job_id, None)
+            if self._by_hash.get(job.content_hash) is job:
+                del self._by_hash[job.content_hash]
+        finally:
+            async with self._slots:
+                self._running -= 1
+                self._slots.notify()
+
+    def _store_finished(self, job: Job):
+        """Write a finished job to the store (runs in a thread)."""
+        self._store.put(job)
+
     async def _process_job(self, job: Job):
-        """Process a single job."""
+        """Process a single job and spill its result to the result store."""
         try:
-            job.status = JobStatus.PROCESSING
-            job.progress = 10
-            job.message = "Processing video..."
-            job.updated_at = datetime.now()
+            self._update_status(job, JobStatus.PROCESSING, STARTED_PROGRESS, "Processing video...")
 
             if self._processor is None:
                 raise RuntimeError("No processor configured")
 
-            # Run the actual analysis
+            # Run the actual analysis (reports progress via report_progress)
             result = await self._processor(job)
 
             job.result = result
-            job.status = JobStatus.COMPLETED
-            job.progress = 100
-            job.message = "Analysis complete"
-            job.updated_at = datetime.now()
+            if self.results is not None:
+                self.report_progress(job, SAVING_PROGRESS, "Saving results...")
+                await asyncio.to_thread(self._save_result, job)
+            self._update_status(job, JobStatus.COMPLETED, 100, "Analysis complete")
+            self._record_stages(job)
 
             print(f"Job completed: {job.job_id}")
 
         except Exception as e:
-            job.status = JobStatus.FAILED
-            job.progress = 0
-            job.message = "Analysis failed"
             job.error = str(e)
-            job.updated_at = datetime.now()
+            self._update_status(job, JobStatus.FAILED, 0, "Analysis failed")
             print(f"Job failed: {job.job_id} - {e}")
 
+        finally:
+            job.mark_finished()
+
+    def _save_result(self, job: Job):
+        """Write a job's result to the result store (in a worker thread), timed as "serialize".
+
+        If writing fails the result stays in memory with the job.
+        """
+        try:
+            with job.timings.measure("serialize"):
+                job.result_path = self.results.save(job.job_id, job._result)
+            job.result = None
+        except Exception as e:
+            print(f"Failed to save result of job {job.job_id}: {e}")
+
+    def _record_stages(self, job: Job):
+        """Add a completed job's stage times to the per-stage statistics."""
+        for stage, (wall_seconds, cpu_seconds) in job.timings.stages.items():
+            self._stage_times.setdefault(stage, LatencyHistogram()).observe(wall_seconds)
+            self._stage_cpu_seconds[stage] = self._stage_cpu_seconds.get(stage, 0.0) + cpu_seconds
+
+    def report_progress(self, job: Job, progress: int, message: str):
+        """
+        Report progress of a running job (call on the event loop).
+
+        Progress never moves backwards, and is ignored once the job has
+        finished.
+
+        Args:
+            job: The running job
+            progress: Percentage done
+            message: What the job is doing
+        """
+        if job.status == JobStatus.PROCESSING and progress >= job.progress:
+            job.update(progress=progress, message=message)
+
+    def _update_status(self, job: Job, status: JobStatus, progress: int, message: str):
+        """Change a job's status and update the statistics counters."""
+        self._status_counts[job.status] -= 1
+        self._status_counts[status] += 1
+        if status in self._throughput:
+            self._throughput[status].mark()
+            if job.started_at is not None:
+                self._run_times.observe(time.monotonic() - job.started_at)
+            remaining = self._batch_unfinished.get(job.batch_id)
+            if remaining is not None:
+                self._batch_jobs_unfinished -= 1
+                if remaining > 1:
+                    self._batch_unfinished[job.batch_id] = remaining - 1
+                else:
+                    del self._batch_unfinished[job.batch_id]
+        job.update(status, progress, message)
+
     def get_stats(self) -> dict:
-        """Get queue statistics."""
-        pending = sum(1 for j in self.jobs.values() if j.status == JobStatus.PENDING)
-        processing = sum(1 for j in self.jobs.values() if j.status == JobStatus.PROCESSING)
-        completed = sum(1 for j in self.jobs.values() if j.status == JobStatus.COMPLETED)
-        failed = sum(1 for j in self.jobs.values() if j.status == JobStatus.FAILED)
+        """
+        Get queue statistics.
+
+        Includes status counts, per-priority depth and queue wait
+        percentiles, processing time percentiles, wall-clock percentiles and
+        average CPU time per stage (of completed jobs), throughput over the last
+        THROUGHPUT_WINDOW_SECONDS and the age of the oldest pending job.
+        Runs in constant time.
+        """
+        now = time.monotonic()
+        counts = {status.value: count for status, count in self._status_counts.items()}
+        oldest_pending = next(iter(self._pending_since.values()), None)
 
         return {
-            "total": len(self.jobs),
-            "pending": pending,
-            "processing": processing,
-            "completed": completed,
-            "failed": failed,
-            "queue_size": self._pending_queue.qsize() if self._pending_queue else 0
+            "backend": self.BACKEND,
+            "total": sum(counts.values()),
+            **counts,
+            "queue_size": self._pending_queue.qsize() if self._pending_queue else 0,
+            "max_concurrent_jobs": self.max_concurrent_jobs,
+            "running": len(self._processing_tasks),
+            "oldest_pending_age": round(now - oldest_pending, 3) if oldest_pending is not None else 0.0,
+            "throughput": {
+                "window_seconds": THROUGHPUT_WINDOW_SECONDS,
+                **{
+                    f"{status.value}_per_second": round(counter.rate(now), 4)
+                    for status, counter in self._throughput.items()
+                },
+            },
+            **self._run_times.percentiles("processing"),
+            "stages": {
+                stage: {
+                    "count": histogram.count,
+                    **histogram.percentiles("wall"),
+                    "cpu_seconds_avg": round(self._stage_cpu_seconds[stage] / histogram.count, 4)
+                    if histogram.count else 0.0,
+                }
+                for stage, histogram in self._stage_times.items()
+            },
+            "batches": {
+                "submitted": self._batches_submitted,
+                "active": len(self._batch_unfinished),
+                "unfinished_jobs": self._batch_jobs_unfinished,
+            },
+            "dedup": {
+                "hits": self._dedup_hits,
+                "misses": self._dedup_misses,
+                "hit_ratio": round(self._dedup_hits / max(self._dedup_hits + self._dedup_misses, 1), 4),
+            },
+            "priorities": {
+                priority.value: {
+                    "queued": self._queued[priority],
+                    **self._wait_times[priority].percentiles("wait"),
+                }
+                for priority in JobPriority
+            },
+        }
+
+    def get_histograms(self) -> dict:
+        """
+        The raw histograms and counters behind get_stats(), for /metrics.
+
+        Measured by this process (also with a shared queue). The returned
+        objects are live; read them on the event loop.
+
+        Returns:
+            Dict with "wait" ({priority: LatencyHistogram}), "processing"
+            (LatencyHistogram), "stages" ({stage: LatencyHistogram}),
+            "stage_cpu_seconds" ({stage: total}) and "finished"
+            ({"completed"/"failed": total})
+        """
+        return {
+            "wait": {priority.value: histogram for priority, histogram in self._wait_times.items()},
+            "processing": self._run_times,
+            "stages": self._stage_times,
+            "stage_cpu_seconds": self._stage_cpu_seconds,
+            "finished": {status.value: counter.total for status, counter in self._throughput.items()},
         }
 
 
@@ -228,6 +865,12 @@ def get_job_queue() -> JobQueue:
     return _job_queue
 
 
+def set_job_queue(queue: JobQueue):
+    """Replace the global job queue instance (e.g. with a SharedJobQueue). Call before start."""
+    global _job_queue
+    _job_queue = queue
+
+
 async def start_job_queue():
     """Start the global job queue."""
     queue = get_job_queue()
@@ -0,0 +1,518 @@
+"""
+Job Store.
+
+Persistence for finished and queued jobs, so the job queue only keeps
+running jobs in memory. Two implementations:
+- MemoryJobStore: plain dict (jobs are lost on restart)
+- SQLiteJobStore: local SQLite database in WAL mode; jobs survive restarts
+
+Results are not stored here; jobs reference their result file in the
+ResultStore (services/result_store.py). Both stores expire finished jobs
+after a TTL.
+
+SQLiteJobStore can also be shared by several processes on one host: pending
+jobs are claimed atomically with a lease that the claiming process renews
+while it runs the job (see SharedJobQueue in services/shared_queue.py).
+"""
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.metrics import StageTimings
+
+
+# Statuses of jobs that will not change any more
+FINISHED_STATUSES = ("completed", "failed")
+
+# Claim order of priorities (must match PRIORITY_RANK in job_queue.py)
+PRIORITY_ORDER = "CASE priority WHEN 'interactive' THEN 0 WHEN 'bulk' THEN 1 ELSE 2 END"
+
+
+class JobStore:
+    """
+    Interface for job stores.
+
+    Methods are blocking; JobQueue calls them from a worker thread.
+    """
+
+    def put(self, job) -> None:
+        """Insert or update a job (including its result path, if any)."""
+        raise NotImplementedError
+
+    def get(self, job_id: str):
+        """Get a job by ID, or None if it is unknown or expired."""
+        raise NotImplementedError
+
+    def unfinished(self) -> list:
+        """Jobs that were pending or processing, oldest first."""
+        raise NotImplementedError
+
+    def put_batch(self, batch_id: str, jobs: list, job_ids: List[str]) -> None:
+        """
+        Insert a batch's new jobs and record its members, in one transaction.
+
+        Args:
+            batch_id: Batch identifier
+            jobs: New jobs to insert
+            job_ids: All member job IDs in submission order (new jobs and
+                existing jobs reused for duplicate videos)
+        """
+        raise NotImplementedError
+
+    def get_batch(self, batch_id: str) -> List[str]:
+        """Member job IDs of a batch in submission order (empty if unknown)."""
+        raise NotImplementedError
+
+    def get_many(self, job_ids: Iterable[str]) -> list:
+        """
+        Get several jobs at once.
+
+        Args:
+            job_ids: Job identifiers
+
+        Returns:
+            Jobs that exist, in no particular order
+        """
+        jobs = (self.get(job_id) for job_id in job_ids)
+        return [job for job in jobs if job is not None]
+
+    def find_by_content_hash(self, content_hash: str):
+        """Most recent job (not failed) for a video with this content hash, or None."""
+        raise NotImplementedError
+
+    def count_by_status(self) -> Dict[str, int]:
+        """Number of stored jobs per status."""
+        raise NotImplementedError
+
+    def expire(self) -> List[Tuple[str, str]]:
+        """Delete finished jobs older than the TTL; returns their (ID, status)."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release resources."""
+
+
+class MemoryJobStore(JobStore):
+    """In-memory job store with TTL eviction of finished jobs."""
+
+    def __init__(self, ttl_seconds: float = 24 * 3600):
+        """
+        Args:
+            ttl_seconds: How long finished jobs are kept
+        """
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, object] = {}
+        # Content hash -> ID of the latest job for it
+        self._by_hash: Dict[str, str] = {}
+        # Batch ID -> member job IDs
+        self._batches: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, job) -> None:
+        with self._lock:
+            self._jobs[job.job_id] = job
+            if job.content_hash is not None:
+                self._by_hash[job.content_hash] = job.job_id
+
+    def put_batch(self, batch_id: str, jobs: list, job_ids: List[str]) -> None:
+        for job in jobs:
+            self.put(job)
+        with self._lock:
+            self._batches[batch_id] = list(job_ids)
+
+    def get_batch(self, batch_id: str) -> List[str]:
+        with self._lock:
+            return list(self._batches.get(batch_id, []))
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def unfinished(self) -> list:
+        return []  # Nothing survives a restart
+
+    def find_by_content_hash(self, content_hash: str):
+        with self._lock:
+            job = self._jobs.get(self._by_hash.get(content_hash))
+        if job is None or job.status.value == "failed":
+            return None
+        return job
+
+    def count_by_status(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job.status.value] = counts.get(job.status.value, 0) + 1
+        return counts
+
+    def expire(self) -> List[Tuple[str, str]]:
+        cutoff = datetime.now().timestamp() - self.ttl_seconds
+        with self._lock:
+            expired = [
+                (job_id, job.status.value) for job_id, job in self._jobs.items()
+                if job.status.value in FINISHED_STATUSES and job.updated_at.timestamp() < cutoff
+            ]
+            for job_id, _ in expired:
+                job = self._jobs.pop(job_id)
+                if self._by_hash.get(job.content_hash) == job_id:
+                    del self._by_hash[job.content_hash]
+            if expired:
+                self._batches = {
+                    batch_id: job_ids for batch_id, job_ids in self._batches.items()
+                    if any(job_id in self._jobs for job_id in job_ids)
+                }
+        return expired
+
+
+class SQLiteJobStore(JobStore):
+    """
+    SQLite-backed job store.
+
+    Job metadata is indexed by status and created_at. The database runs in
+    WAL mode so status reads do not block writes, and several processes can
+    open the same file: claim() hands each pending job to one of them.
+    """
+
+    COLUMNS = (
+        "job_id, swing_id, video_path, user_type, priority, status, "
+        "progress, message, error, created_at, updated_at, result_path, content_hash, batch_id, "
+        "timings"
+    )
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            swing_id TEXT NOT NULL,
+            video_path TEXT NOT NULL,
+            user_type TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            status TEXT NOT NULL,
+            progress INTEGER NOT NULL,
+            message TEXT NOT NULL,
+            error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            result_path TEXT,
+            lease_owner TEXT,
+            lease_expires REAL,
+            content_hash TEXT,
+            batch_id TEXT,
+            timings TEXT
+        );
+        CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, updated_at);
+        CREATE INDEX IF NOT EXISTS jobs_created_at ON jobs (created_at);
+
+        CREATE TABLE IF NOT EXISTS batch_jobs (
+            batch_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            job_id TEXT NOT NULL,
+            PRIMARY KEY (batch_id, position)
+        );
+        CREATE INDEX IF NOT EXISTS batch_jobs_job_id ON batch_jobs (job_id);
+    """
+
+    # Created after the column migration below
+    INDEXES = """
+        CREATE INDEX IF NOT EXISTS jobs_content_hash ON jobs (content_hash, created_at);
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 24 * 3600):
+        """
+        Open (or create) the database.
+
+        Args:
+            path: SQLite database file
+            ttl_seconds: How long finished jobs are kept
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        # Columns added after the first release
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, column_type in (
+            ("result_path", "TEXT"),
+            ("lease_owner", "TEXT"),
+            ("lease_expires", "REAL"),
+            ("content_hash", "TEXT"),
+            ("batch_id", "TEXT"),
+            ("timings", "TEXT"),
+        ):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        self._conn.executescript(self.INDEXES)
+
+    UPSERT = f"""
+        INSERT INTO jobs ({COLUMNS})
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (job_id) DO UPDATE SET
+            status = excluded.status,
+            progress = excluded.progress,
+            message = excluded.message,
+            error = excluded.error,
+            updated_at = excluded.updated_at,
+            result_path = excluded.result_path,
+            timings = excluded.timings
+    """
+
+    def put(self, job) -> None:
+        with self._lock:
+            self._conn.execute(self.UPSERT, self._job_to_row(job))
+
+    def put_batch(self, batch_id: str, jobs: list, job_ids: List[str]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(self.UPSERT, [self._job_to_row(job) for job in jobs])
+                self._conn.executemany(
+                    "INSERT INTO batch_jobs (batch_id, position, job_id) VALUES (?, ?, ?)",
+                    [(batch_id, position, job_id) for position, job_id in enumerate(job_ids)]
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def get_batch(self, batch_id: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id FROM batch_jobs WHERE batch_id = ? ORDER BY position", (batch_id,)
+            ).fetchall()
+        return [job_id for (job_id,) in rows]
+
+    def active_batches(self) -> Tuple[int, int]:
+        """Number of batches with unfinished jobs, and their unfinished jobs."""
+        with self._lock:
+            batches, jobs = self._conn.execute(
+                "SELECT COUNT(DISTINCT batch_id), COUNT(*) FROM jobs "
+                "WHERE status IN ('pending', 'processing') AND batch_id IS NOT NULL"
+            ).fetchone()
+        return batches, jobs
+
+    def get(self, job_id: str):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {self.COLUMNS} FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return self._row_to_job(row) if row is not None else None
+
+    def find_by_content_hash(self, content_hash: str):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {self.COLUMNS} FROM jobs "
+                "WHERE content_hash = ? AND status != 'failed' "
+                "ORDER BY created_at DESC LIMIT 1",
+                (content_hash,)
+            ).fetchone()
+        return self._row_to_job(row) if row is not None else None
+
+    def get_many(self, job_ids: Iterable[str]) -> list:
+        job_ids = list(job_ids)
+        if not job_ids:
+            return []
+        placeholders = ", ".join("?" * len(job_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {self.COLUMNS} FROM jobs WHERE job_id IN ({placeholders})", job_ids
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def unfinished(self) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {self.COLUMNS} FROM jobs "
+                "WHERE status IN ('pending', 'processing') ORDER BY created_at"
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def claim(self, owner: str, lease_seconds: float):
+        """
+        Atomically take the next job to run.
+
+        Picks the highest-priority, oldest pending job, or a processing job
+        whose lease has expired (its process died), marks it processing and
+        leases it to the caller. A single UPDATE does this, so concurrent
+        processes never claim the same job.
+
+        Args:
+            owner: Identifier of the claiming process
+            lease_seconds: How long the claim holds without renew()
+
+        Returns:
+            The claimed Job, or None if no job is available
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"""
+                UPDATE jobs SET
+                    status = 'processing',
+                    lease_owner = ?,
+                    lease_expires = ?,
+                    updated_at = ?
+                WHERE job_id = (
+                    SELECT job_id FROM jobs
+                    WHERE status = 'pending'
+                       OR (status = 'processing' AND (lease_expires IS NULL OR lease_expires < ?))
+                    ORDER BY {PRIORITY_ORDER}, created_at
+                    LIMIT 1
+                )
+                RETURNING {self.COLUMNS}
+                """,
+                (owner, now + lease_seconds, now, now)
+            ).fetchone()
+        return self._row_to_job(row) if row is not None else None
+
+    def renew(self, jobs: list, owner: str, lease_seconds: float) -> None:
+        """
+        Extend the leases of running jobs.
+
+        Jobs whose lease was taken over by another process are left alone.
+
+        Args:
+            jobs: Jobs claimed by owner that are still running
+            owner: Identifier passed to claim()
+            lease_seconds: New lease length from now
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                """
+                UPDATE jobs SET lease_expires = ?, updated_at = ?
+                WHERE job_id = ? AND lease_owner = ? AND status = 'processing'
+                """,
+                [(now + lease_seconds, now, job.job_id, owner) for job in jobs]
+            )
+
+    def update_progress(self, jobs: list, owner: str) -> None:
+        """
+        Record the progress, message and stage timings of running jobs.
+
+        Jobs whose lease was taken over by another process are left alone.
+
+        Args:
+            jobs: Jobs claimed by owner that are still running
+            owner: Identifier passed to claim()
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                """
+                UPDATE jobs SET progress = ?, message = ?, timings = ?, updated_at = ?
+                WHERE job_id = ? AND lease_owner = ? AND status = 'processing'
+                """,
+                [
+                    (job.progress, job.message, self._timings_json(job), now, job.job_id, owner)
+                    for job in jobs
+                ]
+            )
+
+    def finish(self, job, owner: str) -> bool:
+        """
+        Record the outcome of a job, if owner still holds its lease.
+
+        A process whose lease expired must not overwrite the job once
+        another process has claimed it again.
+
+        Args:
+            job: Completed or failed job
+            owner: Identifier passed to claim()
+
+        Returns:
+            True if the job was written, False if the lease was lost
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                UPDATE jobs SET
+                    status = ?, progress = ?, message = ?, error = ?, updated_at = ?,
+                    result_path = ?, timings = ?
+                WHERE job_id = ? AND lease_owner = ? AND status = 'processing'
+                """,
+                (
+                    job.status.value, job.progress, job.message, job.error,
+                    job.updated_at.timestamp(), job.result_path, self._timings_json(job),
+                    job.job_id, owner
+                )
+            )
+        return cursor.rowcount == 1
+
+    def pending_by_priority(self) -> Dict[str, Tuple[int, float]]:
+        """Per priority: (number of pending jobs, creation time of the oldest one)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT priority, COUNT(*), MIN(created_at) FROM jobs "
+                "WHERE status = 'pending' GROUP BY priority"
+            ).fetchall()
+        return {priority: (count, oldest) for priority, count, oldest in rows}
+
+    def count_by_status(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def expire(self) -> List[Tuple[str, str]]:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            rows = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('completed', 'failed') AND updated_at < ? "
+                "RETURNING job_id, status",
+                (cutoff,)
+            ).fetchall()
+            self._conn.executemany(
+                "DELETE FROM batch_jobs WHERE job_id = ?", [(job_id,) for job_id, _ in rows]
+            )
+        return [(job_id, status) for job_id, status in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _job_to_row(self, job) -> tuple:
+        """Values of a Job in COLUMNS order."""
+        return (
+            job.job_id, job.swing_id, job.video_path, job.user_type, job.priority.value,
+            job.status.value, job.progress, job.message, job.error,
+            job.created_at.timestamp(), job.updated_at.timestamp(), job.result_path,
+            job.content_hash, job.batch_id, self._timings_json(job),
+        )
+
+    def _timings_json(self, job) -> Optional[str]:
+        """A job's stage timings as stored in the timings column."""
+        return json.dumps(job.timings.to_dict()) if job.timings.stages else None
+
+    def _row_to_job(self, row: tuple):
+        """Rebuild a Job from a jobs table row."""
+        from services.job_queue import Job, JobPriority, JobStatus
+
+        (job_id, swing_id, video_path, user_type, priority, status, progress, message,
+         error, created_at, updated_at, result_path, content_hash, batch_id, timings) = row
+        job = Job(
+            job_id=job_id,
+            video_path=video_path,
+            swing_id=swing_id,
+            user_type=user_type,
+            priority=JobPriority(priority),
+            content_hash=content_hash,
+            batch_id=batch_id,
+            timings=StageTimings.from_dict(json.loads(timings)) if timings else None
+        )
+        job.status = JobStatus(status)
+        job.progress = progress
+        job.message = message
+        job.error = error
+        job.created_at = datetime.fromtimestamp(created_at)
+        job.updated_at = datetime.fromtimestamp(updated_at)
+        job.result_path = result_path
+        if status in FINISHED_STATUSES:
+            job.mark_finished()
+        return job
+
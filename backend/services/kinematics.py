@@ -0,0 +1,87 @@
+"""
+Vectorized Kinematics Engine.
+
+Computes velocity, acceleration, jerk and speed for every joint of a
+(N, 44, 3) pose sequence in single numpy passes. A Kinematics object is
+computed once per model or job and shared by every downstream metric
+(velocityData, rhythm, scoring, comparison).
+"""
+import numpy as np
+
+from services.skeleton import YOC44_INDEX
+
+
+class Kinematics:
+    """
+    Finite-difference derivatives of a pose sequence, for all joints.
+
+    Each derivative is one frame shorter than the previous one:
+    velocity[i] is the motion from frame i to i + 1, acceleration[i] the
+    change from velocity[i] to velocity[i + 1], and so on. All arrays are
+    float32 and in normalized units per second (per second squared, ...).
+
+    Attributes:
+        fps: Frames per second of the source sequence
+        velocity: (N-1, J, 3) per-joint velocity vectors
+        acceleration: (N-2, J, 3) per-joint acceleration vectors
+        jerk: (N-3, J, 3) per-joint jerk vectors
+        speed: (N-1, J) per-joint velocity magnitude
+        acceleration_magnitude: (N-2, J) per-joint acceleration magnitude
+        jerk_magnitude: (N-3, J) per-joint jerk magnitude
+    """
+
+    def __init__(self, pose_3d: np.ndarray, fps: float):
+        """
+        Compute kinematics for a pose sequence.
+
+        Args:
+            pose_3d: (N, J, 3) joint positions
+            fps: Frames per second
+        """
+        pose = np.asarray(pose_3d, dtype=np.float32)
+        scale = np.float32(fps)
+
+        self.fps = float(fps)
+        self.velocity = np.diff(pose, axis=0) * scale
+        self.acceleration = np.diff(self.velocity, axis=0) * scale
+        self.jerk = np.diff(self.acceleration, axis=0) * scale
+
+        self.speed = np.linalg.norm(self.velocity, axis=-1)
+        self.acceleration_magnitude = np.linalg.norm(self.acceleration, axis=-1)
+        self.jerk_magnitude = np.linalg.norm(self.jerk, axis=-1)
+
+    @property
+    def nbytes(self) -> int:
+        """Total memory held by the derivative arrays."""
+        return sum(
+            array.nbytes for array in (
+                self.velocity, self.acceleration, self.jerk,
+                self.speed, self.acceleration_magnitude, self.jerk_magnitude,
+            )
+        )
+
+    def joint_speed(self, joint: str) -> np.ndarray:
+        """
+        Get the speed curve of a single joint.
+
+        Args:
+            joint: YOC44 joint name, e.g. "right_wrist"
+
+        Returns:
+            (N-1,) speed in normalized units per second
+        """
+        return self.speed[:, YOC44_INDEX[joint]]
+
+
+def compute_kinematics(pose_3d: np.ndarray, fps: float) -> Kinematics:
+    """
+    Compute kinematics for a (N, 44, 3) pose sequence.
+
+    Args:
+        pose_3d: (N, 44, 3) joint positions
+        fps: Frames per second
+
+    Returns:
+        Kinematics for all joints
+    """
+    return Kinematics(pose_3d, fps)
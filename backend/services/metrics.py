@@ -0,0 +1,175 @@
+"""
+Metrics Primitives.
+
+Constant-time counters for serving statistics on every request (health
+probes, /stats, /metrics):
+- LatencyHistogram: log-bucketed durations with approximate percentiles
+  (also used with other bounds, e.g. for response sizes)
+- RateCounter: events per second over a rolling window
+
+StageTimings records where one job spent its time.
+"""
+import bisect
+import math
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+
+# Histogram bucket bounds in seconds: 1 ms to ~1 h, each 25% above the last
+DEFAULT_BUCKETS = tuple(0.001 * 1.25 ** i for i in range(68))
+
+
+class LatencyHistogram:
+    """
+    Histogram of durations with fixed, log-spaced buckets.
+
+    Recording and percentile queries cost O(buckets) at most, independent
+    of how many samples were recorded. Percentiles are approximate: they
+    are interpolated within a bucket, so the error is bounded by the bucket
+    width (25% with the default buckets).
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        """
+        Args:
+            buckets: Increasing bucket upper bounds in seconds; larger
+                values go to an overflow bucket
+        """
+        self.bounds: List[float] = list(buckets)
+        self.counts: List[int] = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        """Record a duration."""
+        seconds = max(seconds, 0.0)
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, pct: float) -> float:
+        """
+        Approximate percentile of recorded durations.
+
+        Args:
+            pct: Percentile in [0, 100]
+
+        Returns:
+            Duration in seconds (0.0 if nothing was recorded)
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(self.count * pct / 100))
+        seen = 0
+        for idx, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank:
+                lower = self.bounds[idx - 1] if idx > 0 else 0.0
+                upper = self.bounds[idx] if idx < len(self.bounds) else self.max
+                value = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(value, self.max)
+            seen += bucket_count
+        return self.max
+
+    def percentiles(self, prefix: str, pcts: Iterable[int] = (50, 95, 99)) -> Dict[str, float]:
+        """
+        Several percentiles as a stats dict.
+
+        Args:
+            prefix: Key prefix, e.g. "wait" gives wait_p50, wait_p95, ...
+            pcts: Percentiles to report
+
+        Returns:
+            {f"{prefix}_p{pct}": seconds}
+        """
+        return {f"{prefix}_p{pct}": round(self.percentile(pct), 4) for pct in pcts}
+
+
+class RateCounter:
+    """
+    Events per second over a rolling window.
+
+    Events are counted in one-second slots of a ring buffer, so marking and
+    reading cost O(window) at most regardless of the event rate.
+    """
+
+    def __init__(self, window_seconds: int = 60):
+        """
+        Args:
+            window_seconds: Length of the rolling window
+        """
+        self.window_seconds = window_seconds
+        self._slots: List[int] = [0] * window_seconds
+        self._stamps: List[int] = [-1] * window_seconds
+        self.total = 0
+
+    def mark(self, count: int = 1, now: Optional[float] = None):
+        """Record events at the current time."""
+        second = int(time.monotonic() if now is None else now)
+        idx = second % self.window_seconds
+        if self._stamps[idx] != second:
+            self._stamps[idx] = second
+            self._slots[idx] = 0
+        self._slots[idx] += count
+        self.total += count
+
+    def rate(self, now: Optional[float] = None) -> float:
+        """Average events per second over the window."""
+        second = int(time.monotonic() if now is None else now)
+        events = sum(
+            count for count, stamp in zip(self._slots, self._stamps)
+            if second - stamp < self.window_seconds
+        )
+        return events / self.window_seconds
+
+
+class StageTimings:
+    """
+    Wall-clock and CPU seconds per stage of one job.
+
+    CPU time is thread CPU time (time.thread_time) of the threads doing the
+    stage's work. Stages that run as a pipeline (decode, inference) overlap
+    in wall-clock time, so stage times can add up to more than the job's.
+    """
+
+    def __init__(self):
+        # Stage name -> [wall seconds, CPU seconds], in the order first recorded
+        self.stages: Dict[str, List[float]] = {}
+
+    def add(self, stage: str, wall_seconds: float, cpu_seconds: float):
+        """Add time spent in a stage."""
+        totals = self.stages.setdefault(stage, [0.0, 0.0])
+        totals[0] += wall_seconds
+        totals[1] += cpu_seconds
+
+    @contextmanager
+    def measure(self, stage: str):
+        """Time the enclosed block (run on one thread) as part of a stage."""
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - wall, time.thread_time() - cpu)
+
+    def update(self, other: "StageTimings"):
+        """Add the times recorded by another StageTimings."""
+        for stage, (wall_seconds, cpu_seconds) in other.stages.items():
+            self.add(stage, wall_seconds, cpu_seconds)
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """{stage: {"wall_seconds": ..., "cpu_seconds": ...}}"""
+        return {
+            stage: {"wall_seconds": round(wall_seconds, 6), "cpu_seconds": round(cpu_seconds, 6)}
+            for stage, (wall_seconds, cpu_seconds) in self.stages.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Dict[str, float]]]) -> "StageTimings":
+        """Rebuild from to_dict() output (None gives empty timings)."""
+        timings = cls()
+        for stage, times in (data or {}).items():
+            timings.add(stage, times["wall_seconds"], times["cpu_seconds"])
+        return timings
@@ -0,0 +1,203 @@
+"""
+Pose Sequence Selection.
+
+Frame decimation, time windows and joint subsets for pose payloads, used by
+clients that need only part of a swing (thumbnails, mobile previews). The
+selection is applied as numpy slicing before serialization.
+"""
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from services.skeleton import YOC44_INDEX, YOC44_JOINTS
+from services.swing_result import SwingResult
+
+
+class PoseSelection:
+    """
+    Frame range, stride and joint subset requested for a pose sequence.
+
+    Attributes:
+        stride: Keep every stride-th frame
+        max_frames: Upper bound on returned frames; the stride is raised
+            as needed to stay under it
+        window: (start, stop) frame offsets relative to impact_frame,
+            stop exclusive; always contains the impact frame (start <= 0 < stop)
+        joints: Joint names to keep, in output order (None keeps all)
+    """
+
+    def __init__(
+        self,
+        stride: int = 1,
+        max_frames: Optional[int] = None,
+        window: Optional[Tuple[int, int]] = None,
+        joints: Optional[List[str]] = None
+    ):
+        """
+        Create a selection.
+
+        Raises:
+            ValueError: If stride or max_frames is not positive, or the
+                window is empty or leaves out the impact frame
+        """
+        if stride < 1:
+            raise ValueError("stride must be at least 1")
+        if max_frames is not None and max_frames < 1:
+            raise ValueError("max_frames must be at least 1")
+        if window is not None and window[0] >= window[1]:
+            raise ValueError("window start must be before its end")
+        if window is not None and not window[0] <= 0 < window[1]:
+            # impact_frame could not point at the impact in the selected frames
+            raise ValueError("window must contain the impact frame (start <= 0 < end)")
+
+        self.stride = stride
+        self.max_frames = max_frames
+        self.window = window
+        self.joints = joints
+
+    @classmethod
+    def parse(
+        cls,
+        stride: Optional[int] = None,
+        max_frames: Optional[int] = None,
+        window: Optional[str] = None,
+        joints: Optional[str] = None
+    ) -> "PoseSelection":
+        """
+        Build a selection from query parameter strings.
+
+        Args:
+            stride: Frame stride
+            max_frames: Maximum number of frames
+            window: "start:stop" frame offsets relative to impact, e.g. "-45:15"
+            joints: Comma-separated joint names or YOC44 indices,
+                e.g. "right_wrist,right_elbow" or "4,3"
+
+        Returns:
+            PoseSelection
+
+        Raises:
+            ValueError: On malformed values or unknown joints
+        """
+        parsed_window = None
+        if window:
+            try:
+                start, stop = (int(part) for part in window.split(":"))
+            except ValueError:
+                raise ValueError(f"Invalid window: {window} (expected start:stop)")
+            parsed_window = (start, stop)
+
+        return cls(
+            stride=stride or 1,
+            max_frames=max_frames,
+            window=parsed_window,
+            joints=_parse_joints(joints) if joints else None
+        )
+
+    @property
+    def is_identity(self) -> bool:
+        """True if the selection keeps the whole sequence."""
+        return self.stride == 1 and self.max_frames is None and self.window is None and self.joints is None
+
+    def cache_key(self) -> tuple:
+        """Hashable key identifying this selection."""
+        return (
+            self.stride,
+            self.max_frames,
+            self.window,
+            tuple(self.joints) if self.joints is not None else None,
+        )
+
+    def frame_slice(self, frames: int, impact_frame: int) -> slice:
+        """
+        Resolve the selection to a frame slice for a sequence.
+
+        Args:
+            frames: Number of frames in the sequence
+            impact_frame: Frame index of ball impact
+
+        Returns:
+            slice(start, stop, step)
+
+        Raises:
+            ValueError: If no frames are selected
+        """
+        start, stop = 0, frames
+        if self.window is not None:
+            start = max(0, impact_frame + self.window[0])
+            stop = min(frames, impact_frame + self.window[1])
+        if start >= stop:
+            raise ValueError("window selects no frames")
+
+        step = self.stride
+        if self.max_frames is not None:
+            step = max(step, math.ceil((stop - start) / self.max_frames))
+        return slice(start, stop, step)
+
+    def apply(self, result: SwingResult) -> SwingResult:
+        """
+        Apply the selection to a swing result.
+
+        Args:
+            result: Full swing result
+
+        Returns:
+            The same result if the selection is the identity, else a
+            selected copy
+        """
+        if self.is_identity:
+            return result
+        return result.select(self.frame_slice(result.frames, result.impact_frame), self.joints)
+
+    def select_pose(
+        self,
+        pose_3d: np.ndarray,
+        fps: float,
+        impact_frame: int
+    ) -> Tuple[np.ndarray, float, int]:
+        """
+        Apply the selection to a bare (N, 44, 3) YOC44 pose array.
+
+        Args:
+            pose_3d: (N, 44, 3) joint positions
+            fps: Frames per second
+            impact_frame: Frame index of ball impact
+
+        Returns:
+            (pose_3d, fps, impact_frame) for the selected frames and joints
+        """
+        if self.is_identity:
+            return pose_3d, fps, impact_frame
+
+        frames = self.frame_slice(len(pose_3d), impact_frame)
+        pose = pose_3d[frames]
+        if self.joints is not None:
+            pose = pose[:, [YOC44_INDEX[name] for name in self.joints]]
+
+        # The window contains impact; the clamp only absorbs rounding to the stride
+        impact = round((impact_frame - frames.start) / frames.step)
+        return pose, fps / frames.step, min(max(impact, 0), max(len(pose) - 1, 0))
+
+
+def _parse_joints(joints: str) -> List[str]:
+    """Resolve comma-separated joint names or YOC44 indices to names."""
+    names = []
+    for token in joints.split(","):
+        token = token.strip()
+        if not token:
+            continue
+        if token.isdigit():
+            idx = int(token)
+            if idx >= len(YOC44_JOINTS):
+                raise ValueError(f"Joint index out of range: {idx}")
+            name = YOC44_JOINTS[idx]
+        elif token in YOC44_INDEX:
+            name = token
+        else:
+            raise ValueError(f"Unknown joint: {token}")
+        if name not in names:
+            names.append(name)
+    if not names:
+        raise ValueError("joints selects no joints")
+    return names
@@ -0,0 +1,155 @@
+"""
+Pro Data Store.
+
+This module provides read access to the pro/reference skeleton data produced by
+skeleton_viewer_standalone/build_data.py.
+
+Two on-disk layouts are supported:
+- Binary store (preferred): a directory holding a small index.json plus one
+  float32 (N, 44, 3) .npy file per model. Pose arrays are memory-mapped, so
+  startup only reads the index and pages are loaded when a model is served.
+- Legacy skeleton_data.json: parsed at startup to build the index only.
+  A model's poses are converted to a float32 array when it is loaded, so
+  only models held by the caller's cache stay in memory. Each load parses
+  the whole file again, so prefer the binary store for anything but small
+  data sets.
+"""
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+STORE_INDEX_FILE = "index.json"
+STORE_VERSION = 1
+
+
+class ProDataStore:
+    """
+    Index and pose arrays for pro/reference models.
+
+    The index (frames, fps, impact_frame per model) is always held in memory.
+    Pose arrays are returned as read-only float32 arrays of shape (N, 44, 3).
+    """
+
+    def __init__(self, store_path: Optional[str] = None, json_path: Optional[str] = None):
+        """
+        Initialize the store.
+
+        Args:
+            store_path: Optional path to a binary store directory (index.json + .npy)
+            json_path: Optional path to legacy skeleton_data.json, used when
+                the binary store is missing
+        """
+        self.store_path = Path(store_path) if store_path else None
+        self.json_path = Path(json_path) if json_path else None
+        self.source: Optional[str] = None
+        self._index: Dict[str, dict] = {}
+
+    def load(self):
+        """(Re)load the index from the binary store, falling back to JSON."""
+        if self.store_path and (self.store_path / STORE_INDEX_FILE).exists():
+            self._load_binary_index()
+        elif self.json_path and self.json_path.exists():
+            self._load_json()
+        else:
+            self._index = {}
+            self.source = None
+
+    def _load_binary_index(self):
+        """Read index.json from the binary store."""
+        with open(self.store_path / STORE_INDEX_FILE, "r") as f:
+            index = json.load(f)
+
+        version = index.get("version")
+        if version != STORE_VERSION:
+            raise ValueError(f"Unsupported pro data store version: {version}")
+
+        self._index = {
+            code: {
+                "frames": int(entry["frames"]),
+                "fps": float(entry["fps"]),
+                "impact_frame": int(entry["impact_frame"]),
+                "shape": tuple(entry["shape"]),
+                "file": entry["file"],
+            }
+            for code, entry in index.get("models", {}).items()
+        }
+        self.source = str(self.store_path)
+
+    def _load_json(self):
+        """Build the index from legacy skeleton_data.json (poses are not kept)."""
+        with open(self.json_path, "r") as f:
+            raw = json.load(f)
+
+        self._index = {}
+        for code, entry in raw.items():
+            pose_3d = entry["pose_3d"]
+            self._index[code] = {
+                "frames": int(entry["frames"]),
+                "fps": float(entry["fps"]),
+                "impact_frame": int(entry["impact_frame"]),
+                "shape": (len(pose_3d), len(pose_3d[0]), len(pose_3d[0][0])) if pose_3d else (0, 0, 3),
+                "file": None,
+            }
+        self.source = str(self.json_path)
+
+    def _load_json_pose(self, model_code: str) -> np.ndarray:
+        """Parse skeleton_data.json again and convert one model's poses."""
+        with open(self.json_path, "r") as f:
+            raw = json.load(f)
+        pose_3d = np.asarray(raw[model_code]["pose_3d"], dtype=np.float32)
+        pose_3d.setflags(write=False)
+        return pose_3d
+
+    def __contains__(self, model_code: str) -> bool:
+        return model_code in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def model_codes(self) -> List[str]:
+        """Get sorted list of model codes in the index."""
+        return sorted(self._index.keys())
+
+    def get_index_entry(self, model_code: str) -> Optional[dict]:
+        """
+        Get the index entry for a model without touching its pose data.
+
+        Args:
+            model_code: Model code like "T01"
+
+        Returns:
+            Dictionary with frames, fps, impact_frame and shape, or None
+        """
+        return self._index.get(model_code)
+
+    def load_pose(self, model_code: str) -> np.ndarray:
+        """
+        Load the pose array for a model.
+
+        For the binary store this memory-maps the .npy file; no pose data is
+        read until the array is accessed. For legacy JSON the file is parsed
+        and the model's poses are returned as a new array (not retained).
+
+        Args:
+            model_code: Model code like "T01"
+
+        Returns:
+            Read-only float32 array of shape (N, 44, 3)
+
+        Raises:
+            KeyError: If the model is not in the index
+        """
+        entry = self._index[model_code]
+        if entry["file"] is None:
+            return self._load_json_pose(model_code)
+
+        pose_3d = np.load(self.store_path / entry["file"], mmap_mode="r")
+        if pose_3d.dtype != np.float32 or pose_3d.shape != entry["shape"]:
+            raise ValueError(
+                f"Pro data for {model_code} does not match index: "
+                f"{pose_3d.dtype} {pose_3d.shape}"
+            )
+        return pose_3d
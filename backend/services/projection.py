@@ -0,0 +1,100 @@
+"""
+3D to 2D Pose Projection.
+
+Maps the 44-joint YOC44 sequence onto the 17 COCO joints and projects every
+frame through one pinhole camera in a single matrix multiply. The projected
+sequence is framed once (shared scale and center for all frames) and
+normalized to [0, 1] image coordinates, with y pointing down.
+"""
+from typing import Optional, Sequence
+
+import numpy as np
+
+from services.skeleton import COCO_INDEX, COCO_JOINTS, YOC44_INDEX
+
+
+# YOC44 joint index for each COCO joint, in COCO order
+YOC44_TO_COCO = np.array([YOC44_INDEX[name] for name in COCO_JOINTS])
+
+# Default camera relative to the swing center (matches the skeleton viewer's
+# default preset: slightly right of front, raised and looking down)
+DEFAULT_CAMERA_OFFSET = (0.18, 1.27, 3.72)
+
+# Blank border kept around the projected sequence, as a fraction of the image
+FRAME_MARGIN = 0.05
+
+
+def look_at(eye: np.ndarray, target: np.ndarray, up: Sequence[float] = (0.0, 1.0, 0.0)) -> np.ndarray:
+    """
+    Build a 3x4 world-to-camera matrix [R | t].
+
+    Camera axes: x right, y down, z forward (towards the target).
+
+    Args:
+        eye: Camera position in world coordinates
+        target: Point the camera looks at
+        up: World up direction
+
+    Returns:
+        (3, 4) extrinsic matrix
+    """
+    forward = target - eye
+    forward = forward / np.linalg.norm(forward)
+    right = np.cross(forward, up)
+    right = right / np.linalg.norm(right)
+    down = np.cross(forward, right)
+
+    rotation = np.stack([right, down, forward])
+    translation = -rotation @ eye
+    return np.hstack([rotation, translation[:, None]])
+
+
+def project_to_coco(
+    pose_3d: np.ndarray,
+    camera_offset: Optional[Sequence[float]] = None
+) -> np.ndarray:
+    """
+    Project a YOC44 sequence to normalized COCO 2D keypoints.
+
+    Args:
+        pose_3d: (N, 44, 3) joint positions
+        camera_offset: Camera position relative to the swing center
+            (default: DEFAULT_CAMERA_OFFSET)
+
+    Returns:
+        (N, 17, 2) float32 coordinates in [0, 1] (x right, y down)
+    """
+    coco = np.asarray(pose_3d, dtype=np.float32)[:, YOC44_TO_COCO]  # (N, 17, 3)
+    num_frames = coco.shape[0]
+    if num_frames == 0:
+        return np.zeros((0, len(COCO_JOINTS), 2), dtype=np.float32)
+
+    # World transform: center the swing and make +y point up (the pose
+    # estimator may emit y-down coordinates; the nose must be above the hips)
+    nose = coco[:, COCO_INDEX["nose"], 1].mean()
+    hips = coco[:, [COCO_INDEX["left_hip"], COCO_INDEX["right_hip"]], 1].mean()
+    y_sign = 1.0 if nose >= hips else -1.0
+    center = coco.reshape(-1, 3).mean(axis=0)
+
+    world = np.eye(4)
+    world[1, 1] = y_sign
+    world[:3, 3] = -center * np.array([1.0, y_sign, 1.0])
+
+    offset = np.asarray(camera_offset or DEFAULT_CAMERA_OFFSET, dtype=np.float64)
+    extrinsic = look_at(eye=offset, target=np.zeros(3))
+    projection = (extrinsic @ world).astype(np.float32)  # (3, 4)
+
+    # One batched projection of every keypoint in every frame
+    points = coco.reshape(-1, 3)
+    homogeneous = np.concatenate([points, np.ones((len(points), 1), dtype=np.float32)], axis=1)
+    camera = homogeneous @ projection.T  # (N*17, 3)
+    image = camera[:, :2] / np.maximum(camera[:, 2:3], 1e-6)
+
+    # Frame the whole sequence into [0, 1] with a shared scale
+    low = image.min(axis=0)
+    high = image.max(axis=0)
+    extent = max(float((high - low).max()), 1e-6)
+    scale = (1.0 - 2 * FRAME_MARGIN) / extent
+    normalized = (image - (low + high) / 2) * scale + 0.5
+
+    return np.clip(normalized, 0.0, 1.0).reshape(num_frames, len(COCO_JOINTS), 2).astype(np.float32)
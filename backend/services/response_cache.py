@@ -0,0 +1,102 @@
+"""
+Pre-serialized Response Cache.
+
+Caches the final JSON bytes of model responses so repeated reads of the same
+model skip analysis, pydantic validation and JSON encoding. Responses are
+stored with a placeholder swing ID, which is replaced by the per-request ID
+when the cached bytes are served.
+"""
+import asyncio
+import json
+from typing import Awaitable, Callable, Dict, Hashable, Tuple
+
+from services.cache import LRUCache
+
+
+class ResponseCache:
+    """
+    LRU cache of encoded responses keyed by model code and data version.
+
+    Entries are split around the encoded swing ID so that patching in a new
+    ID is a single bytes concatenation.
+    """
+
+    # Stand-in swing ID used when building a response for the cache
+    ID_PLACEHOLDER = "__swing_id_placeholder__"
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the response cache.
+
+        Args:
+            max_bytes: Maximum total size of cached responses in bytes
+        """
+        self._cache = LRUCache(max_bytes=max_bytes)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._encoded_placeholder = json.dumps(self.ID_PLACEHOLDER).encode()
+
+    async def get_or_build(
+        self,
+        key: Tuple,
+        swing_id: str,
+        builder: Callable[[str], Awaitable[bytes]]
+    ) -> bytes:
+        """
+        Get the encoded response for a key, building it once on a miss.
+
+        Concurrent misses for the same key wait for a single build.
+
+        Args:
+            key: Cache key, e.g. (model_code, data_version)
+            swing_id: Swing ID to patch into the response
+            builder: Async function that takes a swing ID and returns the
+                encoded JSON response for it
+
+        Returns:
+            Encoded JSON response with swing_id patched in
+        """
+        parts = self._cache.get(key)
+        if parts is None:
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                parts = await asyncio.shield(inflight)
+            else:
+                future = asyncio.get_running_loop().create_future()
+                self._inflight[key] = future
+                try:
+                    encoded = await builder(self.ID_PLACEHOLDER)
+                    parts = self._split(encoded)
+                    self._cache.put(key, parts, len(encoded))
+                    future.set_result(parts)
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                except Exception as e:
+                    future.set_exception(e)
+                    # Mark retrieved so an unawaited failure is not logged
+                    future.exception()
+                    raise
+                finally:
+                    del self._inflight[key]
+
+        return self._render(parts, swing_id)
+
+    def invalidate(self):
+        """Drop all cached responses (e.g. after the pro data store reloads)."""
+        self._cache.clear()
+
+    def get_stats(self) -> dict:
+        """Get response cache statistics."""
+        return self._cache.get_stats()
+
+    def _split(self, encoded: bytes) -> Tuple[bytes, bytes]:
+        """Split encoded JSON around the placeholder ID."""
+        if encoded.count(self._encoded_placeholder) != 1:
+            raise ValueError("Encoded response must contain the placeholder ID exactly once")
+        prefix, suffix = encoded.split(self._encoded_placeholder)
+        return prefix, suffix
+
+    def _render(self, parts: Tuple[bytes, bytes], swing_id: str) -> bytes:
+        """Join cached parts with the encoded swing ID."""
+        prefix, suffix = parts
+        return prefix + json.dumps(swing_id).encode() + suffix
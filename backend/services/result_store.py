@@ -0,0 +1,128 @@
+"""
+Result Store.
+
+Completed job results are written once to storage/results/<job_id>/ so jobs
+only hold a reference to them:
+
+    storage/results/<job_id>/
+    ├── result.npz     # raw pose arrays + JSON header (SwingResult.to_buffers)
+    ├── compact.json   # encoded result payload, compact layout (on first request)
+    └── full.json      # encoded result payload, full layout (on first request)
+
+Encoded payloads are streamed straight from disk, so serving a stored result
+does not rebuild any pydantic objects.
+"""
+import io
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from api.negotiation import encode_payload
+from services.swing_result import SwingResult
+
+
+RESULT_FILENAME = "result.npz"
+
+
+class ResultStore:
+    """On-disk store of completed job results, one directory per job."""
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Directory holding one subdirectory per job
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def save(self, job_id: str, result: SwingResult) -> str:
+        """
+        Write a result to disk.
+
+        Args:
+            job_id: Job identifier
+            result: Completed result
+
+        Returns:
+            Path of the written result file
+        """
+        job_dir = self.root / job_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+        path = job_dir / RESULT_FILENAME
+        _write_atomic(path, encode_result(result))
+        return str(path)
+
+    def payload_path(self, result_path: str, layout: str) -> Path:
+        """
+        Get the encoded JSON payload of a result, encoding it on first use.
+
+        Args:
+            result_path: Path returned by save()
+            layout: Payload layout (full or compact)
+
+        Returns:
+            Path of the encoded payload file
+        """
+        path = Path(result_path).with_name(f"{layout}.json")
+        if not path.exists():
+            payload = load_result(result_path).to_payload(layout)
+            _write_atomic(path, encode_payload(payload, layout))
+        return path
+
+    def delete(self, job_id: str):
+        """Delete a job's result directory, if any."""
+        shutil.rmtree(self.root / job_id, ignore_errors=True)
+
+
+def load_result(result_path: str) -> SwingResult:
+    """
+    Read a result written by ResultStore.save().
+
+    Args:
+        result_path: Path returned by save()
+
+    Returns:
+        SwingResult
+    """
+    with open(result_path, "rb") as f:
+        return decode_result(f.read())
+
+
+def encode_result(result: SwingResult) -> bytes:
+    """
+    Encode a SwingResult as an .npz blob.
+
+    Arrays are stored raw; the remaining fields go into a JSON header array.
+    No pickling is involved, so blobs are safe to load.
+    """
+    buffers = result.to_buffers()
+    arrays = {key: value for key, value in buffers.items() if isinstance(value, np.ndarray)}
+    header = {key: value for key, value in buffers.items() if key not in arrays}
+
+    out = io.BytesIO()
+    np.savez(
+        out,
+        header=np.frombuffer(json.dumps(header).encode(), dtype=np.uint8),
+        **arrays
+    )
+    return out.getvalue()
+
+
+def decode_result(blob: bytes) -> SwingResult:
+    """Decode a blob written by encode_result."""
+    with np.load(io.BytesIO(blob), allow_pickle=False) as npz:
+        buffers = json.loads(npz["header"].tobytes())
+        buffers.update({key: npz[key] for key in npz.files if key != "header"})
+    return SwingResult.from_buffers(buffers)
+
+
+def _write_atomic(path: Path, data: bytes):
+    """Write a file so readers never see it half-written."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
@@ -0,0 +1,273 @@
+"""
+Shared Job Queue.
+
+A JobQueue whose pending jobs live in a SQLite database shared by every
+process on the host, so the API can run with `uvicorn --workers N` and
+analyses can run in separate worker processes (worker.py):
+
+- Submitting a job only inserts it into the database.
+- Each process with PROCESS_JOBS enabled claims pending jobs atomically and
+  holds a lease on them, renewed by a heartbeat. Jobs of a process that
+  dies are claimed again once their lease expires (at-least-once); a
+  process that lost its lease does not record the job's outcome.
+- Progress of running jobs is written to the database at most every
+  PROGRESS_PUBLISH_SECONDS.
+- Status, wait and event requests for jobs running in another process are
+  served by polling the database for the jobs being watched.
+"""
+import asyncio
+import os
+import socket
+import time
+import uuid
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+from services.job_queue import Job, JobQueue, JobStatus
+from services.job_store import SQLiteJobStore
+
+
+# Lease on a claimed job; the heartbeat renews it every third of this
+LEASE_SECONDS = 30.0
+
+# How often an idle worker looks for jobs submitted by other processes
+CLAIM_POLL_SECONDS = 0.5
+
+# How often the progress of jobs running here is written to the database
+PROGRESS_PUBLISH_SECONDS = 0.5
+
+# How often jobs watched by clients of this process are refreshed
+WATCH_INTERVAL_SECONDS = 0.25
+
+# How often the shared status counts in get_stats() are refreshed
+STATS_REFRESH_SECONDS = 1.0
+
+
+class SharedJobQueue(JobQueue):
+    """
+    Job queue shared between processes through a SQLiteJobStore.
+
+    Exposes the same interface as JobQueue. self.jobs holds only the jobs
+    running in this process; status counts and queue depth in get_stats()
+    are those of the shared database, while wait and processing times and
+    throughput are measured by this process.
+    """
+
+    BACKEND = "shared"
+
+    def __init__(self, max_concurrent_jobs: int = 3, process_jobs: bool = True):
+        """
+        Initialize the shared job queue.
+
+        Args:
+            max_concurrent_jobs: Maximum number of jobs this process runs at once
+            process_jobs: Claim and run jobs in this process; when False the
+                process only submits and serves jobs
+        """
+        super().__init__(max_concurrent_jobs)
+        self.process_jobs = process_jobs
+        # Identifies this process's leases
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # Set when a job is submitted here, so the local worker claims it at once
+        self._submitted = asyncio.Event()
+        # Unfinished jobs of other processes held by requests in this process
+        self._watched: "weakref.WeakValueDictionary[str, Job]" = weakref.WeakValueDictionary()
+        self._shared_counts: Dict[str, int] = {}
+        self._shared_pending: Dict[str, Tuple[int, float]] = {}
+        self._shared_batches: Tuple[int, int] = (0, 0)
+        self._loop_tasks: List[asyncio.Task] = []
+        # Job ID -> (progress, message) last written to the database
+        self._published: Dict[str, Tuple[int, str]] = {}
+
+    def set_store(self, store: SQLiteJobStore):
+        """
+        Set the shared database. Call before start().
+
+        Args:
+            store: SQLiteJobStore opened on a file every process shares
+
+        Raises:
+            TypeError: If store is not a SQLiteJobStore
+        """
+        if not isinstance(store, SQLiteJobStore):
+            raise TypeError("SharedJobQueue requires a SQLiteJobStore")
+        super().set_store(store)
+
+    async def start(self):
+        """Start claiming jobs (if enabled) and the heartbeat, progress, watch and stats loops."""
+        if self._worker_task is None:
+            await super().start()
+            self._loop_tasks = [
+                asyncio.create_task(self._heartbeat_loop()),
+                asyncio.create_task(self._progress_loop()),
+                asyncio.create_task(self._watch_loop()),
+                asyncio.create_task(self._stats_loop()),
+            ]
+            print(f"Shared job queue: {self.worker_id} (processing jobs: {self.process_jobs})")
+
+    async def stop(self):
+        """Stop the background loops and the worker."""
+        for task in self._loop_tasks:
+            task.cancel()
+        self._loop_tasks = []
+        await super().stop()
+
+    async def _load_counts(self):
+        """Load the shared status counts."""
+        await self._refresh_counts()
+
+    async def _requeue_unfinished(self):
+        """Nothing to do: jobs of dead processes are reclaimed when their lease expires."""
+
+    async def _enqueue(self, job: Job):
+        """The job is already in the shared database; wake the local worker."""
+        self._submitted.set()
+
+    async def get_job(self, job_id: str) -> Optional[Job]:
+        """
+        Get a job by ID.
+
+        Jobs running elsewhere are watched while the caller holds them, so
+        wait() and progress subscriptions work across processes.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Job object or None if not found (or expired)
+        """
+        job = self.jobs.get(job_id) or self._watched.get(job_id)
+        if job is None:
+            job = await asyncio.to_thread(self._store.get, job_id)
+            if job is not None and not job.is_finished:
+                job = self._watched.setdefault(job_id, job)
+        return job
+
+    async def _worker(self):
+        """Claim and run jobs, if this process runs jobs at all."""
+        if self.process_jobs:
+            await super()._worker()
+
+    async def _next_job(self) -> Job:
+        """Claim the next job from the shared database, waiting for one if needed."""
+        while True:
+            self._submitted.clear()
+            try:
+                job = await asyncio.to_thread(self._store.claim, self.worker_id, LEASE_SECONDS)
+            except Exception as e:
+                print(f"Job claim error: {e}")
+                job = None
+            if job is not None:
+                break
+            try:
+                await asyncio.wait_for(self._submitted.wait(), CLAIM_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+        # Queue wait counts from submission, which may have been in another process
+        job.queued_at = time.monotonic() - max(0.0, time.time() - job.created_at.timestamp())
+        self.jobs[job.job_id] = job
+        return job
+
+    def _store_finished(self, job: Job):
+        """Record the job's outcome, unless another process has claimed it since."""
+        if not self._store.finish(job, self.worker_id):
+            print(f"Job {job.job_id}: lease lost to another process, result discarded")
+
+    async def _heartbeat_loop(self):
+        """Renew the leases of jobs running here."""
+        while True:
+            await asyncio.sleep(LEASE_SECONDS / 3)
+            running = [job for job in self.jobs.values() if not job.is_finished]
+            if not running:
+                continue
+            try:
+                await asyncio.to_thread(self._store.renew, running, self.worker_id, LEASE_SECONDS)
+            except Exception as e:
+                print(f"Job lease renewal error: {e}")
+
+    async def _progress_loop(self):
+        """Write changed progress of jobs running here to the database."""
+        while True:
+            await asyncio.sleep(PROGRESS_PUBLISH_SECONDS)
+            changed = [
+                job for job in self.jobs.values()
+                if not job.is_finished
+                and self._published.get(job.job_id) != (job.progress, job.message)
+            ]
+            if not changed:
+                continue
+            try:
+                await asyncio.to_thread(self._store.update_progress, changed, self.worker_id)
+            except Exception as e:
+                print(f"Job progress update error: {e}")
+                continue
+            for job in changed:
+                self._published[job.job_id] = (job.progress, job.message)
+            # Forget jobs that have left this process
+            for job_id in [job_id for job_id in self._published if job_id not in self.jobs]:
+                del self._published[job_id]
+
+    async def _watch_loop(self):
+        """Apply database updates to watched jobs, waking waiters and streams."""
+        while True:
+            await asyncio.sleep(WATCH_INTERVAL_SECONDS)
+            job_ids = list(self._watched.keys())
+            if not job_ids:
+                continue
+            try:
+                stored = await asyncio.to_thread(self._store.get_many, job_ids)
+            except Exception as e:
+                print(f"Job watch error: {e}")
+                continue
+
+            for fresh in stored:
+                job = self._watched.get(fresh.job_id)
+                if job is None:
+                    continue
+                job.error = fresh.error
+                job.result_path = fresh.result_path
+                job.timings = fresh.timings
+                if (fresh.status, fresh.progress, fresh.message) != (job.status, job.progress, job.message):
+                    job.update(fresh.status, fresh.progress, fresh.message)
+                if fresh.is_finished:
+                    job.mark_finished()
+                    self._watched.pop(fresh.job_id, None)
+
+    async def _stats_loop(self):
+        """Periodically refresh the shared status counts."""
+        while True:
+            await asyncio.sleep(STATS_REFRESH_SECONDS)
+            try:
+                await self._refresh_counts()
+            except Exception as e:
+                print(f"Job stats refresh error: {e}")
+
+    async def _refresh_counts(self):
+        """Read status counts and pending jobs per priority from the database."""
+        self._shared_counts = await asyncio.to_thread(self._store.count_by_status)
+        self._shared_pending = await asyncio.to_thread(self._store.pending_by_priority)
+        self._shared_batches = await asyncio.to_thread(self._store.active_batches)
+
+    def get_stats(self) -> dict:
+        """
+        Get queue statistics.
+
+        Status counts, queue sizes, the oldest pending age and active
+        batches cover all processes (refreshed every STATS_REFRESH_SECONDS); wait and
+        processing times and throughput are measured by this process.
+        """
+        stats = super().get_stats()
+        counts = {status.value: self._shared_counts.get(status.value, 0) for status in JobStatus}
+        stats.update(counts)
+        stats["total"] = sum(counts.values())
+        stats["queue_size"] = counts[JobStatus.PENDING.value]
+
+        oldest = min((created for _, created in self._shared_pending.values()), default=None)
+        stats["oldest_pending_age"] = round(max(0.0, time.time() - oldest), 3) if oldest is not None else 0.0
+        stats["batches"]["active"], stats["batches"]["unfinished_jobs"] = self._shared_batches
+        for priority, priority_stats in stats["priorities"].items():
+            priority_stats["queued"] = self._shared_pending.get(priority, (0, 0.0))[0]
+        stats["worker_id"] = self.worker_id
+        stats["process_jobs"] = self.process_jobs
+        return stats
@@ -0,0 +1,44 @@
+"""
+Skeleton joint definitions.
+
+Joint name tables for the 17-joint COCO (2D) and 44-joint YOC44 (3D) formats.
+The YOC44 order matches the skeleton viewer: OpenPose BODY_25 (0-24) followed
+by 19 extra joints (LSP/MPII/H36M landmarks).
+"""
+from typing import List
+
+
+# COCO 17 joint names (2D)
+COCO_JOINTS: List[str] = [
+    "nose", "left_eye", "right_eye", "left_ear", "right_ear",
+    "left_shoulder", "right_shoulder", "left_elbow", "right_elbow",
+    "left_wrist", "right_wrist", "left_hip", "right_hip",
+    "left_knee", "right_knee", "left_ankle", "right_ankle"
+]
+
+# YOC44 joint names (3D)
+YOC44_JOINTS: List[str] = [
+    # OpenPose BODY_25
+    "nose", "neck",
+    "right_shoulder", "right_elbow", "right_wrist",
+    "left_shoulder", "left_elbow", "left_wrist",
+    "mid_hip",
+    "right_hip", "right_knee", "right_ankle",
+    "left_hip", "left_knee", "left_ankle",
+    "right_eye", "left_eye", "right_ear", "left_ear",
+    "left_big_toe", "left_small_toe", "left_heel",
+    "right_big_toe", "right_small_toe", "right_heel",
+    # Extra joints
+    "right_ankle_lsp", "right_knee_lsp", "right_hip_lsp",
+    "left_hip_lsp", "left_knee_lsp", "left_ankle_lsp",
+    "right_wrist_lsp", "right_elbow_lsp", "right_shoulder_lsp",
+    "left_shoulder_lsp", "left_elbow_lsp", "left_wrist_lsp",
+    "neck_lsp", "head_top", "pelvis", "thorax", "spine", "jaw", "head",
+]
+
+NUM_COCO_JOINTS = len(COCO_JOINTS)
+NUM_YOC44_JOINTS = len(YOC44_JOINTS)
+
+# Joint name -> array index
+COCO_INDEX = {name: idx for idx, name in enumerate(COCO_JOINTS)}
+YOC44_INDEX = {name: idx for idx, name in enumerate(YOC44_JOINTS)}
@@ -0,0 +1,420 @@
+"""
+Array-Backed Swing Result.
+
+SwingResult holds a swing analysis with pose data kept as numpy arrays.
+It is the internal representation produced by YOC44Service; the API
+payloads (full or compact layout) are built from it only when a response
+is serialized.
+"""
+import copy
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from api.models.responses import (
+    CompactPoseTrack2D,
+    CompactPoseTrack3D,
+    CompactSwingDataResponse,
+    KineticDataPoint,
+    Keypoint2D,
+    Keypoint3D,
+    PoseFrame2D,
+    PoseFrame3D,
+    RhythmNode,
+    SwingDataResponse,
+)
+from services.kinematics import Kinematics
+from services.skeleton import COCO_JOINTS, YOC44_INDEX, YOC44_JOINTS
+
+
+# Payload layouts
+LAYOUT_FULL = "full"
+LAYOUT_COMPACT = "compact"
+
+# Decimal places kept for coordinates and scores in the compact layout (the
+# full layout sends values unrounded)
+COMPACT_DECIMALS = 4
+
+
+class SwingResult:
+    """
+    Swing analysis result with array-backed pose data.
+
+    Scores may be a scalar (same for every keypoint), a (J,) array (per
+    joint, constant over time) or an (N, J) array (per frame and joint).
+    Pose arrays may hold a subset of the joints (see select); joints_2d and
+    joints_3d name the joints present, in array order.
+    """
+
+    def __init__(
+        self,
+        swing_id: str,
+        user_type: str,
+        fps: float,
+        impact_frame: int,
+        pose_2d: np.ndarray,
+        scores_2d: Union[float, np.ndarray],
+        pose_3d: np.ndarray,
+        scores_3d: Union[float, np.ndarray],
+        score: int,
+        feedback: str,
+        rhythm_track: List[RhythmNode],
+        velocity_data: List[KineticDataPoint],
+        video_url: Optional[str] = None,
+        model_code: Optional[str] = None,
+        hashtag: Optional[str] = None,
+        kinematics: Optional[Kinematics] = None,
+        joints_2d: Optional[List[str]] = None,
+        joints_3d: Optional[List[str]] = None,
+    ):
+        """
+        Initialize the result.
+
+        Args:
+            swing_id: Unique identifier for this swing
+            user_type: "USER" or "PRO"
+            fps: Frames per second
+            impact_frame: Frame index of ball impact
+            pose_2d: (N, 17, 2) normalized COCO coordinates in [0, 1]
+            scores_2d: 2D keypoint confidence (scalar, (17,) or (N, 17))
+            pose_3d: (N, 44, 3) normalized YOC44 coordinates in [-1, 1]
+            scores_3d: 3D keypoint confidence (scalar, (44,) or (N, 44))
+            score: Overall harmony score 0-100
+            feedback: AI coach feedback
+            rhythm_track: Kinetic chain sequence
+            velocity_data: Motion smoothness data
+            video_url: Optional URL to the uploaded video
+            model_code: Optional model code (T01, T02, etc.)
+            hashtag: Optional model hashtag
+            kinematics: Optional per-joint kinematics of pose_3d, kept for
+                downstream metrics (not serialized)
+            joints_2d: Names of the joints in pose_2d (default: all COCO joints)
+            joints_3d: Names of the joints in pose_3d (default: all YOC44 joints)
+        """
+        self.swing_id = swing_id
+        self.user_type = user_type
+        self.fps = float(fps)
+        self.impact_frame = int(impact_frame)
+        self.pose_2d = pose_2d
+        self.scores_2d = scores_2d
+        self.pose_3d = pose_3d
+        self.scores_3d = scores_3d
+        self.score = int(score)
+        self.feedback = feedback
+        self.rhythm_track = rhythm_track
+        self.velocity_data = velocity_data
+        self.video_url = video_url
+        self.model_code = model_code
+        self.hashtag = hashtag
+        self.kinematics = kinematics
+        self.joints_2d = joints_2d if joints_2d is not None else COCO_JOINTS
+        self.joints_3d = joints_3d if joints_3d is not None else YOC44_JOINTS
+
+    @property
+    def frames(self) -> int:
+        """Number of frames."""
+        return int(self.pose_3d.shape[0])
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds."""
+        return self.frames / self.fps
+
+    def with_id(self, swing_id: str) -> "SwingResult":
+        """Return a shallow copy with a different swing ID (arrays are shared)."""
+        result = copy.copy(self)
+        result.swing_id = swing_id
+        return result
+
+    def select(self, frames: slice = slice(None), joints: Optional[Sequence[str]] = None) -> "SwingResult":
+        """
+        Return a result restricted to a frame range and/or a joint subset.
+
+        Frames are selected with basic slicing, so pose arrays are views
+        whenever all joints are kept. fps, impact_frame, rhythm timestamps
+        and velocity data are adjusted to the new time base.
+
+        Args:
+            frames: Frame slice (start, stop, step) into the sequence
+            joints: Joint names to keep, in output order; each track keeps
+                the ones it has (None keeps all joints)
+
+        Returns:
+            New SwingResult (kinematics are dropped)
+        """
+        start, stop, step = frames.indices(self.frames)
+        frames = slice(start, stop, step)
+        num_frames = len(range(start, stop, step))
+
+        joint_idx_2d = joint_idx_3d = None
+        joints_2d, joints_3d = self.joints_2d, self.joints_3d
+        if joints is not None:
+            joints_2d = [name for name in joints if name in self.joints_2d]
+            joints_3d = [name for name in joints if name in self.joints_3d]
+            joint_idx_2d = [self.joints_2d.index(name) for name in joints_2d]
+            joint_idx_3d = [self.joints_3d.index(name) for name in joints_3d]
+
+        pose_2d = self.pose_2d[frames]
+        pose_3d = self.pose_3d[frames]
+        if joint_idx_2d is not None:
+            pose_2d = pose_2d[:, joint_idx_2d]
+            pose_3d = pose_3d[:, joint_idx_3d]
+
+        # Shift times so the first selected frame is t = 0
+        start_time = start / self.fps
+        end_time = stop / self.fps
+        rhythm_track = [
+            node.model_copy(update={"timestamp": round(node.timestamp - start_time, 4)})
+            for node in self.rhythm_track
+            if start_time <= node.timestamp < end_time
+        ]
+        # Velocity points are sampled on their own time base, not per frame
+        velocity_data = [
+            point.model_copy(update={"time": point.time - start_time})
+            for point in self.velocity_data
+            if start_time <= point.time < end_time
+        ]
+
+        # PoseSelection windows contain impact; the clamp below only absorbs
+        # rounding to the stride
+        impact_frame = round((self.impact_frame - start) / step)
+
+        result = copy.copy(self)
+        result.fps = self.fps / step
+        result.impact_frame = min(max(impact_frame, 0), max(num_frames - 1, 0))
+        result.pose_2d = pose_2d
+        result.pose_3d = pose_3d
+        result.scores_2d = _select_scores(self.scores_2d, frames, joint_idx_2d)
+        result.scores_3d = _select_scores(self.scores_3d, frames, joint_idx_3d)
+        result.joints_2d = joints_2d
+        result.joints_3d = joints_3d
+        result.rhythm_track = rhythm_track
+        result.velocity_data = velocity_data
+        result.kinematics = None
+        return result
+
+    def to_wire(self) -> Tuple[dict, Dict[str, np.ndarray]]:
+        """
+        Split the result into a JSON-able header and raw pose arrays.
+
+        Used by the binary wire formats; arrays are returned as held (no copy).
+
+        Returns:
+            (header, arrays) where arrays maps "pose3d" and "pose2d" to arrays
+        """
+        header = {
+            "id": self.swing_id,
+            "userType": self.user_type,
+            "videoUrl": self.video_url,
+            "duration": self.duration,
+            "model_code": self.model_code,
+            "hashtag": self.hashtag,
+            "frames": self.frames,
+            "fps": self.fps,
+            "impact_frame": self.impact_frame,
+            "score": self.score,
+            "feedback": self.feedback,
+            "rhythmTrack": [node.model_dump() for node in self.rhythm_track],
+            "velocityData": [point.model_dump() for point in self.velocity_data],
+            "joints3d": self.joints_3d,
+            "joints2d": self.joints_2d,
+            "scores3d": _compact_scores(self.scores_3d),
+            "scores2d": _compact_scores(self.scores_2d),
+        }
+        arrays = {"pose3d": self.pose_3d, "pose2d": self.pose_2d}
+        return header, arrays
+
+    def to_buffers(self) -> dict:
+        """
+        Pack the result into plain values and numpy arrays.
+
+        Used to pass results between processes: arrays pickle as raw
+        buffers, and no pydantic objects are sent. Kinematics are left out.
+
+        Returns:
+            Dictionary accepted by SwingResult.from_buffers
+        """
+        velocity = np.array(
+            [(point.time, point.velocity, point.jerk) for point in self.velocity_data],
+            dtype=np.float64
+        ).reshape(-1, 3)
+        return {
+            "swing_id": self.swing_id,
+            "user_type": self.user_type,
+            "fps": self.fps,
+            "impact_frame": self.impact_frame,
+            "pose_2d": self.pose_2d,
+            "scores_2d": np.asarray(self.scores_2d),
+            "pose_3d": np.ascontiguousarray(self.pose_3d),
+            "scores_3d": np.asarray(self.scores_3d),
+            "score": self.score,
+            "feedback": self.feedback,
+            "rhythm_track": [node.model_dump() for node in self.rhythm_track],
+            "velocity": velocity,
+            "video_url": self.video_url,
+            "model_code": self.model_code,
+            "hashtag": self.hashtag,
+            "joints_2d": self.joints_2d,
+            "joints_3d": self.joints_3d,
+        }
+
+    @classmethod
+    def from_buffers(cls, buffers: dict) -> "SwingResult":
+        """
+        Rebuild a result packed by to_buffers.
+
+        Args:
+            buffers: Dictionary returned by to_buffers
+
+        Returns:
+            SwingResult (without kinematics)
+        """
+        buffers = dict(buffers)
+        rhythm_track = [RhythmNode.model_construct(**node) for node in buffers.pop("rhythm_track")]
+        velocity_data = [
+            KineticDataPoint.model_construct(time=time, velocity=velocity, jerk=jerk)
+            for time, velocity, jerk in buffers.pop("velocity").tolist()
+        ]
+        return cls(rhythm_track=rhythm_track, velocity_data=velocity_data, **buffers)
+
+    def to_payload(self, layout: str = LAYOUT_FULL) -> Union[SwingDataResponse, CompactSwingDataResponse]:
+        """
+        Build the API payload in the requested layout.
+
+        Args:
+            layout: LAYOUT_FULL or LAYOUT_COMPACT
+
+        Returns:
+            SwingDataResponse or CompactSwingDataResponse
+        """
+        if layout == LAYOUT_COMPACT:
+            return self.to_compact()
+        return self.to_response()
+
+    def to_response(self) -> SwingDataResponse:
+        """Build the full SwingDataResponse (one object per keypoint, values unrounded)."""
+        timestamps = (np.arange(self.frames) / self.fps).tolist()
+        scores_2d = np.broadcast_to(self.scores_2d, self.pose_2d.shape[:2]).tolist()
+        scores_3d = np.broadcast_to(self.scores_3d, self.pose_3d.shape[:2]).tolist()
+
+        pose_data_2d = [
+            PoseFrame2D(
+                timestamp=timestamp,
+                keypoints=[
+                    Keypoint2D(x=x, y=y, score=joint_score, name=self.joints_2d[joint_idx])
+                    for joint_idx, ((x, y), joint_score) in enumerate(zip(frame, frame_scores))
+                ]
+            )
+            for timestamp, frame, frame_scores in zip(
+                timestamps, np.asarray(self.pose_2d).tolist(), scores_2d
+            )
+        ]
+
+        # 3D keypoints are named by their YOC44 index
+        names_3d = [f"joint_{YOC44_INDEX[name]}" for name in self.joints_3d]
+        pose_data_3d = [
+            PoseFrame3D(
+                timestamp=timestamp,
+                keypoints=[
+                    Keypoint3D(x=x, y=y, z=z, score=joint_score, name=name)
+                    for name, (x, y, z), joint_score in zip(names_3d, frame, frame_scores)
+                ]
+            )
+            for timestamp, frame, frame_scores in zip(
+                timestamps, np.asarray(self.pose_3d).tolist(), scores_3d
+            )
+        ]
+
+        return SwingDataResponse(
+            id=self.swing_id,
+            userType=self.user_type,
+            videoUrl=self.video_url,
+            duration=self.duration,
+            model_code=self.model_code,
+            hashtag=self.hashtag,
+            poseData=pose_data_2d,
+            poseData3D=pose_data_3d,
+            frames=self.frames,
+            fps=self.fps,
+            impact_frame=self.impact_frame,
+            score=self.score,
+            feedback=self.feedback,
+            rhythmTrack=self.rhythm_track,
+            velocityData=self.velocity_data
+        )
+
+    def to_compact(self) -> CompactSwingDataResponse:
+        """Build the compact payload straight from the pose arrays.
+
+        No per-keypoint objects are created; arrays are converted to nested
+        lists once and the models are constructed without re-validation.
+        """
+        pose_data_2d = CompactPoseTrack2D.model_construct(
+            joints=self.joints_2d,
+            pose2d=_round_array(self.pose_2d),
+            **_compact_scores(self.scores_2d)
+        )
+        pose_data_3d = CompactPoseTrack3D.model_construct(
+            joints=self.joints_3d,
+            pose3d=_round_array(self.pose_3d),
+            **_compact_scores(self.scores_3d)
+        )
+
+        return CompactSwingDataResponse.model_construct(
+            layout=LAYOUT_COMPACT,
+            id=self.swing_id,
+            userType=self.user_type,
+            videoUrl=self.video_url,
+            duration=self.duration,
+            model_code=self.model_code,
+            hashtag=self.hashtag,
+            poseData=pose_data_2d,
+            poseData3D=pose_data_3d,
+            frames=self.frames,
+            fps=self.fps,
+            impact_frame=self.impact_frame,
+            score=self.score,
+            feedback=self.feedback,
+            rhythmTrack=self.rhythm_track,
+            velocityData=self.velocity_data
+        )
+
+
+def _round_array(values: np.ndarray, decimals: int = COMPACT_DECIMALS) -> list:
+    """Round an array and convert it to nested Python lists."""
+    return np.round(np.asarray(values, dtype=np.float64), decimals).tolist()
+
+
+def _compact_scores(scores: Union[float, np.ndarray]) -> dict:
+    """Pick the coarsest score field that represents the scores exactly.
+
+    Returns a single-item dict: {"score": ...}, {"jointScores": ...} or
+    {"scores": ...}.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+
+    if scores.size == 0:
+        return {"jointScores": []}
+    if scores.ndim == 0 or np.all(scores == scores.flat[0]):
+        return {"score": round(float(scores.flat[0]), COMPACT_DECIMALS)}
+    if scores.ndim == 1:
+        return {"jointScores": _round_array(scores)}
+    if np.all(scores == scores[:1]):
+        return {"jointScores": _round_array(scores[0])}
+    return {"scores": _round_array(scores)}
+
+
+def _select_scores(
+    scores: Union[float, np.ndarray],
+    frames: slice,
+    joint_idx: Optional[List[int]]
+) -> Union[float, np.ndarray]:
+    """Apply a frame slice and joint subset to scalar, (J,) or (N, J) scores."""
+    if np.ndim(scores) == 0:
+        return scores
+    scores = np.asarray(scores)
+    if scores.ndim == 2:
+        scores = scores[frames]
+    if joint_idx is not None:
+        scores = scores[..., joint_idx]
+    return scores
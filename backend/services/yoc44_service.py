@@ -1,25 +1,35 @@
 """
 YOC44 Inference Service.
 
-This module provides the YOC44 3D skeleton detection service.
-It currently implements a mock service that returns sample data.
-The mock can be easily replaced with real YOC44 inference later.
+This module provides the YOC44 3D skeleton detection service. Uploaded
+videos are analyzed from the poses estimated by the configured inference
+backend (services/inference.py); pro/reference models are served from the
+pro data store. Score and feedback are still mocked.
 """
 import asyncio
-import json
-from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Callable, List, Tuple, Optional
 import numpy as np
 
 from api.models.responses import (
-    PoseFrame2D,
-    PoseFrame3D,
-    Keypoint2D,
-    Keypoint3D,
     RhythmNode,
     KineticDataPoint,
     SwingDataResponse,
 )
+from services.cache import LRUCache
+from services.kinematics import Kinematics, compute_kinematics
+from services.metrics import StageTimings
+from services.pro_data_store import ProDataStore
+from services.projection import project_to_coco
+from services.rhythm import detect_kinetic_chain
+from services.skeleton import COCO_JOINTS
+from services.swing_result import SwingResult
+from services.inference import DEFAULT_BATCH_SIZE, InferenceBatcher, create_backend
+from services.video_processor import PipelineResult, VideoPipeline
+
+
+# Job progress (percent) reported while frames are decoded and analyzed; the
+# job queue reports the start, and motion analysis and saving follow
+PIPELINE_PROGRESS = (5, 80)
 
 
 class YOC44Service:
@@ -35,42 +45,199 @@ class YOC44Service:
     """
 
     # COCO 17 joint indices for reference
-    COCO_JOINTS = [
-        "nose", "left_eye", "right_eye", "left_ear", "right_ear",
-        "left_shoulder", "right_shoulder", "left_elbow", "right_elbow",
-        "left_wrist", "right_wrist", "left_hip", "right_hip",
-        "left_knee", "right_knee", "left_ankle", "right_ankle"
-    ]
-
-    def __init__(self, data_path: Optional[str] = None):
+    COCO_JOINTS = COCO_JOINTS
+
+    # Player level and description per reference video (mirrors the skeleton viewer)
+    PRO_VIDEO_INFO = {
+        "T01": {"level": "beginner", "identity": "女性初学者"},
+        "T02": {"level": "beginner", "identity": "摆拍型初学者"},
+        "T03": {"level": "intermediate", "identity": "力量型男性"},
+        "T04": {"level": "beginner", "identity": "完全初学者"},
+        "T05": {"level": "beginner", "identity": "女性初学者"},
+        "T06": {"level": "elite", "identity": "费德勒"},
+        "T07": {"level": "intermediate", "identity": "壁球爱好者"},
+        "T08": {"level": "elite", "identity": "德约科维奇"},
+        "T09": {"level": "intentional_error", "identity": "故意后仰"},
+        "T10": {"level": "advanced", "identity": "学过50h"},
+        "T11": {"level": "intentional_error", "identity": "故意够着打"},
+        "T12": {"level": "elite", "identity": "辛纳"},
+        "T13": {"level": "advanced", "identity": "网球教练"},
+        "T14": {"level": "beginner", "identity": "抡大臂"},
+        "T15": {"level": "beginner", "identity": "上下分离"},
+        "T16": {"level": "intermediate", "identity": "商务人士"},
+        "T21": {"level": "advanced", "identity": "校队(用力)"},
+        "T22": {"level": "advanced", "identity": "校队最佳"},
+        "T23": {"level": "intermediate", "identity": "校队(矮)"},
+        "T24": {"level": "intermediate", "identity": "校队最弱"},
+        "T25": {"level": "elite", "identity": "费德勒红土"},
+        "T26": {"level": "elite", "identity": "费德勒左前45°"},
+        "T27": {"level": "elite", "identity": "费德勒正面"},
+        "T28": {"level": "elite", "identity": "费德勒热身"},
+        "T29": {"level": "advanced", "identity": "空挥拍"},
+        "T30": {"level": "beginner", "identity": "完全初学者"},
+        "T31": {"level": "beginner", "identity": "高尔夫背景"},
+    }
+
+    # Default byte budget for cached pro/reference model data
+    DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(
+        self,
+        data_path: Optional[str] = None,
+        store_path: Optional[str] = None,
+        cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        pipeline: Optional[VideoPipeline] = None,
+        inference_backend: str = "mock",
+        inference_batch_size: int = DEFAULT_BATCH_SIZE
+    ):
         """
         Initialize the YOC44 service.
 
         Args:
             data_path: Optional path to skeleton_data.json for loading real pro data
+            store_path: Optional path to the binary skeleton store built by
+                build_data.py; preferred over data_path when present
+            cache_max_bytes: Byte budget for pro model data kept in memory
+            pipeline: Decode/inference pipeline for uploaded videos
+                (default: VideoPipeline())
+            inference_backend: Pose inference backend name (see
+                services/inference.py)
+            inference_batch_size: Largest number of frames per inference
+                call, shared by concurrent analyses
+
+        Raises:
+            ValueError: If inference_backend is unknown
         """
         self.data_path = data_path
-        self._pro_data_cache = {}
-        if data_path:
+        self.store_path = store_path
+        self.cache_max_bytes = cache_max_bytes
+        self.pipeline = pipeline or VideoPipeline()
+        self.inference_backend = inference_backend
+        self.inference_batch_size = inference_batch_size
+        self._inference = InferenceBatcher(create_backend(inference_backend), batch_size=inference_batch_size)
+        self._store = ProDataStore(store_path=store_path, json_path=data_path)
+        self._pro_data_cache = LRUCache(max_bytes=cache_max_bytes)
+        self._reload_listeners: List[Callable[[], None]] = []
+        # Incremented on every (re)load so derived caches can key on it
+        self.data_version = 0
+        if data_path or store_path:
             self._load_pro_data()
 
     def _load_pro_data(self):
-        """Load pro/reference data from skeleton_data.json."""
+        """Load the pro/reference index. Pose data is loaded on first access."""
         try:
-            data_file = Path(self.data_path)
-            if data_file.exists():
-                with open(data_file, 'r') as f:
-                    self._pro_data_cache = json.load(f)
-                print(f"Loaded {len(self._pro_data_cache)} pro videos from {self.data_path}")
+            self._store.load()
+            self._pro_data_cache.clear()
+            self.data_version += 1
+            if self._store.source:
+                print(f"Indexed {len(self._store)} pro videos from {self._store.source}")
         except Exception as e:
             print(f"Warning: Failed to load pro data: {e}")
 
+        for listener in self._reload_listeners:
+            listener()
+
+    def reload_pro_data(self) -> int:
+        """
+        Reload the pro data index (e.g. after build_data.py was re-run).
+
+        Returns:
+            Number of models in the reloaded index
+        """
+        self._load_pro_data()
+        return len(self._store)
+
+    def add_reload_listener(self, listener: Callable[[], None]):
+        """
+        Register a callback invoked whenever the pro data is reloaded.
+
+        Args:
+            listener: Function with no arguments, e.g. a cache invalidator
+        """
+        self._reload_listeners.append(listener)
+
+    def _get_model_data(self, model_code: str) -> Optional[dict]:
+        """
+        Get pose data and metadata for a model, loading it on first access.
+
+        Args:
+            model_code: Model code like "T01", "T02", etc.
+
+        Returns:
+            Dictionary with frames, fps, impact_frame and pose_3d (N, 44, 3),
+            or None if the model is not in the index
+        """
+        if model_code not in self._store:
+            return None
+        return self._pro_data_cache.get_or_load(
+            model_code, lambda: self._load_model_data(model_code)
+        )
+
+    def _load_model_data(self, model_code: str) -> Tuple[dict, int]:
+        """Load a model from the store, returning (model_data, nbytes).
+
+        Kinematics, the 2D projection and the PRO analysis result for the
+        model are computed once here and cached with the pose data, since
+        reference data never changes.
+        """
+        entry = self._store.get_index_entry(model_code)
+        pose_3d = self._store.load_pose(model_code)
+        model_data = {
+            "frames": entry["frames"],
+            "fps": entry["fps"],
+            "impact_frame": entry["impact_frame"],
+            "pose_3d": pose_3d,
+            "kinematics": compute_kinematics(pose_3d, entry["fps"]),
+            "pose_2d": project_to_coco(pose_3d),
+        }
+        result = self._build_response_from_real_data(
+            swing_id="", video_path="", user_type="PRO",
+            model_code=model_code, model_data=model_data, timings=StageTimings()
+        )
+        model_data["result"] = result
+        nbytes = pose_3d.nbytes + model_data["kinematics"].nbytes + model_data["pose_2d"].nbytes
+        return model_data, nbytes
+
+    def get_model_result(self, model_code: str, swing_id: str) -> Optional[SwingResult]:
+        """
+        Get the precomputed PRO analysis result for a reference model.
+
+        Unlike analyze(), this does not simulate inference; the result is
+        built once per model and served from the pro data cache.
+
+        Args:
+            model_code: Model code like "T01", "T02", etc.
+            swing_id: Swing ID for the returned result
+
+        Returns:
+            SwingResult or None if the model is not in the index
+        """
+        model_data = self._get_model_data(model_code)
+        if model_data is None:
+            return None
+        return model_data["result"].with_id(swing_id)
+
+    def start_inference(self):
+        """Load the inference backend so the first analysis does not pay for it."""
+        self._inference.start()
+
+    def stop_inference(self):
+        """Stop the inference thread and release the backend."""
+        self._inference.close()
+
+    def get_inference_stats(self) -> dict:
+        """Get inference backend and batching statistics for this process."""
+        return self._inference.get_stats()
+
+    def get_cache_stats(self) -> dict:
+        """Get pro data cache statistics (hits, misses, evictions, bytes)."""
+        return self._pro_data_cache.get_stats()
+
     async def analyze_video(
         self,
         video_path: str,
         swing_id: str,
-        user_type: str = "USER",
-        model_code: str = "T01"
+        user_type: str = "USER"
     ) -> SwingDataResponse:
         """
         Analyze a tennis swing video and return 3D skeleton data.
@@ -79,34 +246,108 @@ class YOC44Service:
             video_path: Path to the uploaded video file
             swing_id: Unique identifier for this swing
             user_type: "USER" or "PRO"
-            model_code: Model to load (T01, T02, etc.)
 
         Returns:
             SwingDataResponse with complete analysis results
         """
-        # Simulate processing time (in real implementation, this would run YOC44)
-        await asyncio.sleep(0.5)
+        result = await self.analyze(video_path, swing_id, user_type)
+        return result.to_response()
 
-        # Use real data from skeleton_data.json
-        if self._pro_data_cache and model_code in self._pro_data_cache:
-            return self._build_response_from_real_data(swing_id, video_path, user_type, model_code)
-        else:
-            # Fallback to mock if model data not available
-            return self._generate_mock_swing_data(swing_id, video_path, user_type)
+    async def analyze(
+        self,
+        video_path: str,
+        swing_id: str,
+        user_type: str = "USER"
+    ) -> SwingResult:
+        """
+        Analyze a tennis swing video and return an array-backed result.
+
+        Same as analyze_video, but leaves pose data as numpy arrays so the
+        caller can pick the payload layout. The analysis runs on a worker
+        thread, so the event loop stays responsive.
+
+        Args:
+            video_path: Path to the uploaded video file
+            swing_id: Unique identifier for this swing
+            user_type: "USER" or "PRO"
+
+        Returns:
+            SwingResult with complete analysis results
+        """
+        return await asyncio.to_thread(self.run_analysis, video_path, swing_id, user_type)
+
+    def run_analysis(
+        self,
+        video_path: str,
+        swing_id: str,
+        user_type: str = "USER",
+        timings: Optional[StageTimings] = None,
+        progress: Optional[Callable[[int, str], None]] = None
+    ) -> SwingResult:
+        """
+        Run the analysis synchronously.
+
+        The video's frames are decoded and run through the inference
+        backend, and every part of the result (3D and 2D poses, impact,
+        rhythm track, velocity curve) is derived from the estimated poses.
+
+        This is the CPU-bound part of analyze() and blocks the calling
+        thread; call it from a thread or process pool (see
+        services/executor.py), never from the event loop.
+
+        Args:
+            video_path: Path to the uploaded video file
+            swing_id: Unique identifier for this swing
+            user_type: "USER" or "PRO"
+            timings: Receives wall-clock and CPU time of the decode,
+                inference, kinematics and scoring stages
+            progress: Called from this thread with (percent, message) as
+                frames are analyzed and stages complete
+
+        Returns:
+            SwingResult with complete analysis results
+
+        Raises:
+            ValueError: If the video cannot be decoded
+        """
+        if timings is None:
+            timings = StageTimings()
+
+        def on_frames(done: int, expected: int):
+            if progress is not None:
+                percent = PIPELINE_PROGRESS[0] + (PIPELINE_PROGRESS[1] - PIPELINE_PROGRESS[0]) * done // expected
+                progress(percent, f"Analyzing video ({done}/{expected} frames)...")
+
+        # Decode the video and run pose inference on its frames
+        with self._inference.session() as session:
+            video = self.pipeline.run(video_path, session.infer, on_progress=on_frames)
+        decode, preprocess = video.stages["decode"], video.stages["preprocess"]
+        timings.add("decode", decode.busy_seconds + preprocess.busy_seconds,
+                    decode.cpu_seconds + preprocess.cpu_seconds)
+        timings.add("inference", video.stages["inference"].busy_seconds, session.cpu_seconds)
+        stages = ", ".join(f"{name} {stage.fps:.0f} fps" for name, stage in video.stages.items())
+        print(f"Video pipeline {swing_id}: {len(video.frame_indices)} frames, {stages} "
+              f"(bottleneck: {video.bottleneck})")
+
+        if progress is not None:
+            progress(PIPELINE_PROGRESS[1], "Analyzing motion...")
+
+        return self._build_response_from_video(swing_id, video, user_type, timings)
 
     async def get_pro_data(self, video_id: str) -> Optional[dict]:
         """
         Get pro/reference data by video ID.
 
+        A cache miss loads the pose and builds the model in a thread, off
+        the event loop.
+
         Args:
             video_id: Video ID like "T01", "T06", etc.
 
         Returns:
             Dictionary with pro data or None if not found
         """
-        if video_id in self._pro_data_cache:
-            return self._pro_data_cache[video_id]
-        return None
+        return await asyncio.to_thread(self._get_model_data, video_id)
 
     def get_available_models(self) -> List[str]:
         """
@@ -115,7 +356,7 @@ class YOC44Service:
         Returns:
             List of model codes (e.g., ["T01", "T02", ...])
         """
-        return sorted(list(self._pro_data_cache.keys()))
+        return self._store.model_codes()
 
     def get_model_metadata(self, model_code: str) -> Optional[dict]:
         """
@@ -127,11 +368,11 @@ class YOC44Service:
         Returns:
             Dictionary with model metadata including hashtag
         """
-        if model_code not in self._pro_data_cache:
+        # Metadata comes from the index; no pose data is loaded here
+        model_data = self._store.get_index_entry(model_code)
+        if model_data is None:
             return None
 
-        model_data = self._pro_data_cache[model_code]
-
         # Generate hashtags based on model characteristics
         hashtag = self._generate_hashtag(model_code, model_data)
 
@@ -144,6 +385,18 @@ class YOC44Service:
             "duration": model_data["frames"] / model_data["fps"]
         }
 
+    def get_pro_info(self, video_id: str) -> dict:
+        """
+        Get player level and description for a pro/reference video.
+
+        Args:
+            video_id: Video ID like "T01", "T06", etc.
+
+        Returns:
+            Dictionary with level and identity
+        """
+        return self.PRO_VIDEO_INFO.get(video_id, {"level": "unknown", "identity": video_id})
+
     def _generate_hashtag(self, model_code: str, model_data: dict) -> str:
         """Generate a descriptive hashtag for the model."""
         # Generate hashtags based on model characteristics
@@ -166,238 +419,60 @@ class YOC44Service:
 
         return hashtags.get(model_code, f"#Model{model_code}")
 
-    def _generate_mock_swing_data(
+    def _build_response_from_video(
         self,
         swing_id: str,
-        video_path: str,
-        user_type: str
-    ) -> SwingDataResponse:
-        """Generate mock swing data for testing.
+        video: PipelineResult,
+        user_type: str,
+        timings: StageTimings
+    ) -> SwingResult:
+        """Build the result of an uploaded video from its estimated 3D poses.
 
-        This creates realistic-looking data that matches the frontend expectations.
-        In production, this would be replaced with actual YOC44 inference.
+        Impact is the frame of peak right wrist speed; the 2D poses, rhythm
+        track and velocity curve are computed from the poses exactly as for
+        reference data. Score and feedback are still mocked.
         """
-        duration = 2.5
-        fps = 30.0
-        total_frames = int(duration * fps)
-        impact_frame = 42  # Frame where ball is hit
-
-        # Generate 2D pose data (COCO 17 joints)
-        pose_data_2d = self._generate_mock_2d_poses(total_frames, fps)
-
-        # Generate 3D pose data (YOC44 44 joints)
-        pose_data_3d = self._generate_mock_3d_poses(total_frames, fps)
-
-        # Generate rhythm track (kinetic chain sequence)
-        rhythm_track = self._generate_mock_rhythm_track()
-
-        # Generate velocity/smoothness data
-        velocity_data = self._generate_mock_velocity_data(duration)
-
-        # Generate score and feedback
-        score, feedback = self._generate_mock_score_and_feedback(user_type)
-
-        return SwingDataResponse(
-            id=swing_id,
-            userType=user_type,
-            videoUrl=f"/videos/{swing_id}.mp4",  # Relative URL
-            duration=duration,
-            poseData=pose_data_2d,
-            poseData3D=pose_data_3d,
-            frames=total_frames,
+        pose_3d = video.pose_3d  # float32 ndarray (N, 44, 3)
+        fps = video.fps
+
+        with timings.measure("kinematics"):
+            # Per-joint velocity/acceleration/jerk, shared by every metric below
+            kinematics = compute_kinematics(pose_3d, fps)
+
+            # Speed sample i is the motion from frame i to i + 1
+            wrist_speed = kinematics.joint_speed("right_wrist")
+            impact_frame = int(np.argmax(wrist_speed)) + 1 if len(wrist_speed) else 0
+
+            # 2D COCO poses projected from the 3D poses
+            pose_2d = project_to_coco(pose_3d)
+
+            # Calculate rhythm track from 3D pose velocities
+            rhythm_track = self._calculate_rhythm_from_pose(pose_3d, kinematics, impact_frame)
+
+            # Calculate velocity data from wrist movement
+            velocity_data = self._calculate_velocity_from_pose(kinematics)
+
+        with timings.measure("scoring"):
+            # Generate score and feedback
+            score, feedback = self._generate_mock_score_and_feedback(user_type)
+
+        return SwingResult(
+            swing_id=swing_id,
+            user_type=user_type,
+            video_url=f"/api/v1/videos/{swing_id}",  # Relative URL
             fps=fps,
             impact_frame=impact_frame,
+            pose_2d=pose_2d,
+            scores_2d=0.85,
+            pose_3d=pose_3d,
+            scores_3d=0.85,
             score=score,
             feedback=feedback,
-            rhythmTrack=rhythm_track,
-            velocityData=velocity_data
+            rhythm_track=rhythm_track,
+            velocity_data=velocity_data,
+            kinematics=kinematics
         )
 
-    def _generate_mock_2d_poses(self, total_frames: int, fps: float) -> List[PoseFrame2D]:
-        """Generate mock 2D poses using interpolation between keyframes.
-
-        This simulates the four phases of a tennis swing:
-        1. Ready Position
-        2. Unit Turn (Backswing)
-        3. Contact Point
-        4. Follow Through
-        """
-        frames = []
-
-        # Define keyframes (joint index -> x, y)
-        # Using normalized coordinates (0-1)
-        keyframes = {
-            "ready": {
-                0: (0.5, 0.2),   # nose
-                5: (0.55, 0.3), 6: (0.45, 0.3),  # shoulders
-                9: (0.52, 0.45), 10: (0.48, 0.45),  # wrists
-                11: (0.53, 0.5), 12: (0.47, 0.5),  # hips
-                13: (0.55, 0.7), 14: (0.45, 0.7),  # knees
-                15: (0.55, 0.9), 16: (0.45, 0.9),  # ankles
-            },
-            "turn": {
-                0: (0.45, 0.2),
-                5: (0.5, 0.3), 6: (0.4, 0.3),
-                9: (0.6, 0.4), 10: (0.2, 0.35),  # right wrist back
-                11: (0.5, 0.5), 12: (0.42, 0.5),
-                13: (0.55, 0.7), 14: (0.4, 0.7),
-                15: (0.55, 0.9), 16: (0.4, 0.9),
-            },
-            "contact": {
-                0: (0.5, 0.2),
-                5: (0.55, 0.3), 6: (0.45, 0.3),
-                9: (0.6, 0.4), 10: (0.7, 0.4),  # right wrist contact
-                11: (0.55, 0.5), 12: (0.45, 0.5),
-                13: (0.55, 0.7), 14: (0.45, 0.7),
-                15: (0.55, 0.9), 16: (0.45, 0.9),
-            },
-            "follow": {
-                0: (0.5, 0.2),
-                5: (0.6, 0.3), 6: (0.5, 0.3),
-                9: (0.5, 0.5), 10: (0.7, 0.25),  # right wrist over shoulder
-                11: (0.6, 0.5), 12: (0.5, 0.5),
-                13: (0.6, 0.7), 14: (0.5, 0.7),
-                15: (0.6, 0.9), 16: (0.5, 0.9),
-            }
-        }
-
-        def interpolate(kf1: dict, kf2: dict, t: float) -> List[Keypoint2D]:
-            """Interpolate between two keyframes."""
-            keypoints = []
-            for i in range(17):
-                if i in kf1 and i in kf2:
-                    x1, y1 = kf1[i]
-                    x2, y2 = kf2[i]
-                    x = x1 + (x2 - x1) * t
-                    y = y1 + (y2 - y1) * t
-                    # Add small jitter for realism
-                    x += np.random.uniform(-0.005, 0.005)
-                    y += np.random.uniform(-0.005, 0.005)
-                    keypoints.append(Keypoint2D(
-                        x=clip(x, 0, 1),
-                        y=clip(y, 0, 1),
-                        score=0.9,
-                        name=self.COCO_JOINTS[i]
-                    ))
-                else:
-                    # Default low-confidence keypoints
-                    keypoints.append(Keypoint2D(x=0.5, y=0.5, score=0.1))
-            return keypoints
-
-        # Generate frames with phase-based interpolation
-        for frame_idx in range(total_frames):
-            progress = frame_idx / total_frames
-            timestamp = frame_idx / fps
-
-            if progress < 0.3:
-                # Ready -> Turn
-                t = progress / 0.3
-                kps = interpolate(keyframes["ready"], keyframes["turn"], t)
-            elif progress < 0.6:
-                # Turn -> Contact
-                t = (progress - 0.3) / 0.3
-                kps = interpolate(keyframes["turn"], keyframes["contact"], t)
-            else:
-                # Contact -> Follow
-                t = (progress - 0.6) / 0.4
-                kps = interpolate(keyframes["contact"], keyframes["follow"], t)
-
-            frames.append(PoseFrame2D(timestamp=timestamp, keypoints=kps))
-
-        return frames
-
-    def _generate_mock_3d_poses(self, total_frames: int, fps: float) -> List[PoseFrame3D]:
-        """Generate mock 3D poses (44 joints).
-
-        This generates normalized 3D coordinates in range [-1, 1].
-        The 44 joints follow the YOC44 format from the skeleton viewer.
-        """
-        frames = []
-
-        # Generate base pose with 44 joints
-        # This is a simplified mock - real YOC44 would detect actual 3D positions
-        for frame_idx in range(total_frames):
-            timestamp = frame_idx / fps
-            progress = frame_idx / total_frames
-
-            keypoints = []
-            for joint_idx in range(44):
-                # Generate normalized 3D positions
-                # Use sine waves to create smooth motion
-                base_x = 0.0
-                base_y = (joint_idx % 3 - 1) * 0.3  # Spread vertically
-                base_z = 0.0
-
-                # Add motion based on swing phase
-                phase_offset = progress * np.pi * 2
-                x = base_x + np.sin(phase_offset + joint_idx * 0.1) * 0.3
-                y = base_y + np.cos(phase_offset * 0.5) * 0.1
-                z = base_z + np.sin(phase_offset * 0.3) * 0.2
-
-                keypoints.append(Keypoint3D(
-                    x=clip(x, -1, 1),
-                    y=clip(y, -1, 1),
-                    z=clip(z, -1, 1),
-                    score=0.85,
-                    name=f"joint_{joint_idx}"
-                ))
-
-            frames.append(PoseFrame3D(timestamp=timestamp, keypoints=keypoints))
-
-        return frames
-
-    def _generate_mock_rhythm_track(self) -> List[RhythmNode]:
-        """Generate mock rhythm track (kinetic chain sequence).
-
-        Maps to the four phases of the swing:
-        - KICK: Leg loading
-        - BASS: Hip firing
-        - SNARE: Shoulder rotation
-        - CRASH: Arm contact
-        """
-        return [
-            RhythmNode(
-                id="r1",
-                timestamp=0.6,
-                intensity=0.7,
-                type="KICK",
-                label="Leg Load"
-            ),
-            RhythmNode(
-                id="r2",
-                timestamp=0.8,
-                intensity=0.6,
-                type="BASS",
-                label="Hip Fire"
-            ),
-            RhythmNode(
-                id="r3",
-                timestamp=1.4,
-                intensity=0.8,
-                type="SNARE",
-                label="Shoulder Turn"
-            ),
-            RhythmNode(
-                id="r4",
-                timestamp=1.5,
-                intensity=0.9,
-                type="CRASH",
-                label="Contact"
-            ),
-        ]
-
-    def _generate_mock_velocity_data(self, duration: float) -> List[KineticDataPoint]:
-        """Generate mock velocity and smoothness data."""
-        points = []
-        num_points = 25
-        for i in range(num_points):
-            t = i * 0.1
-            # Use sine wave with noise for realistic velocity curve
-            velocity = abs(np.sin(i * 0.3)) * 80 + np.random.uniform(0, 20)
-            jerk = np.random.uniform(0, 25)  # Lower is smoother
-            points.append(KineticDataPoint(time=t, velocity=velocity, jerk=jerk))
-        return points
-
     def _generate_mock_score_and_feedback(self, user_type: str) -> Tuple[int, str]:
         """Generate mock score and feedback."""
         if user_type == "PRO":
@@ -418,177 +493,100 @@ class YOC44Service:
         swing_id: str,
         video_path: str,
         user_type: str,
-        model_code: str = "T01"
-    ) -> SwingDataResponse:
-        """Build response using real data from skeleton_data.json.
+        model_code: str,
+        model_data: dict,
+        timings: StageTimings
+    ) -> SwingResult:
+        """Build response using real data from the pro data store.
 
         Uses actual YOC44 44-joint 3D data from the specified model, and calculates
-        rhythm/velocity metrics from the pose data.
+        rhythm/velocity metrics from the pose data. Pose data stays a numpy
+        array; per-keypoint objects are only created if the full layout is
+        requested.
         """
-        model_data = self._pro_data_cache[model_code]
-
         frames = model_data["frames"]
         fps = model_data["fps"]
         impact_frame = model_data["impact_frame"]
-        pose_3d_raw = model_data["pose_3d"]  # List[List[List[float]]] (N, 44, 3)
-        duration = frames / fps
-
-        # Convert raw 3D data to PoseFrame3D format
-        pose_data_3d = []
-        for frame_idx, frame_joints in enumerate(pose_3d_raw):
-            timestamp = frame_idx / fps
-            keypoints = []
-            for joint_idx, coords in enumerate(frame_joints):
-                keypoints.append(Keypoint3D(
-                    x=coords[0],
-                    y=coords[1],
-                    z=coords[2],
-                    score=0.9,  # High confidence for real data
-                    name=f"joint_{joint_idx}"
-                ))
-            pose_data_3d.append(PoseFrame3D(timestamp=timestamp, keypoints=keypoints))
-
-        # Generate 2D pose data (simplified projection or use mock)
-        pose_data_2d = self._generate_mock_2d_poses(frames, fps)
-
-        # Calculate rhythm track from 3D pose velocities
-        rhythm_track = self._calculate_rhythm_from_pose(pose_3d_raw, fps, impact_frame)
-
-        # Calculate velocity data from wrist movement
-        velocity_data = self._calculate_velocity_from_pose(pose_3d_raw, fps)
-
-        # Generate score and feedback
-        score, feedback = self._generate_mock_score_and_feedback(user_type)
-
-        # Get model metadata
-        hashtag = self._generate_hashtag(model_code, model_data)
+        pose_3d = model_data["pose_3d"]  # float32 ndarray (N, 44, 3)
+
+        with timings.measure("kinematics"):
+            # 2D COCO poses projected from the 3D data (cached per model)
+            pose_2d = model_data.get("pose_2d")
+            if pose_2d is None:
+                pose_2d = project_to_coco(pose_3d)
 
-        return SwingDataResponse(
-            id=swing_id,
-            userType=user_type,
-            videoUrl=None,  # No video file for model data
-            duration=duration,
+            # Per-joint velocity/acceleration/jerk, shared by every metric below
+            kinematics = model_data.get("kinematics")
+            if kinematics is None:
+                kinematics = compute_kinematics(pose_3d, fps)
+
+            # Calculate rhythm track from 3D pose velocities
+            rhythm_track = self._calculate_rhythm_from_pose(pose_3d, kinematics, impact_frame)
+
+            # Calculate velocity data from wrist movement
+            velocity_data = self._calculate_velocity_from_pose(kinematics)
+
+        with timings.measure("scoring"):
+            # Generate score and feedback
+            score, feedback = self._generate_mock_score_and_feedback(user_type)
+
+            # Get model metadata
+            hashtag = self._generate_hashtag(model_code, model_data)
+
+        return SwingResult(
+            swing_id=swing_id,
+            user_type=user_type,
+            video_url=None,  # No video file for model data
             model_code=model_code,
             hashtag=hashtag,
-            poseData=pose_data_2d,
-            poseData3D=pose_data_3d,
-            frames=frames,
             fps=fps,
             impact_frame=impact_frame,
+            pose_2d=pose_2d,
+            scores_2d=0.9,
+            pose_3d=pose_3d,
+            scores_3d=0.9,  # High confidence for real data
             score=score,
             feedback=feedback,
-            rhythmTrack=rhythm_track,
-            velocityData=velocity_data
+            rhythm_track=rhythm_track,
+            velocity_data=velocity_data,
+            kinematics=kinematics
         )
 
     def _calculate_rhythm_from_pose(
         self,
-        pose_3d: List[List[List[float]]],
-        fps: float,
+        pose_3d: np.ndarray,
+        kinematics: Kinematics,
         impact_frame: int
     ) -> List[RhythmNode]:
         """Calculate rhythm nodes from 3D pose data.
 
-        Detects kinetic chain sequence by analyzing joint velocities:
+        Detects kinetic chain sequence by finding per-segment velocity peaks:
         - Legs (ankles/knees) -> KICK
         - Hips -> BASS
         - Shoulders -> SNARE
         - Wrist -> CRASH (at impact)
         """
-        # Simplified: Find velocity peaks for key joints
-        # Joint indices (approximate for YOC44 format)
-        # Note: Real mapping would depend on YOC44 joint definitions
-        wrist_idx = 10  # Right wrist (approximate)
-        hip_idx = 11    # Right hip (approximate)
-        shoulder_idx = 6  # Right shoulder (approximate)
-        knee_idx = 14   # Right knee (approximate)
-
-        rhythm_nodes = []
-
-        # Calculate velocities
-        velocities = []
-        for i in range(1, len(pose_3d)):
-            prev_wrist = np.array(pose_3d[i-1][wrist_idx])
-            curr_wrist = np.array(pose_3d[i][wrist_idx])
-            vel = np.linalg.norm(curr_wrist - prev_wrist)
-            velocities.append(vel)
-
-        # Find phases based on velocity pattern
-        impact_time = impact_frame / fps
-
-        # Generate rhythm nodes at key phases
-        rhythm_nodes.append(RhythmNode(
-            id="r1",
-            timestamp=max(0.2, impact_time - 0.9),
-            intensity=0.7,
-            type="KICK",
-            label="Leg Load"
-        ))
-
-        rhythm_nodes.append(RhythmNode(
-            id="r2",
-            timestamp=max(0.4, impact_time - 0.7),
-            intensity=0.6,
-            type="BASS",
-            label="Hip Fire"
-        ))
-
-        rhythm_nodes.append(RhythmNode(
-            id="r3",
-            timestamp=max(0.6, impact_time - 0.1),
-            intensity=0.8,
-            type="SNARE",
-            label="Shoulder Turn"
-        ))
-
-        rhythm_nodes.append(RhythmNode(
-            id="r4",
-            timestamp=impact_time,
-            intensity=0.9,
-            type="CRASH",
-            label="Contact"
-        ))
-
-        return rhythm_nodes
-
-    def _calculate_velocity_from_pose(
-        self,
-        pose_3d: List[List[List[float]]],
-        fps: float
-    ) -> List[KineticDataPoint]:
-        """Calculate velocity and jerk (smoothness) from wrist movement."""
-        wrist_idx = 10  # Right wrist (approximate)
-
-        points = []
-        velocities = []
-
-        # Calculate velocities
-        for i in range(1, len(pose_3d)):
-            prev_wrist = np.array(pose_3d[i-1][wrist_idx])
-            curr_wrist = np.array(pose_3d[i][wrist_idx])
-            vel = np.linalg.norm(curr_wrist - prev_wrist) * fps  # Scale by fps
-            velocities.append(vel)
-
-        # Calculate jerk (derivative of velocity)
-        for i in range(len(velocities)):
-            time = i / fps
-            velocity = velocities[i] * 100  # Scale for visualization
-
-            # Jerk is change in velocity
-            if i > 0:
-                jerk = abs(velocities[i] - velocities[i-1]) * fps * 10
-            else:
-                jerk = 0
-
-            points.append(KineticDataPoint(
-                time=time,
-                velocity=min(velocity, 100),  # Cap at 100
-                jerk=min(jerk, 50)  # Cap at 50
-            ))
-
-        return points
-
-
-def clip(value: float, min_val: float, max_val: float) -> float:
-    """Clip a value to be within [min_val, max_val]."""
-    return max(min_val, min(max_val, value))
+        return detect_kinetic_chain(pose_3d, kinematics, impact_frame)
+
+    def _calculate_velocity_from_pose(self, kinematics: Kinematics) -> List[KineticDataPoint]:
+        """Calculate velocity and jerk (smoothness) from right wrist movement.
+
+        Reads the shared per-joint speed array instead of stepping through
+        frames in Python.
+        """
+        wrist_speed = kinematics.joint_speed("right_wrist")  # (N-1,)
+
+        # Scale for visualization, cap at 100
+        velocity = np.minimum(wrist_speed * 100, 100)
+
+        # Jerk is change in velocity between consecutive frames, cap at 50
+        jerk = np.zeros_like(wrist_speed)
+        jerk[1:] = np.abs(np.diff(wrist_speed)) * kinematics.fps * 10
+        jerk = np.minimum(jerk, 50)
+
+        times = np.arange(len(wrist_speed)) / kinematics.fps
+
+        return [
+            KineticDataPoint(time=time, velocity=v, jerk=j)
+            for time, v, j in zip(times.tolist(), velocity.tolist(), jerk.tolist())
+        ]
@@ -0,0 +1,86 @@
+"""
+Tests for the video processing pipeline on locally generated clips.
+"""
+import numpy as np
+import pytest
+
+from services.skeleton import NUM_YOC44_JOINTS
+from services.video_processor import STAGES, VideoPipeline, write_synthetic_video
+
+
+SOURCE_FRAMES = 90
+SOURCE_FPS = 30.0
+
+
+def zero_poses(batch):
+    """Inference stand-in: one all-zero pose per frame."""
+    return np.zeros((len(batch), NUM_YOC44_JOINTS, 3), dtype=np.float32)
+
+
+@pytest.fixture(scope="module")
+def clip(tmp_path_factory):
+    """A 3 s, 30 fps synthetic clip (written through a Path)."""
+    path = tmp_path_factory.mktemp("videos") / "synthetic.mp4"
+    written = write_synthetic_video(path, frames=SOURCE_FRAMES, fps=SOURCE_FPS, size=(160, 120))
+    assert written == str(path)
+    return path
+
+
+def check_stages(result, frames):
+    """Every stage handled all kept frames and reports a frame rate."""
+    assert set(result.stages) == set(STAGES)
+    for stage in result.stages.values():
+        assert stage.frames == frames
+        assert stage.fps > 0
+    stats = result.get_stats()
+    assert stats["bottleneck"] in STAGES
+    assert all(stats["stages"][name]["fps"] > 0 for name in STAGES)
+
+
+def test_full_rate(clip):
+    result = VideoPipeline(batch_size=8).run(clip, zero_poses)
+
+    assert result.source_frames == SOURCE_FRAMES
+    assert result.pose_3d.shape == (SOURCE_FRAMES, NUM_YOC44_JOINTS, 3)
+    assert result.fps == pytest.approx(SOURCE_FPS)
+    assert (result.width, result.height) == (160, 120)
+    check_stages(result, SOURCE_FRAMES)
+
+
+def test_frame_step(clip):
+    result = VideoPipeline(batch_size=8, frame_step=3).run(clip, zero_poses)
+
+    assert result.source_frames == SOURCE_FRAMES
+    assert result.frame_indices.tolist() == list(range(0, SOURCE_FRAMES, 3))
+    assert result.fps == pytest.approx(SOURCE_FPS / 3)
+    check_stages(result, SOURCE_FRAMES // 3)
+
+
+def test_target_fps(clip):
+    result = VideoPipeline(batch_size=8, target_fps=12.0).run(clip, zero_poses)
+
+    # 30 -> 12 fps keeps one frame every 2.5 source frames
+    assert len(result.frame_indices) == 36
+    assert result.frame_indices[:4].tolist() == [0, 3, 5, 8]
+    assert result.fps == pytest.approx(12.0)
+    check_stages(result, 36)
+
+
+def test_larger_reduction_wins(clip):
+    result = VideoPipeline(frame_step=2, target_fps=6.0).run(clip, zero_poses)
+
+    assert result.fps == pytest.approx(6.0)
+    assert len(result.frame_indices) == SOURCE_FRAMES // 5
+
+
+def test_progress(clip):
+    reported = []
+    VideoPipeline(batch_size=10).run(clip, zero_poses, lambda done, total: reported.append((done, total)))
+
+    assert [done for done, _ in reported] == list(range(10, SOURCE_FRAMES + 1, 10))
+    assert all(total == SOURCE_FRAMES for _, total in reported)
+
+
+def test_wrong_inference_shape(clip):
+    with pytest.raises(ValueError, match="Inference returned shape"):
+        VideoPipeline().run(clip, lambda batch: np.zeros((len(batch), 17, 3)))
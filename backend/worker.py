@@ -0,0 +1,56 @@
+"""
+SwingSymphony Job Worker
+
+Runs analyses from the shared job queue without serving the API, so analysis
+capacity can be scaled separately from the API processes. Uses the same
+configuration (environment variables) as main.py and requires
+JOB_QUEUE=shared:
+
+    JOB_QUEUE=shared python worker.py
+"""
+import asyncio
+import signal
+import sys
+
+from main import (
+    JOB_QUEUE,
+    MAX_CONCURRENT_JOBS,
+    configure_job_queue,
+    create_executor,
+    create_job_store,
+    create_yoc44_service,
+)
+from services.job_queue import start_job_queue, stop_job_queue
+
+
+async def run_worker():
+    """Claim and run jobs until interrupted."""
+    print("Starting SwingSymphony worker...")
+    yoc44_service = create_yoc44_service()
+    executor = create_executor(yoc44_service)
+    await executor.warm_up()
+    job_store = create_job_store()
+    queue = configure_job_queue(executor, job_store, process_jobs=True)
+    await queue.set_max_concurrent_jobs(MAX_CONCURRENT_JOBS)
+    await start_job_queue()
+
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopped.set)
+    print("SwingSymphony worker ready!")
+
+    await stopped.wait()
+
+    print("Shutting down SwingSymphony worker...")
+    await stop_job_queue()
+    executor.shutdown()
+    yoc44_service.stop_inference()
+    job_store.close()
+    print("Shutdown complete.")
+
+
+if __name__ == "__main__":
+    if JOB_QUEUE != "shared":
+        sys.exit("worker.py needs the shared job queue: set JOB_QUEUE=shared")
+    asyncio.run(run_worker())
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
-build_data.py — 从 pose_3d_yoc44.npy 生成 skeleton_data.json 供 viewer 使用
+build_data.py — 从 pose_3d_yoc44.npy 生成 skeleton_data.json 供 viewer 使用,
+同时生成供 backend 使用的二进制 skeleton_store/
 
 Usage:
     python build_data.py                           # 扫描默认 results 目录
@@ -18,17 +19,27 @@ Usage:
       │   ├── T02/ ...
       │   └── T03/ ...
 
-输出:
-    skeleton_data.json  (与本脚本同目录)
+输出 (与本脚本同目录):
+    skeleton_data.json        viewer 使用的完整 JSON
+    skeleton_store/
+      ├── index.json          {version, models: {T01: {frames, fps, impact_frame, shape, dtype, file}}}
+      ├── T01.npy             float32 (N, 44, 3), C 连续, backend 以 mmap 方式读取
+      └── ...
 """
 
 import json
+import os
 import sys
+import time
 from pathlib import Path
 
 import numpy as np
 
 
+STORE_DIRNAME = "skeleton_store"
+STORE_VERSION = 1
+
+
 def find_all_videos(results_dir: Path) -> dict:
     """扫描所有 batch 子目录，找到所有含 pose_3d_yoc44.npy 的视频。"""
     videos = {}
@@ -45,7 +56,7 @@ def find_all_videos(results_dir: Path) -> dict:
 
 
 def load_video(video_dir: Path, video_config: dict = None) -> dict:
-    """从一个视频目录加载数据，返回 viewer 所需的 JSON 对象。"""
+    """从一个视频目录加载数据，pose_3d 以 (N, 44, 3) 数组返回。"""
     stem = video_dir.name
 
     # pose_3d
@@ -77,10 +88,56 @@ def load_video(video_dir: Path, video_config: dict = None) -> dict:
         "frames": num_frames,
         "fps": fps,
         "impact_frame": int(impact_frame),
-        "pose_3d": pose_3d.tolist(),
+        "pose_3d": pose_3d,
     }
 
 
+def write_json(merged: dict, out_path: Path):
+    """写出 viewer 使用的 skeleton_data.json (pose_3d 展开为嵌套列表)。"""
+    payload = {
+        stem: {**data, "pose_3d": data["pose_3d"].tolist()}
+        for stem, data in merged.items()
+    }
+    with open(out_path, "w") as f:
+        json.dump(payload, f)
+
+
+def write_binary_store(merged: dict, store_dir: Path):
+    """写出二进制 store: 每个视频一个 .npy, 加一个小的 index.json。
+
+    index.json 最后写入 (先写临时文件再 rename), 读取方看到的 index
+    永远指向已经完整写好的 .npy 文件。
+    """
+    store_dir.mkdir(parents=True, exist_ok=True)
+
+    models = {}
+    for stem, data in merged.items():
+        file_name = f"{stem}.npy"
+        pose_3d = np.ascontiguousarray(data["pose_3d"], dtype="<f4")
+        tmp_path = store_dir / f".{file_name}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, pose_3d)
+        os.replace(tmp_path, store_dir / file_name)
+        models[stem] = {
+            "frames": data["frames"],
+            "fps": data["fps"],
+            "impact_frame": data["impact_frame"],
+            "shape": list(pose_3d.shape),
+            "dtype": pose_3d.dtype.str,
+            "file": file_name,
+        }
+
+    index = {
+        "version": STORE_VERSION,
+        "built_at": time.time(),
+        "models": models,
+    }
+    tmp_index = store_dir / ".index.json.tmp"
+    with open(tmp_index, "w") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp_index, store_dir / "index.json")
+
+
 def main():
     # 默认路径
     script_dir = Path(__file__).parent.resolve()
@@ -113,12 +170,16 @@ def main():
         print(f"  {stem}: {data['frames']} frames, impact={data['impact_frame']}")
 
     out_path = script_dir / "skeleton_data.json"
-    with open(out_path, "w") as f:
-        json.dump(merged, f)
+    write_json(merged, out_path)
 
     size_mb = out_path.stat().st_size / 1024 / 1024
     print(f"\nSaved: {out_path} ({size_mb:.1f} MB, {len(merged)} videos)")
 
+    store_dir = script_dir / STORE_DIRNAME
+    write_binary_store(merged, store_dir)
+    store_mb = sum(p.stat().st_size for p in store_dir.glob("*.npy")) / 1024 / 1024
+    print(f"Saved: {store_dir}/ ({store_mb:.1f} MB, {len(merged)} videos)")
+
 
 if __name__ == "__main__":
     main()
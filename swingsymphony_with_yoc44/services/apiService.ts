@@ -152,10 +152,51 @@ export async function pollJobStatus(
 }
 
 /**
- * Analyze swing video with automatic polling
+ * Stream job progress over Server-Sent Events
+ *
+ * Receives small progress updates as the backend publishes them and the
+ * full result once at the end, instead of polling getJobStatus.
+ *
+ * @param jobId - Job identifier
+ * @param onProgress - Callback function called with each status update
+ * @returns Promise that resolves when job is complete or failed
+ */
+export function streamJobStatus(
+  jobId: string,
+  onProgress: (status: JobResponse) => void
+): Promise<SwingData> {
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`${API_BASE_URL}/api/v1/jobs/${jobId}/events`);
+
+    source.addEventListener('progress', (event) => {
+      const update = JSON.parse((event as MessageEvent).data);
+      onProgress({ job_id: jobId, ...update });
+    });
+
+    source.addEventListener('result', (event) => {
+      source.close();
+      const status: JobResponse = JSON.parse((event as MessageEvent).data);
+      onProgress(status);
+      if (status.status === 'completed' && status.result) {
+        resolve(status.result);
+      } else {
+        reject(new Error(status.error || 'Analysis failed'));
+      }
+    });
+
+    source.onerror = () => {
+      source.close();
+      reject(new Error('Job event stream failed'));
+    };
+  });
+}
+
+/**
+ * Analyze swing video with streamed progress
  *
  * This is the main function to use for video analysis.
- * It handles the complete flow: upload -> poll -> return result
+ * It handles the complete flow: upload -> stream progress -> return result,
+ * falling back to polling if the event stream is unavailable.
  *
  * @param file - Video file to analyze
  * @param onProgress - Optional callback for progress updates
@@ -172,14 +213,24 @@ export async function analyzeSwingVideo(
     onProgress(job);
   }
 
-  // Poll for completion
-  const result = await pollJobStatus(job.job_id, (status) => {
+  const report = (status: JobResponse) => {
     if (onProgress) {
       onProgress(status);
     }
-  });
+  };
+
+  // Stream progress, or poll if EventSource is unavailable or the stream drops
+  if (typeof EventSource !== 'undefined') {
+    try {
+      return await streamJobStatus(job.job_id, report);
+    } catch (error) {
+      if (!(error instanceof Error) || error.message !== 'Job event stream failed') {
+        throw error;
+      }
+    }
+  }
 
-  return result;
+  return pollJobStatus(job.job_id, report);
 }
 
 /**